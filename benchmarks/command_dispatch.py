@@ -0,0 +1,169 @@
+"""
+Measure slash command dispatch latency.
+
+Run with `python benchmarks/command_dispatch.py [iterations]`, the default is 20000 per command.
+Every iteration parses a INTERACTION_CREATE payload and runs the command through `handle_interaction`,
+once with a callback taking every option and once with a callback only taking the first one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import Any
+
+from loguru import logger
+
+from vivcord import Client, commands, context, datatypes
+
+USER = {
+    "id": "80351110224678912",
+    "username": "Nelly",
+    "discriminator": "1337",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+}
+
+OPTIONS = [
+    commands.CommandOptionString("reason", "Why"),
+    commands.CommandOptionInt("days", "Messages to delete"),
+    commands.CommandOptionUser("user", "Who"),
+    commands.CommandOptionChannel("channel", "Where to log it"),
+    commands.CommandOptionRole("role", "Role to give"),
+]
+
+
+def interaction_payload(name: str) -> dict[str, Any]:
+    """
+    Create a INTERACTION_CREATE payload using every option.
+
+    Args:
+        name (str): Command name
+
+    Returns:
+        dict[str, Any]: Interaction json
+    """
+    return {
+        "id": "846462639134605312",
+        "application_id": "772459224358535178",
+        "type": 2,
+        "token": "A_UNIQUE_TOKEN",
+        "version": 1,
+        "guild_id": "290926798626357999",
+        "channel_id": "645027906669510667",
+        "member": {
+            "user": USER,
+            "roles": [],
+            "joined_at": "2017-03-13T19:19:14.040000+00:00",
+            "deaf": False,
+            "mute": False,
+        },
+        "data": {
+            "id": "771825006014889984",
+            "name": name,
+            "type": 1,
+            "options": [
+                {"name": "reason", "type": 3, "value": "spam"},
+                {"name": "days", "type": 4, "value": 7},
+                {"name": "user", "type": 6, "value": USER["id"]},
+                {"name": "channel", "type": 7, "value": "41771983423143937"},
+                {"name": "role", "type": 8, "value": "41771983423143936"},
+            ],
+            "resolved": {
+                "users": {USER["id"]: USER},
+                "channels": {
+                    "41771983423143937": {
+                        "id": "41771983423143937",
+                        "guild_id": "290926798626357999",
+                        "name": "mod-log",
+                        "type": 0,
+                        "position": 1,
+                        "permission_overwrites": [],
+                    }
+                },
+                "roles": {
+                    "41771983423143936": {
+                        "id": "41771983423143936",
+                        "name": "muted",
+                        "color": 0,
+                        "hoist": False,
+                        "position": 3,
+                        "permissions": "0",
+                        "managed": False,
+                        "mentionable": False,
+                    }
+                },
+            },
+        },
+    }
+
+
+async def every_option(
+    ctx: context.SlashCommandContext,
+    reason: str,
+    days: int,
+    user: datatypes.User,
+    channel: datatypes.Channel,
+    role: datatypes.Role,
+) -> None:
+    """
+    Command taking every option.
+
+    Args:
+        ctx (context.SlashCommandContext): Command context
+        reason (str): Option
+        days (int): Option
+        user (datatypes.User): Option
+        channel (datatypes.Channel): Option
+        role (datatypes.Role): Option
+    """
+
+
+async def first_option(ctx: context.SlashCommandContext, reason: str) -> None:
+    """
+    Command only taking the first option.
+
+    Args:
+        ctx (context.SlashCommandContext): Command context
+        reason (str): Option
+    """
+
+
+async def dispatch(client: Client, name: str, iterations: int) -> float:
+    """
+    Dispatch a command repeatedly.
+
+    Args:
+        client (Client): Client the command is registered on
+        name (str): Command name
+        iterations (int): Amount of dispatches
+
+    Returns:
+        float: Seconds per dispatch
+    """
+    payload = interaction_payload(name)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        ctx = context.parse_interaction(client, payload)  # type: ignore
+        await ctx.handle_interaction()
+    return (time.perf_counter() - start) / iterations
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    # channel parsing logs every payload, which would dominate the timings.
+    logger.remove()
+    client = Client()
+    for name, func in (("every", every_option), ("first", first_option)):
+        command = commands.SlashCommand(name, "benchmark", True, None, func)
+        command.options.extend(OPTIONS)
+        client.register_command(command)
+
+        _ = await dispatch(client, name, 100)
+        seconds = await dispatch(client, name, iterations)
+        print(f"{name:>6} option(s): {seconds * 1e6:.2f}us per dispatch")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
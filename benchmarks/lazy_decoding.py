@@ -0,0 +1,184 @@
+"""
+Compare eager and lazy datatype decoding.
+
+Run with `python benchmarks/lazy_decoding.py [iterations]`, the default is 20000 per payload.
+For every payload it times creating the object, creating it and reading one attribute,
+and creating it and reading every attribute, and checks both modes decode the same values.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from typing import Any
+
+from loguru import logger
+
+from vivcord import Client, datatypes
+
+USER = {
+    "id": "80351110224678912",
+    "username": "Nelly",
+    "discriminator": "1337",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+    "bot": False,
+    "public_flags": 64,
+}
+
+PAYLOADS: dict[str, tuple[str, dict[str, Any]]] = {
+    "user": ("username", USER),
+    "member": (
+        "nick",
+        {
+            "user": USER,
+            "nick": "NOT API SUPPORT",
+            "roles": ["41771983423143936", "41771983423143937"],
+            "joined_at": "2015-04-26T06:26:56.936000+00:00",
+            "deaf": False,
+            "mute": False,
+            "pending": False,
+        },
+    ),
+    "guild text channel": (
+        "name",
+        {
+            "id": "41771983423143937",
+            "guild_id": "41771983423143937",
+            "name": "general",
+            "type": 0,
+            "position": 6,
+            "permission_overwrites": [
+                {"id": "41771983423143936", "type": 0, "allow": "1024", "deny": "0"}
+            ],
+            "rate_limit_per_user": 2,
+            "nsfw": True,
+            "topic": "24/7 chat about how to gank Mike #2",
+            "last_message_id": "155117677105512449",
+            "parent_id": "399942396007890945",
+            "default_auto_archive_duration": 60,
+        },
+    ),
+    "thread": (
+        "name",
+        {
+            "id": "41771983423143937",
+            "guild_id": "41771983423143937",
+            "parent_id": "41771983423143937",
+            "owner_id": "80351110224678912",
+            "name": "don't buy dota-2",
+            "type": 11,
+            "last_message_id": "155117677105512449",
+            "last_pin_timestamp": "2021-04-12T23:40:39.855793+00:00",
+            "message_count": 1,
+            "member_count": 5,
+            "rate_limit_per_user": 2,
+            "thread_metadata": {
+                "archived": False,
+                "auto_archive_duration": 1440,
+                "archive_timestamp": "2021-04-12T23:40:39.855793+00:00",
+                "locked": False,
+            },
+        },
+    ),
+    "dm channel": (
+        "id_",
+        {
+            "last_message_id": "3343820033257021450",
+            "type": 1,
+            "id": "319674150115610528",
+            "recipients": [USER],
+        },
+    ),
+}
+
+
+def create(client: Client, name: str) -> Any:  # noqa: ANN401
+    """
+    Create the datatype of a payload.
+
+    Args:
+        client (Client): Client deciding the mode
+        name (str): Payload name
+
+    Returns:
+        Any: The created datatype
+    """
+    data = PAYLOADS[name][1]
+    if name == "user":
+        return datatypes.User(client, data)  # type: ignore
+    if name == "member":
+        return datatypes.Member(client, data)  # type: ignore
+    return datatypes.Channel.parse_channel(client, data)  # type: ignore
+
+
+def read_all(value: Any) -> list[Any]:  # noqa: ANN401
+    """
+    Read every attribute of a datatype.
+
+    Args:
+        value (Any): The datatype
+
+    Returns:
+        list[Any]: The attribute values, in slot order
+    """
+    names = [
+        name
+        for cls in type(value).__mro__
+        for name in getattr(cls, "__slots__", ())
+        if name not in ("_client", "_raw_data", "_data")
+    ]
+    return [getattr(value, name) for name in names]
+
+
+def comparable(value: Any) -> Any:  # noqa: ANN401
+    """
+    Turn nested datatypes into their attribute values, so they can be compared.
+
+    Args:
+        value (Any): A attribute value
+
+    Returns:
+        Any: A value that compares by content
+    """
+    if isinstance(value, list):
+        return [comparable(item) for item in value]  # type: ignore
+    if hasattr(value, "__slots__") and not isinstance(value, int):
+        return [comparable(item) for item in read_all(value)]
+    return value
+
+
+def main() -> None:
+    """Run the benchmark."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    # parse_channel logs every payload, which would dominate the timings.
+    logger.remove()
+    eager = Client()
+    lazy = Client(lazy_datatypes=True)
+
+    for name, (attribute, _) in PAYLOADS.items():
+        eager_value = comparable(read_all(create(eager, name)))
+        lazy_value = comparable(read_all(create(lazy, name)))
+        if eager_value != lazy_value:
+            raise AssertionError(f"{name}: lazy decoding differs from eager decoding")
+
+        for mode, client in (("eager", eager), ("lazy", lazy)):
+            results = {
+                "create": timeit.timeit(
+                    lambda: create(client, name), number=iterations
+                ),
+                f"create + {attribute}": timeit.timeit(
+                    lambda: getattr(create(client, name), attribute), number=iterations
+                ),
+                "create + all": timeit.timeit(
+                    lambda: read_all(create(client, name)), number=iterations
+                ),
+            }
+            timings = ", ".join(
+                f"{label} {total / iterations * 1e6:.2f}us"
+                for label, total in results.items()
+            )
+            print(f"{name:>18} {mode:>5}: {timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measure how many bytes a cached member costs.
+
+Run with `python benchmarks/member_memory.py [member count]`, the default is a million members.
+Both a plain dict of `Member` objects and the `CompactMemberStore` are measured.
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+
+from vivcord import Client, datatypes
+from vivcord.memberstore import CompactMemberStore
+
+
+def member_payload(index: int) -> dict[str, object]:
+    """
+    Create a realistic member payload.
+
+    Args:
+        index (int): Used to make the ids unique
+
+    Returns:
+        dict[str, object]: Member json
+    """
+    return {
+        "roles": [str(41771983423143936 + index % 50), str(41771983423143937)],
+        "joined_at": "2021-06-20T12:34:56.789000+00:00",
+        "deaf": False,
+        "mute": False,
+        "nick": None,
+        "user": {
+            "id": str(80351110224678912 + index),
+            "username": f"user{index}",
+            "discriminator": f"{index % 10000:04}",
+            "avatar": "8342729096ea3675442027381ff50dfe",
+            "public_flags": 64,
+        },
+    }
+
+
+def measure(count: int, keep_raw_data: bool, compact: bool = False) -> float:
+    """
+    Build a member cache and measure its size.
+
+    Args:
+        count (int): Amount of members to cache
+        keep_raw_data (bool): Passed to the client
+        compact (bool): Use a `CompactMemberStore` instead of a dict. Defaults to False.
+
+    Returns:
+        float: Bytes per cached member
+    """
+    client = Client(keep_raw_data=keep_raw_data)
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    cache = CompactMemberStore(client) if compact else {}
+    for index in range(count):
+        # like gateway payloads, these are only still counted at the end if the member keeps them alive.
+        member = datatypes.Member(client, member_payload(index))  # type: ignore
+        if compact:
+            cache.set((1, member.user.id_), member)  # type: ignore
+        else:
+            cache[int(member.user.id_)] = member  # type: ignore
+
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (after - before) / count
+
+
+def main() -> None:
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for name, keep_raw_data, compact in (
+        ("objects", False, False),
+        ("objects, keep_raw_data", True, False),
+        ("compact store", False, True),
+    ):
+        per_member = measure(count, keep_raw_data, compact)
+        print(
+            f"{count} members, {name}: "
+            f"{per_member:.0f} bytes per member, {per_member * count / 2**20:.1f} MiB total"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure how fast timestamps are parsed.
+
+Run with `python benchmarks/timestamp_parsing.py [count]`, the default is a million timestamps.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable
+
+from vivcord import timestamps
+
+
+def make_timestamps(count: int) -> list[datetime]:
+    """
+    Create random times in the range discord uses.
+
+    Args:
+        count (int): Amount of times
+
+    Returns:
+        list[datetime]: The times
+    """
+    rng = random.Random(0)
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    return [
+        start
+        + timedelta(
+            seconds=rng.randrange(300_000_000), microseconds=rng.randrange(10**6)
+        )
+        for _ in range(count)
+    ]
+
+
+def run(name: str, function: Callable[[str], object], values: Iterable[str]) -> None:
+    """
+    Time a parser over every value.
+
+    Args:
+        name (str): Printed name
+        function (Callable[[str], object]): The parser
+        values (Iterable[str]): Values to parse
+    """
+    values = list(values)
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>32}: {elapsed:.2f}s total, {elapsed / len(values) * 1e9:.0f}ns each")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    times = make_timestamps(count)
+    discord = [value.isoformat(timespec="microseconds") for value in times]
+    zulu = [value.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z" for value in times]
+
+    run("parse_iso, discord format", timestamps.parse_iso, discord)
+    run("parse_iso, Z and milliseconds", timestamps.parse_iso, zulu)
+    run(
+        "strptime, discord format",
+        lambda value: datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z"),
+        discord,
+    )
+
+    ids = [
+        str((int(value.timestamp() * 1000) - 1420070400000) << 22) for value in times
+    ]
+    run("snowflake_time", lambda value: timestamps.snowflake_time(int(value)), ids)
+
+
+if __name__ == "__main__":
+    main()
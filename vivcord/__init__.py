@@ -2,18 +2,36 @@
 
 __all__ = [
     "Client",
+    "autocomplete",
+    "CacheConfig",
+    "CachePolicy",
+    "cache",
     "Intents",
     "commands",
     "datatypes",
     "errors",
     "events",
+    "limits",
     "traits",
     "SlashCommandContext",
     "SendMessageData",
     "context",
+    "timestamps",
 ]
 
-from vivcord import commands, context, datatypes, errors, events, traits
+from vivcord import (
+    autocomplete,
+    cache,
+    commands,
+    context,
+    datatypes,
+    errors,
+    events,
+    limits,
+    timestamps,
+    traits,
+)
+from vivcord.cache import CacheConfig, CachePolicy
 from vivcord.client import Client
 from vivcord.context import SlashCommandContext
 from vivcord.datatypes import Intents, SendMessageData
@@ -2,40 +2,93 @@
 
 from __future__ import annotations
 
+import time
+from contextlib import asynccontextmanager
 from typing import TYPE_CHECKING
 
 from loguru import logger
 
-from vivcord import errors
+from vivcord import _logging, errors
 from vivcord._constants import BASE_URL
 
 if TYPE_CHECKING:
+    from typing import Any, AsyncIterator
+
     import aiohttp
 
     from vivcord import _typed_dicts as type_dicts
     from vivcord import datatypes
+    from vivcord.metrics import Metrics
+    from vivcord.tracing import Tracer
 
 
 class Api:
     """Communicate with the discord api."""
 
-    def __init__(self, session: aiohttp.ClientSession) -> None:
+    def __init__(
+        self, session: aiohttp.ClientSession, metrics: Metrics, tracer: Tracer
+    ) -> None:
         """
         Create a api instance.
 
         Args:
             session (aiohttp.ClientSession): The http session to use.
+            metrics (Metrics): Metrics to record requests in.
+            tracer (Tracer): Tracer to record request spans with.
         """
         self.session = session
+        self.metrics = metrics
+        self.tracer = tracer
         self.application_id: datatypes.Snowflake | None = None
 
     async def _handle_response(self, response: aiohttp.ClientResponse) -> None:
-        logger.debug(response.status)
+        _logging.debug("{} {} -> {}", response.method, response.url, response.status)
 
         if response.status >= 400:
             raw_error = await response.json()
             raise errors.create_http_error(response.status, raw_error)
 
+    @asynccontextmanager
+    async def _request(
+        self,
+        method: str,
+        route: str,
+        json: Any = None,  # noqa: ANN401
+        **params: object,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Make a request and record it in the metrics.
+
+        Args:
+            method (str): Http method
+            route (str): Route template, formatted with params to get the url.
+            json (Any): Json body to send. Defaults to None.
+            **params (object): Values for the route template
+
+        Yields:
+            aiohttp.ClientResponse: The checked response
+        """
+        url = BASE_URL + route.format(**params)
+        start = time.perf_counter()
+
+        with self.tracer.span("rest", method=method, route=route):
+            async with self.session.request(method, url, json=json) as resp:
+                self.metrics.rest_request_seconds.observe(
+                    time.perf_counter() - start, method, route
+                )
+                self.metrics.rest_requests.inc(method, route, str(resp.status))
+
+                if resp.status == 429:
+                    # https://discord.com/developers/docs/topics/rate-limits#header-format
+                    reset_after = resp.headers.get("X-RateLimit-Reset-After")
+                    if reset_after is not None:
+                        self.metrics.rest_ratelimit_wait_seconds.observe(
+                            float(reset_after), route
+                        )
+
+                await self._handle_response(resp)
+                yield resp
+
     async def get_gateway(self) -> str:
         """
         Get gateway url.
@@ -44,8 +97,7 @@ class Api:
             str: the gateway url.
         """
         # https://discord.com/developers/docs/topics/gateway#get-gateway
-        async with self.session.get(f"{BASE_URL}/gateway") as resp:
-            await self._handle_response(resp)
+        async with self._request("GET", "/gateway") as resp:
             data = await resp.json()
             return data["url"]
 
@@ -59,10 +111,13 @@ class Api:
         # https://discord.com/developers/docs/interactions/application-commands#create-global-application-command
         logger.info(f"registering global command {command['name']!r}")
 
-        async with self.session.post(
-            f"{BASE_URL}/applications/{self.application_id}/commands", json=command
-        ) as resp:
-            await self._handle_response(resp)
+        async with self._request(
+            "POST",
+            "/applications/{application_id}/commands",
+            command,
+            application_id=self.application_id,
+        ):
+            pass
 
     async def register_guild_command(
         self, guild_id: datatypes.Snowflake | int, command: type_dicts.CommandStructure
@@ -79,13 +134,18 @@ class Api:
             f"registering guild command {command['name']!r} on guild {guild_id!r}"
         )
 
-        logger.debug(self.session.headers)
+        _logging.debug(
+            "session headers: {}", _logging.RedactedHeaders(self.session.headers)
+        )
 
-        async with self.session.post(
-            f"{BASE_URL}/applications/{self.application_id}/guilds/{guild_id}/commands",
-            json=command,
-        ) as resp:
-            await self._handle_response(resp)
+        async with self._request(
+            "POST",
+            "/applications/{application_id}/guilds/{guild_id}/commands",
+            command,
+            application_id=self.application_id,
+            guild_id=guild_id,
+        ):
+            pass
 
     async def overwrite_global_commands(
         self, commands: list[type_dicts.CommandStructure]
@@ -99,10 +159,13 @@ class Api:
         # https://discord.com/developers/docs/interactions/application-commands#bulk-overwrite-global-application-commands
         logger.info("overwriting global commands")
 
-        async with self.session.put(
-            f"{BASE_URL}/applications/{self.application_id}/commands", json=commands
-        ) as resp:
-            await self._handle_response(resp)
+        async with self._request(
+            "PUT",
+            "/applications/{application_id}/commands",
+            commands,
+            application_id=self.application_id,
+        ):
+            pass
 
     async def overwrite_guild_commands(
         self,
@@ -119,11 +182,14 @@ class Api:
         # https://discord.com/developers/docs/interactions/application-commands#bulk-overwrite-guild-application-commands
         logger.info(f"overwriting guild commands on guild {guild_id!r}")
 
-        async with self.session.put(
-            f"{BASE_URL}/applications/{self.application_id}/guilds/{guild_id}/commands",
-            json=commands,
-        ) as resp:
-            await self._handle_response(resp)
+        async with self._request(
+            "PUT",
+            "/applications/{application_id}/guilds/{guild_id}/commands",
+            commands,
+            application_id=self.application_id,
+            guild_id=guild_id,
+        ):
+            pass
 
     async def respond_to_interaction(
         self, int_id: int, int_token: str, data: type_dicts.InteracionResponsData
@@ -136,9 +202,13 @@ class Api:
             int_token (str): The interaction token
             data (dict[str, object]): Data to respond with
         """
-        logger.debug(f"responding to interaction {int_id} with data {data!r}")
-
-        async with self.session.post(
-            f"{BASE_URL}/interactions/{int_id}/{int_token}/callback", json=data
-        ) as resp:
-            await self._handle_response(resp)
+        _logging.debug("responding to interaction {} with data {!r}", int_id, data)
+
+        async with self._request(
+            "POST",
+            "/interactions/{interaction_id}/{interaction_token}/callback",
+            data,
+            interaction_id=int_id,
+            interaction_token=int_token,
+        ):
+            pass
@@ -0,0 +1,176 @@
+"""Bind the options of a slash command interaction to the callback arguments."""
+
+from __future__ import annotations
+
+import inspect
+from typing import TYPE_CHECKING, Any, Callable
+
+from vivcord import datatypes
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    from vivcord import _typed_dicts as type_dicts
+    from vivcord import commands
+    from vivcord.client import Client
+    from vivcord.context import OPTION_VALS
+
+Converter: TypeAlias = Callable[
+    ["Client", Any, "type_dicts.ResolvedData"], "OPTION_VALS"
+]
+
+
+def _resolved_part(resolved: type_dicts.ResolvedData, key: str) -> dict[Any, Any]:
+    """
+    Get a part of the resolved data.
+
+    Args:
+        resolved (type_dicts.ResolvedData): The resolved data of the interaction
+        key (str): The part to get
+
+    Raises:
+        KeyError: The part is missing.
+
+    Returns:
+        dict[Any, Any]: The objects of the part by id
+    """
+    part = resolved.get(key)
+    if part is None:
+        raise KeyError(f"Expected {key} key")
+    return part  # type: ignore
+
+
+def _convert_value(
+    client: Client, value: Any, resolved: type_dicts.ResolvedData  # noqa: ANN401
+) -> OPTION_VALS:
+    return value  # type: ignore
+
+
+def _convert_user(
+    client: Client, value: Any, resolved: type_dicts.ResolvedData  # noqa: ANN401
+) -> OPTION_VALS:
+    users = resolved.get("users", {})
+    if value in users:
+        return client.user_map.intern(users[value])
+    return datatypes.Member(client, _resolved_part(resolved, "members")[value])
+
+
+def _convert_channel(
+    client: Client, value: Any, resolved: type_dicts.ResolvedData  # noqa: ANN401
+) -> OPTION_VALS:
+    return datatypes.Channel.parse_channel(
+        client, _resolved_part(resolved, "channels")[value]
+    )
+
+
+def _convert_role(
+    client: Client, value: Any, resolved: type_dicts.ResolvedData  # noqa: ANN401
+) -> OPTION_VALS:
+    return datatypes.Role(client, _resolved_part(resolved, "roles")[value])
+
+
+def _convert_mentionable(
+    client: Client, value: Any, resolved: type_dicts.ResolvedData  # noqa: ANN401
+) -> OPTION_VALS:
+    users = resolved.get("users", {})
+    if value in users:
+        return client.user_map.intern(users[value])
+    return _convert_role(client, value, resolved)
+
+
+# https://discord.com/developers/docs/interactions/application-commands#application-command-object-application-command-option-type
+_CONVERTERS: dict[int, Converter] = {
+    3: _convert_value,
+    4: _convert_value,
+    5: _convert_value,
+    6: _convert_user,
+    7: _convert_channel,
+    8: _convert_role,
+    9: _convert_mentionable,
+    10: _convert_value,
+}
+
+
+def _accepted_arguments(func: Callable[..., Any], option_count: int) -> int:
+    """
+    Count the options a callback takes after the context.
+
+    Args:
+        func (Callable[..., Any]): The command callback
+        option_count (int): Amount of declared options
+
+    Returns:
+        int: Amount of leading options the callback takes
+    """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return option_count
+
+    positional = 0
+    for parameter in parameters:
+        if parameter.kind is inspect.Parameter.VAR_POSITIONAL:
+            return option_count
+        if parameter.kind in (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        ):
+            positional += 1
+    # the first parameter is the context.
+    return max(0, min(option_count, positional - 1))
+
+
+class ArgumentBinder:
+    """
+    Turns the options of a interaction into the positional arguments of a command callback.
+
+    Built once per command, it maps every option name to its argument slot and converter,
+    so binding is a single pass over the sent options.
+    Options the callback does not take are skipped without building their resolved objects.
+    """
+
+    __slots__ = ("_bindings", "_size")
+
+    def __init__(self, command: commands.SlashCommand[Any]) -> None:
+        """
+        Compile the binder of a command.
+
+        Args:
+            command (commands.SlashCommand[Any]): The command
+
+        Raises:
+            ValueError: A option has a type that can not be bound.
+        """
+        self._size = _accepted_arguments(command.func, len(command.options))
+        self._bindings: dict[str, tuple[int, Converter]] = {}
+        for slot, option in enumerate(command.options[: self._size]):
+            type_ = option.convert_to_dict()["type"]
+            converter = _CONVERTERS.get(type_)
+            if converter is None:
+                raise ValueError(f"Unknown option type {type_}")
+            self._bindings[option.name] = (slot, converter)
+
+    def bind(
+        self,
+        client: Client,
+        options: list[type_dicts.CommandOptionResult],
+        resolved: type_dicts.ResolvedData,
+    ) -> list[OPTION_VALS | None]:
+        """
+        Bind the sent options.
+
+        Args:
+            client (Client): Vivcord client
+            options (list[type_dicts.CommandOptionResult]): The options of the interaction
+            resolved (type_dicts.ResolvedData): The resolved data of the interaction
+
+        Returns:
+            list[OPTION_VALS | None]: The arguments, None for options that were not sent
+        """
+        arguments: list[OPTION_VALS | None] = [None] * self._size
+        for option in options:
+            binding = self._bindings.get(option["name"])
+            if binding is not None:
+                slot, convert = binding
+                arguments[slot] = convert(client, option.get("value", 0), resolved)
+        return arguments
@@ -5,3 +5,7 @@ GATEWAY_VERSION = 9
 
 # https://discord.com/developers/docs/reference#api-reference-base-url
 BASE_URL = f"https://discord.com/api/v{API_VERSION}"
+
+# https://discord.com/developers/docs/topics/gateway#rate-limiting
+GATEWAY_SEND_LIMIT = 120
+GATEWAY_SEND_WINDOW = 60
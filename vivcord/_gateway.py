@@ -1,27 +1,51 @@
 """Handle events from the discord gateway."""
+
 from __future__ import annotations
 
 import asyncio
+import json
 import random
+import secrets
 import sys
+import time
+from collections import deque
 from typing import TYPE_CHECKING, Generic, TypeVar
 
 from loguru import logger
 
-from vivcord import events
-from vivcord._constants import GATEWAY_VERSION
+from vivcord import _logging, events
+from vivcord._constants import (
+    GATEWAY_SEND_LIMIT,
+    GATEWAY_SEND_WINDOW,
+    GATEWAY_VERSION,
+)
 from vivcord.events import event_map_manager
+from vivcord.snapshot import SessionState
 
 if TYPE_CHECKING:
-    from typing import Any, TypeGuard
+    from typing import Any, AsyncIterator, TypeAlias, TypeGuard
 
     import aiohttp
 
     from vivcord import datatypes
-    from vivcord._typed_dicts import GatewayResponse
+    from vivcord._typed_dicts import (
+        GatewayResponse,
+        PresenceActivityData,
+        RequestGuildMembersData,
+        UpdatePresenceData,
+    )
     from vivcord.client import Client
 
 EventT = TypeVar("EventT", bound=events.Event)
+# a member chunk and the task running its handlers.
+_QueuedChunk: TypeAlias = tuple[events.GuildMembersChunk, asyncio.Task[None]]
+
+# https://discord.com/developers/docs/topics/gateway#gateway-opcodes
+_HEARTBEAT_OP = 1
+_PRESENCE_UPDATE_OP = 3
+
+# commands only heartbeats may use, so a busy queue can not starve them and get us disconnected.
+_HEARTBEAT_RESERVE = 2
 
 
 class _EventWaiter(Generic[EventT]):
@@ -76,6 +100,69 @@ class _EventWaiter(Generic[EventT]):
         return self._type == event_type
 
 
+class _TokenBucket:
+    """
+    Token bucket limiting how many commands are sent.
+
+    A full bucket plus the refill during one window never exceed the limit of that window,
+    so the limit holds for any window, not just ones aligned to the first send.
+    """
+
+    def __init__(self, limit: int, window: float, reserved: int) -> None:
+        """
+        Create bucket.
+
+        Args:
+            limit (int): Commands allowed per window
+            window (float): Window length in seconds
+            reserved (int): Tokens only priority commands may take
+        """
+        self._capacity = limit / 2
+        self._rate = limit / 2 / window
+        self._reserved = reserved
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+
+    def take(self, priority: bool) -> float:
+        """
+        Take a token if there is one.
+
+        Args:
+            priority (bool): If the reserved tokens may be used
+
+        Returns:
+            float: 0 if a token was taken, else the seconds until one is available
+        """
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+        floor = 0 if priority else self._reserved
+        if self._tokens >= floor + 1:
+            self._tokens -= 1
+            return 0.0
+        return (floor + 1 - self._tokens) / self._rate
+
+
+class _OutboundCommand:
+    """A command waiting in the send queue."""
+
+    __slots__ = ("payload", "queued_at", "sent")
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        """
+        Create command.
+
+        Args:
+            payload (dict[str, Any]): The gateway payload
+        """
+        self.payload = payload
+        self.queued_at = time.monotonic()
+        self.sent: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+
 # https://discord.com/developers/docs/topics/gateway
 class Gateway:
     """Handle connection to discord gateway."""
@@ -94,6 +181,43 @@ class Gateway:
         self._ws = None
         self._waiters: list[_EventWaiter[Any]] = []
         self._last_sequence: int | None = None
+        # dispatches parsed but not handled yet, these have to be replayed when resuming.
+        self._pending_sequences: set[int] = set()
+        self._session_id: str | None = None
+        self._resume_gateway_url: str | None = None
+        self.latency: float | None = None
+        self._bucket = _TokenBucket(
+            GATEWAY_SEND_LIMIT, GATEWAY_SEND_WINDOW, _HEARTBEAT_RESERVE
+        )
+        self._outbound: deque[_OutboundCommand] = deque()
+        self._outbound_ready = asyncio.Event()
+        # the presence update still in the queue, a newer one replaces its payload.
+        self._queued_presence: _OutboundCommand | None = None
+        # chunks of running `request_members` calls by their nonce.
+        # queued with the task handling them, in the order they arrive.
+        self._chunk_queues: dict[str, asyncio.Queue[_QueuedChunk]] = {}
+
+    @property
+    def session(self) -> SessionState | None:
+        """
+        The current session, used to resume it later.
+
+        Returns:
+            SessionState | None: The session, or None before the gateway is ready
+        """
+        if self._session_id is None:
+            return None
+
+        sequence = self._last_sequence
+        if self._pending_sequences:
+            sequence = min(self._pending_sequences) - 1
+        application_id = self._client.api.application_id
+        return SessionState(
+            self._session_id,
+            sequence,
+            self._resume_gateway_url,
+            int(application_id) if application_id is not None else None,
+        )
 
     def _parse_event(self, response: GatewayResponse) -> events.Event:
         """
@@ -109,7 +233,9 @@ class Gateway:
         op = response["op"]
         data = response["d"]
         type_ = response["t"]
-        self._last_sequence = response["s"]
+        # only dispatches have a sequence, the others would reset it to None.
+        if response["s"] is not None:
+            self._last_sequence = response["s"]
 
         event_type = event_map_manager.get_type(op, type_)
         return event_type(self._client, data)
@@ -126,9 +252,210 @@ class Gateway:
         """
         waiter = _EventWaiter(event_type)
         self._waiters.append(waiter)
-        return await waiter.wait()
+        try:
+            return await waiter.wait()
+        finally:
+            # also when cancelled, like the losing waits of `_wait_for_first`.
+            self._waiters.remove(waiter)
+
+    async def _wait_for_first(self, *event_types: type[events.Event]) -> events.Event:
+        """
+        Wait for the first of multiple events.
+
+        Args:
+            *event_types (type[events.Event]): The event types to wait for.
+
+        Returns:
+            events.Event: The event that happend first.
+        """
+        waits = [asyncio.create_task(self.wait_for(type_)) for type_ in event_types]
+        done, pending = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            _ = task.cancel()
+        return done.pop().result()
+
+    async def _send(self, payload: dict[str, Any]) -> None:
+        """
+        Send a command within the gateway send rate limit.
+
+        Heartbeats skip the queue and may use the reserved capacity,
+        every other command waits in the queue for its turn.
+        A presence update replaces the payload of one that is still queued instead of queueing another.
+
+        Args:
+            payload (dict[str, Any]): The gateway payload
+
+        Raises:
+            ValueError: socket was not open
+        """
+        # https://discord.com/developers/docs/topics/gateway#rate-limiting
+        if self._ws is None:
+            raise ValueError("Socket not open.")
+
+        metrics = self._client.metrics
+        op = payload["op"]
+        if op == _HEARTBEAT_OP:
+            queued_at = time.monotonic()
+            while wait := self._bucket.take(priority=True):
+                await asyncio.sleep(wait)
+            metrics.gateway_send_wait_seconds.observe(
+                time.monotonic() - queued_at, str(op)
+            )
+            await self._ws.send_json(payload)
+            return
+
+        command = self._queued_presence if op == _PRESENCE_UPDATE_OP else None
+        if command is not None:
+            command.payload = payload
+            metrics.gateway_commands_coalesced.inc(str(op))
+        else:
+            command = _OutboundCommand(payload)
+            self._outbound.append(command)
+            self._outbound_ready.set()
+            if op == _PRESENCE_UPDATE_OP:
+                self._queued_presence = command
+
+        # shielded, a cancelled caller should not cancel a command others may share.
+        await asyncio.shield(command.sent)
+
+    async def _send_loop(self) -> None:
+        """
+        Send the queued commands as the rate limit allows.
+
+        Raises:
+            ValueError: socket was not open
+        """
+        if self._ws is None:
+            raise ValueError("Socket not open.")
+
+        metrics = self._client.metrics
+        try:
+            while True:
+                if not self._outbound:
+                    self._outbound_ready.clear()
+                    _ = await self._outbound_ready.wait()
+                    continue
+                if wait := self._bucket.take(priority=False):
+                    await asyncio.sleep(wait)
+                    continue
+
+                command = self._outbound.popleft()
+                if command is self._queued_presence:
+                    self._queued_presence = None
+                op = str(command.payload["op"])
+                metrics.gateway_send_wait_seconds.observe(
+                    time.monotonic() - command.queued_at, op
+                )
+                try:
+                    await self._ws.send_json(command.payload)
+                except Exception as error:  # noqa: B902
+                    # the socket is broken, the caller gets the error and the loop stops like the read loop.
+                    command.sent.set_exception(error)
+                    raise
+                command.sent.set_result(None)
+        finally:
+            for command in self._outbound:
+                _ = command.sent.cancel()
+            self._outbound.clear()
+            self._queued_presence = None
+
+    async def update_presence(
+        self,
+        status: str,
+        activities: list[PresenceActivityData],
+        afk: bool,
+        since: int | None,
+    ) -> None:
+        """
+        Change the presence of the bot.
 
-    async def start(self, url: str, oauth: str, intents: datatypes.Intents) -> None:
+        Args:
+            status (str): "online", "dnd", "idle", "invisible" or "offline"
+            activities (list[PresenceActivityData]): The activities of the bot
+            afk (bool): If the bot is afk
+            since (int, optional): Unix time in milliseconds the bot went idle
+        """
+        # https://discord.com/developers/docs/topics/gateway#update-presence
+        data: UpdatePresenceData = {
+            "since": since,
+            "activities": activities,
+            "status": status,
+            "afk": afk,
+        }
+        await self._send({"op": _PRESENCE_UPDATE_OP, "d": data})
+
+    async def request_members(
+        self,
+        guild_id: int,
+        *,
+        query: str = "",
+        limit: int = 0,
+        user_ids: list[int] | None = None,
+        presences: bool = False,
+        timeout: float = 30.0,
+    ) -> AsyncIterator[events.GuildMembersChunk]:
+        """
+        Request members of a guild and iterate over the chunks discord answers with.
+
+        Chunks are handed over in the order they arrive, each once its handlers ran and its members are cached.
+        The read loop can not wait for a slow consumer,
+        so chunks that arrived but were not consumed yet are buffered until they are.
+
+        Args:
+            guild_id (int): Guild to request members of
+            query (str): Only members whose username starts with this, "" for all members. Defaults to "".
+            limit (int): Maximum amount of members, 0 for no limit. Defaults to 0.
+            user_ids (list[int], optional): Request these members instead of using a query. Defaults to None.
+            presences (bool): Include the presences of the members. Defaults to False.
+            timeout (float): Seconds to wait for the next chunk. Defaults to 30.0.
+
+        Yields:
+            events.GuildMembersChunk: The chunks, in the order they arrive
+
+        Raises:
+            ValueError: Both query and user_ids given, or more than 100 user ids.
+        """
+        # https://discord.com/developers/docs/topics/gateway#request-guild-members
+        if query and user_ids is not None:
+            raise ValueError("query and user_ids can not be used together")
+        if user_ids is not None and len(user_ids) > 100:
+            raise ValueError("at most 100 user ids can be requested at once")
+
+        nonce = secrets.token_hex(16)
+        data: RequestGuildMembersData = {
+            "guild_id": guild_id,
+            "limit": limit,
+            "presences": presences,
+            "nonce": nonce,
+        }
+        if user_ids is not None:
+            data["user_ids"] = user_ids
+        else:
+            data["query"] = query
+
+        chunks: asyncio.Queue[_QueuedChunk] = asyncio.Queue()
+        self._chunk_queues[nonce] = chunks
+        try:
+            await self._send({"op": 8, "d": data})
+            received = 0
+            while True:
+                chunk, handled = await asyncio.wait_for(chunks.get(), timeout)
+                # not awaited directly, a failing user handler should not end the iteration.
+                _ = await asyncio.wait((handled,))
+                received += 1
+                yield chunk
+                if received >= chunk.chunk_count:
+                    return
+        finally:
+            del self._chunk_queues[nonce]
+
+    async def start(
+        self,
+        url: str,
+        oauth: str,
+        intents: datatypes.Intents,
+        session: SessionState | None = None,
+    ) -> None:
         """
         Start the gateway.
 
@@ -136,9 +463,12 @@ class Gateway:
             url (str): Url to connect to
             oauth (str): Discord bot oauth token.
             intents (datatypes.Intents): Intents to pass to discord.
+            session (SessionState, optional): Session to resume instead of identifying. Defaults to None.
         """
         # https://discord.com/developers/docs/topics/gateway#connecting-to-the-gateway
         logger.info("starting gateway")
+        if session is not None and session.resume_gateway_url is not None:
+            url = session.resume_gateway_url
         self._ws = await self._session.ws_connect(
             url,
             params={
@@ -148,6 +478,7 @@ class Gateway:
         )
 
         self._client.task_manger.add_task(asyncio.create_task(self._read_loop()))
+        self._client.task_manger.add_task(asyncio.create_task(self._send_loop()))
         logger.info("waiting for hello")
         hello = await self.wait_for(events.Hello)
 
@@ -155,9 +486,74 @@ class Gateway:
             asyncio.create_task(self._hearthbeat(hello.heartbeat_interval / 1000))
         )
 
+        if session is not None and await self._resume(oauth, session):
+            return
+
+        await self._identify(oauth, intents)
+
+    async def _resume(self, oauth: str, session: SessionState) -> bool:
+        """
+        Try to resume a earlier session.
+
+        Args:
+            oauth (str): Discord bot oauth token.
+            session (SessionState): The session to resume
+
+        Raises:
+            ValueError: socket was not open
+
+        Returns:
+            bool: If the session was resumed, when not the cache is cleared and we have to identify
+        """
+        # https://discord.com/developers/docs/topics/gateway#resuming
+        if self._ws is None:
+            raise ValueError("Socket not open.")
+
+        logger.info(f"resuming session {session.session_id} at {session.sequence}")
+        self._session_id = session.session_id
+        self._resume_gateway_url = session.resume_gateway_url
+        self._last_sequence = session.sequence
+        await self._send(
+            {
+                "op": 6,
+                "d": {
+                    "token": oauth,
+                    "session_id": session.session_id,
+                    "seq": session.sequence,
+                },
+            }
+        )
+
+        result = await self._wait_for_first(events.Resumed, events.InvalidSession)
+        if isinstance(result, events.Resumed):
+            logger.info("resumed")
+            return True
+
+        logger.info("session can not be resumed, identifying")
+        self._session_id = self._resume_gateway_url = self._last_sequence = None
+        # the cached state is from the old session and will not be corrected by replayed events.
+        self._client.cache.clear()
+        # discord asks to wait a random 1-5 seconds before identifying again.
+        await asyncio.sleep(1 + random.random() * 4)  # noqa: S311 DUO102
+        return False
+
+    async def _identify(self, oauth: str, intents: datatypes.Intents) -> None:
+        """
+        Start a new session.
+
+        Args:
+            oauth (str): Discord bot oauth token.
+            intents (datatypes.Intents): Intents to pass to discord.
+
+        Raises:
+            ValueError: socket was not open
+        """
         # https://discord.com/developers/docs/topics/gateway#identify
+        if self._ws is None:
+            raise ValueError("Socket not open.")
+
         logger.info("identifying")
-        await self._ws.send_json(
+        await self._send(
             {
                 "op": 2,
                 "d": {
@@ -172,7 +568,9 @@ class Gateway:
             }
         )
 
-        _ = await self.wait_for(events.Ready)
+        ready = await self.wait_for(events.Ready)
+        self._session_id = ready.session_id
+        self._resume_gateway_url = ready.resume_gateway_url
 
     async def close(self) -> None:
         """
@@ -198,11 +596,56 @@ class Gateway:
         if self._ws is None:
             raise ValueError("Socket not open.")
 
+        metrics = self._client.metrics
+        tracer = self._client.tracer
         while True:
-            data = await self._ws.receive_json()
-            event = self._parse_event(data)
-            event_task = asyncio.create_task(self._on_event(event))
-            self._client.task_manger.add_task(event_task)
+            raw = await self._ws.receive_str()
+
+            trace = tracer.start_trace()
+            try:
+                with tracer.span("gateway.decode", size=len(raw)):
+                    data: GatewayResponse = json.loads(raw)
+
+                parse_start = time.perf_counter()
+                try:
+                    with tracer.span("gateway.parse", type=data["t"]):
+                        event = self._parse_event(data)
+                except (KeyError, TypeError, ValueError):
+                    # a single bad payload should not stop us from reading the next ones.
+                    logger.exception(f"failed to parse {data['t'] or data['op']} event")
+                    continue
+                metrics.gateway_parse_seconds.observe(time.perf_counter() - parse_start)
+                metrics.gateway_events.inc(str(data["op"]), data["t"] or "")
+
+                # the task copies the current context, so it keeps the trace id.
+                metrics.dispatch_queue_depth.inc()
+                if data["s"] is not None:
+                    self._pending_sequences.add(data["s"])
+                event_task = asyncio.create_task(self._on_event(event, data["s"]))
+                self._client.task_manger.add_task(event_task)
+                if (
+                    isinstance(event, events.GuildMembersChunk)
+                    and event.nonce is not None
+                ):
+                    self._queue_chunk(event, event_task)
+            finally:
+                tracer.end_trace(trace)
+
+    def _queue_chunk(
+        self, chunk: events.GuildMembersChunk, handled: asyncio.Task[None]
+    ) -> None:
+        """
+        Hand a member chunk to the `request_members` call waiting for it.
+
+        Queued from the read loop rather than the event task, so a slow handler can not reorder chunks.
+
+        Args:
+            chunk (events.GuildMembersChunk): The chunk
+            handled (asyncio.Task[None]): Task running the handlers of the chunk
+        """
+        chunks = self._chunk_queues.get(chunk.nonce or "")
+        if chunks is not None:
+            chunks.put_nowait((chunk, handled))
 
     async def _hearthbeat(self, interval: float) -> None:
         """
@@ -220,22 +663,33 @@ class Gateway:
 
         await asyncio.sleep(interval * random.random(), None)  # noqa: S311 DUO102
         while True:
-            await self._ws.send_json({"op": 1, "d": self._last_sequence})
+            sent_at = time.monotonic()
+            await self._send({"op": 1, "d": self._last_sequence})
             _ = await self.wait_for(events.HearthbeatACK)
+
+            self.latency = time.monotonic() - sent_at
+            self._client.lag_monitor.record_heartbeat(self.latency)
+            self._client.metrics.heartbeat_rtt_seconds.observe(self.latency)
             await asyncio.sleep(interval, None)
 
-    async def _on_event(self, event: events.Event) -> None:
+    async def _on_event(self, event: events.Event, sequence: int | None) -> None:
         """
         Handle a event.
 
         Args:
             event (events.Event): The event to handle.
+            sequence (int | None): Sequence number of the event, if it is a dispatch.
         """
-        logger.debug(f"got event: {event}")
-
-        # handle waiters
-        for waiter in self._waiters:
-            if waiter.is_event(type(event)):
-                waiter.give(event)
-
-        await self._client.handle_event(event)
+        _logging.sampled_debug("gateway event", "got event: {}", event)
+
+        try:
+            # handle waiters
+            for waiter in self._waiters:
+                if waiter.is_event(type(event)):
+                    waiter.give(event)
+
+            await self._client.handle_event(event)
+        finally:
+            self._client.metrics.dispatch_queue_depth.dec()
+            if sequence is not None:
+                self._pending_sequences.discard(sequence)
@@ -0,0 +1,153 @@
+"""
+Cheap logging for hot paths.
+
+Messages are passed as a loguru format string plus arguments,
+so nothing is formatted unless a handler actually wants the record.
+
+Setting the `VIVCORD_HOT_LOG_LEVEL` environment variable (for example to `INFO`)
+replaces the hot path functions below that level with a no-op at import time,
+so disabled calls cost a single function call.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from typing import Callable, Mapping
+
+HOT_PATH_LEVEL = os.environ.get("VIVCORD_HOT_LOG_LEVEL", "DEBUG")
+
+# default amount of messages per second allowed for every sampled key.
+SAMPLE_RATE = float(os.environ.get("VIVCORD_LOG_SAMPLE_RATE", "10"))
+
+REDACTED_HEADERS = frozenset({"authorization", "cookie", "set-cookie"})
+
+
+def _noop(message: str, *args: object) -> None:
+    """
+    Do nothing, used in place of disabled log functions.
+
+    Args:
+        message (str): Ignored
+        *args (object): Ignored
+    """
+
+
+def _level_enabled(level: str) -> bool:
+    """
+    Check if a level is at or above the hot path level.
+
+    Args:
+        level (str): Level name
+
+    Returns:
+        bool: If the level should be logged
+    """
+    return logger.level(level).no >= logger.level(HOT_PATH_LEVEL).no
+
+
+def redact_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    """
+    Copy headers with credentials replaced.
+
+    Args:
+        headers (Mapping[str, str]): Headers to redact
+
+    Returns:
+        dict[str, str]: Headers safe to log
+    """
+    return {
+        name: "<redacted>" if name.lower() in REDACTED_HEADERS else value
+        for name, value in headers.items()
+    }
+
+
+class RedactedHeaders:
+    """Log argument that only redacts the headers when it is formatted."""
+
+    __slots__ = ("_headers",)
+
+    def __init__(self, headers: Mapping[str, str]) -> None:
+        """
+        Wrap headers.
+
+        Args:
+            headers (Mapping[str, str]): Headers to redact when formatted
+        """
+        self._headers = headers
+
+    def __str__(self) -> str:
+        return repr(redact_headers(self._headers))
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class _Sampler:
+    """Allow a limited amount of messages per key every second."""
+
+    def __init__(self, per_second: float) -> None:
+        """
+        Create a sampler.
+
+        Args:
+            per_second (float): Messages allowed per key every second
+        """
+        self.per_second = per_second
+        # key -> (window start, messages in window, suppressed messages in window)
+        self._windows: dict[str, tuple[float, int, int]] = {}
+
+    def allow(self, key: str) -> tuple[bool, int]:
+        """
+        Check if a message for key may be logged.
+
+        Args:
+            key (str): Kind of message
+
+        Returns:
+            tuple[bool, int]: If it may be logged, and how many messages were dropped in the previous window
+        """
+        now = time.monotonic()
+        start, count, suppressed = self._windows.get(key, (now, 0, 0))
+
+        dropped = 0
+        if now - start >= 1:
+            dropped = suppressed
+            start, count, suppressed = now, 0, 0
+
+        if count >= self.per_second:
+            self._windows[key] = (start, count, suppressed + 1)
+            return False, dropped
+
+        self._windows[key] = (start, count + 1, suppressed)
+        return True, dropped
+
+
+_sampler = _Sampler(SAMPLE_RATE)
+
+
+def _sampled_debug(key: str, message: str, *args: object) -> None:
+    """
+    Log at debug level, keeping at most `SAMPLE_RATE` messages per second for key.
+
+    Args:
+        key (str): Kind of message, every key is sampled separately
+        message (str): loguru format string
+        *args (object): Format arguments
+    """
+    allowed, dropped = _sampler.allow(key)
+    if dropped:
+        logger.opt(depth=1).debug("dropped {} {!r} log messages", dropped, key)
+    if allowed:
+        logger.opt(depth=1).debug(message, *args)
+
+
+debug: Callable[..., None] = logger.debug if _level_enabled("DEBUG") else _noop
+sampled_debug: Callable[..., None] = (
+    _sampled_debug if _level_enabled("DEBUG") else _noop
+)
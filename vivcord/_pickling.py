@@ -0,0 +1,71 @@
+"""Pickle entities without the client they belong to."""
+
+from __future__ import annotations
+
+import io
+import pickle  # noqa: S403
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from vivcord.client import Client
+
+# written in place of the client, the unpickling side puts its own client (or None) back.
+_CLIENT_MARKER = "vivcord.client"
+
+
+class _ClientPickler(pickle.Pickler):
+    """Pickler that stores a marker instead of the client."""
+
+    def __init__(self, file: io.BytesIO, client: Client | None) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._client = client
+
+    def persistent_id(self, obj: Any) -> str | None:  # noqa: ANN401
+        if obj is self._client:
+            return _CLIENT_MARKER
+        return None
+
+
+class _ClientUnpickler(pickle.Unpickler):  # noqa: S301
+    """Unpickler that puts the given client back in place of the marker."""
+
+    def __init__(self, file: io.BytesIO, client: Client | None) -> None:
+        super().__init__(file)
+        self._client = client
+
+    def persistent_load(self, pid: Any) -> Client | None:  # noqa: ANN401
+        if pid != _CLIENT_MARKER:
+            raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+        return self._client
+
+
+def dumps(client: Client | None, value: Any) -> bytes:  # noqa: ANN401
+    """
+    Pickle a value without the client.
+
+    Args:
+        client (Client, optional): Client to leave out
+        value (Any): Value to pickle
+
+    Returns:
+        bytes: The pickled value
+    """
+    buffer = io.BytesIO()
+    _ClientPickler(buffer, client).dump(value)
+    return buffer.getvalue()
+
+
+def loads(client: Client | None, data: bytes | memoryview) -> Any:  # noqa: ANN401
+    """
+    Unpickle a value pickled by `dumps`, attaching it to the client.
+
+    Args:
+        client (Client, optional): Client to attach, None in worker processes that have no client
+        data (bytes | memoryview): The pickled value
+
+    Returns:
+        Any: The value
+    """
+    return _ClientUnpickler(io.BytesIO(data), client).load()
@@ -0,0 +1,116 @@
+"""Route interactions to the command, subcommand or grouped subcommand handling them."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from vivcord import commands
+
+if TYPE_CHECKING:
+    from vivcord import _typed_dicts as type_dicts
+    from vivcord import traits
+
+
+class _RouteNode:
+    """A node of the routing trie, either a command or the names below it."""
+
+    __slots__ = ("command", "children")
+
+    def __init__(self) -> None:
+        self.command: commands.SlashCommand[Any] | None = None
+        self.children: dict[str, _RouteNode] = {}
+
+
+def _build(
+    command: commands.SlashCommand[Any]
+    | commands.SlashCommandGroup
+    | commands.SubcommandGroup,
+) -> _RouteNode:
+    """
+    Build the routing trie below a command, compiling the subcommands that were not compiled yet.
+
+    Args:
+        command (commands.SlashCommand[Any] | commands.SlashCommandGroup | commands.SubcommandGroup): The command
+
+    Returns:
+        _RouteNode: The node of the command
+    """
+    node = _RouteNode()
+    if isinstance(command, commands.SlashCommand):
+        node.command = command
+        # compiled once, compiling again would reset the cooldowns of the limiter.
+        if command.binder is None:
+            _ = command.compile()
+        return node
+
+    for name, subcommand in command.subcommands.items():
+        node.children[name] = _build(subcommand)
+    return node
+
+
+class CommandRouter:
+    """
+    Routing trie from (name, group, subcommand) to the slash command handling it.
+
+    Subcommands can still be added to a group after it was registered,
+    so the trie is built when the commands are sent to discord or on the first interaction after a change.
+    Routing a interaction is then a single walk down the trie.
+    """
+
+    def __init__(self) -> None:
+        """Create a empty router."""
+        self._commands: dict[
+            str, commands.SlashCommand[Any] | commands.SlashCommandGroup
+        ] = {}
+        self._root: _RouteNode | None = None
+
+    def add(self, command: traits.ApplicationCommand) -> None:
+        """
+        Add or replace a top level command.
+
+        Args:
+            command (traits.ApplicationCommand): The command, commands that are not slash commands are ignored
+        """
+        if isinstance(command, (commands.SlashCommand, commands.SlashCommandGroup)):
+            self._commands[command.name] = command
+            self._root = None
+
+    def build(self) -> _RouteNode:
+        """
+        (Re)build the trie from the current subcommands of the added commands.
+
+        Returns:
+            _RouteNode: The root of the trie
+        """
+        root = _RouteNode()
+        for name, command in self._commands.items():
+            root.children[name] = _build(command)
+        self._root = root
+        return root
+
+    def route(
+        self, name: str, options: list[type_dicts.CommandOptionResult]
+    ) -> tuple[commands.SlashCommand[Any], list[type_dicts.CommandOptionResult]] | None:
+        """
+        Find the command a interaction is for.
+
+        Args:
+            name (str): Name of the invoked top level command
+            options (list[type_dicts.CommandOptionResult]): Options of the interaction
+
+        Returns:
+            tuple[commands.SlashCommand[Any], list[type_dicts.CommandOptionResult]] | None:
+                The command and the options meant for it, or None if no command matches
+        """
+        root = self._root if self._root is not None else self.build()
+        node = root.children.get(name)
+        while node is not None:
+            if node.command is not None:
+                return node.command, options
+            if not options:
+                return None
+            # a subcommand or subcommand group is the only option of its parent.
+            option = options[0]
+            node = node.children.get(option["name"])
+            options = option.get("options", [])
+        return None
@@ -122,9 +122,9 @@ class ChannelData(TypedDict, total=False):
     video_quality_mode: int
     message_count: int
     member_count: int
-    thread_metadate: ThreadMetadataData
+    thread_metadata: ThreadMetadataData
     member: ThreadMemberData
-    default_audio_archive_duration: int
+    default_auto_archive_duration: int
     permissions: str
 
 
@@ -146,6 +146,7 @@ class ThreadMetadataData(TypedDict):
     locked: bool
 
     invitable: NotRequired[bool]
+    create_timestamp: NotRequired[str | None]
 
 
 class ThreadMemberData(TypedDict, total=False):
@@ -186,7 +187,7 @@ class MessageData(TypedDict, total=False):
     application_id: int
     message_reference: MessageReferenceData
     flags: int
-    referenced_message: MemberData | None
+    referenced_message: MessageData | None
     interaction: MessageInteractionData
     thread: ChannelData
     components: list[ComponentData]
@@ -199,6 +200,7 @@ class SendMessageData(TypedDict, total=False):
 
     content: str
     embeds: list[EmbedData]
+    flags: int
 
 
 class ChannelMentionData(TypedDict):
@@ -324,7 +326,7 @@ class ReactionData(TypedDict):
     emoji: EmojiData
 
 
-class EmojiData(TypedDict):
+class EmojiData(TypedDict, total=False):
     """Emoji data."""
 
     id: Required[int | None]  # noqa: A003
@@ -657,9 +659,157 @@ class ReadyEventData(TypedDict):
     user: UserData
     guilds: list[GuildData]  # we dont use this
     session_id: str
+    resume_gateway_url: NotRequired[str]
     application: ApplicationData
 
 
+# https://discord.com/developers/docs/resources/guild#unavailable-guild-object
+class UnavailableGuildData(TypedDict, total=False):
+    """A guild that is not available, sent in GUILD_DELETE."""
+
+    id: Required[int]  # noqa: A003
+    unavailable: bool
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-member-add-guild-member-add-extra-fields
+class GuildMemberAddEventData(MemberData, total=False):
+    """Data for the guild member add event."""
+
+    guild_id: Required[int]
+
+
+# https://discord.com/developers/docs/topics/gateway#thread-delete
+class ThreadDeleteEventData(TypedDict):
+    """Data for the thread delete event."""
+
+    id: int  # noqa: A003
+    guild_id: int
+    parent_id: int
+    type: int  # noqa: A003
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-emojis-update
+class GuildEmojisUpdateEventData(TypedDict):
+    """Data for the guild emojis update event."""
+
+    guild_id: int
+    emojis: list[EmojiData]
+
+
+# https://discord.com/developers/docs/topics/gateway#message-create
+class MessageCreateEventData(MessageData, total=False):
+    """Data for the message create and update events."""
+
+    guild_id: int
+
+
+# https://discord.com/developers/docs/topics/gateway#message-delete
+class MessageDeleteEventData(TypedDict):
+    """Data for the message delete event."""
+
+    id: int  # noqa: A003
+    channel_id: int
+    guild_id: NotRequired[int]
+
+
+# https://discord.com/developers/docs/topics/gateway#message-delete-bulk
+class MessageDeleteBulkEventData(TypedDict):
+    """Data for the message delete bulk event."""
+
+    ids: list[int]
+    channel_id: int
+    guild_id: NotRequired[int]
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-role-create-guild-role-create-event-fields
+class GuildRoleEventData(TypedDict):
+    """Data for the guild role create and update events."""
+
+    guild_id: int
+    role: RoleData
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-role-delete-guild-role-delete-event-fields
+class GuildRoleDeleteEventData(TypedDict):
+    """Data for the guild role delete event."""
+
+    guild_id: int
+    role_id: int
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-member-update-guild-member-update-event-fields
+class GuildMemberUpdateEventData(TypedDict, total=False):
+    """Data for the guild member update event."""
+
+    guild_id: Required[int]
+    roles: Required[list[int]]
+    user: Required[UserData]
+    joined_at: Required[str | None]
+
+    nick: str | None
+    avatar: str | None
+    premium_since: str | None
+    deaf: bool
+    mute: bool
+    pending: bool
+    communication_disabled_until: str | None
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-member-remove-guild-member-remove-event-fields
+class GuildMemberRemoveEventData(TypedDict):
+    """Data for the guild member remove event."""
+
+    guild_id: int
+    user: UserData
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-members-chunk-guild-members-chunk-event-fields
+class GuildMembersChunkEventData(TypedDict):
+    """Data for the guild members chunk event."""
+
+    guild_id: int
+    members: list[MemberData]
+    chunk_index: int
+    chunk_count: int
+
+    not_found: NotRequired[list[int]]
+    presences: NotRequired[list[PresenceUpdateData]]
+    nonce: NotRequired[str]
+
+
+# https://discord.com/developers/docs/topics/gateway#request-guild-members-guild-request-members-structure
+class RequestGuildMembersData(TypedDict, total=False):
+    """Payload of the request guild members command."""
+
+    guild_id: Required[int]
+    limit: Required[int]
+
+    query: str
+    presences: bool
+    user_ids: list[int]
+    nonce: str
+
+
+# https://discord.com/developers/docs/topics/gateway#update-presence-gateway-presence-update-structure
+class UpdatePresenceData(TypedDict):
+    """Payload of the update presence command."""
+
+    since: int | None
+    activities: list[PresenceActivityData]
+    status: str
+    afk: bool
+
+
+# https://discord.com/developers/docs/topics/gateway#activity-object-activity-structure
+class PresenceActivityData(TypedDict):
+    """Activity the bot can set, a subset of `ActivityData`."""
+
+    name: str
+    type: int  # noqa: A003
+
+    url: NotRequired[str | None]
+
+
 # https://discord.com/developers/docs/interactions/application-commands#application-command-object
 class CommandStructure(TypedDict, total=False):
     """Application command structure."""
@@ -746,6 +896,7 @@ class CommandOptionResult(TypedDict, total=False):
     type: Required[int]  # noqa: A003
 
     value: str | int | float
+    options: list[CommandOptionResult]
     focused: bool
 
 
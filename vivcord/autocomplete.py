@@ -0,0 +1,188 @@
+"""
+Answer autocomplete interactions.
+
+Autocomplete fires on every keystroke and has to be answered within 3 seconds,
+so provider results are cached per option and a request that was superseded by a newer one
+from the same user is cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Generic, Iterable, TypeVar
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from vivcord import commands, context
+
+ChoiceT = TypeVar("ChoiceT", str, int, float)
+
+# https://discord.com/developers/docs/interactions/receiving-and-responding#interaction-response-object-autocomplete
+MAX_CHOICES = 25
+DEADLINE = 3.0
+# time left for sending the response after the provider ran.
+RESPONSE_MARGIN = 0.5
+CACHE_SIZE = 256
+
+
+class PrefixIndex(Generic[ChoiceT]):
+    """
+    Sorted index of a static choice list, finding the choices whose name starts with the input.
+
+    A lookup is a binary search, so it stays fast for tens of thousands of choices.
+    The index is a autocomplete provider itself, pass it as the `autocomplete` of a option.
+    """
+
+    def __init__(self, choices: Iterable[commands.CommandChoice[ChoiceT]]) -> None:
+        """
+        Build the index.
+
+        Args:
+            choices (Iterable[commands.CommandChoice[ChoiceT]]): The choices, matched case insensitive by name
+        """
+        # sorted by key only, choices can share a name and are not comparable themselves.
+        entries = sorted(
+            ((choice.name.casefold(), choice) for choice in choices),
+            key=lambda entry: entry[0],
+        )
+        self._keys = [key for key, _ in entries]
+        self._choices = [choice for _, choice in entries]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(
+        self, prefix: str, limit: int = MAX_CHOICES
+    ) -> list[commands.CommandChoice[ChoiceT]]:
+        """
+        Find the choices starting with a prefix.
+
+        Args:
+            prefix (str): The typed input
+            limit (int): Maximum amount of choices. Defaults to MAX_CHOICES.
+
+        Returns:
+            list[commands.CommandChoice[ChoiceT]]: The matching choices, sorted by name
+        """
+        prefix = prefix.casefold()
+        start = bisect_left(self._keys, prefix)
+        end = start
+        stop = min(len(self._keys), start + limit)
+        while end < stop and self._keys[end].startswith(prefix):
+            end += 1
+        return self._choices[start:end]
+
+    async def __call__(self, value: str) -> list[commands.CommandChoice[ChoiceT]]:
+        """
+        Autocomplete provider interface.
+
+        Args:
+            value (str): The typed input
+
+        Returns:
+            list[commands.CommandChoice[ChoiceT]]: The matching choices
+        """
+        return self.search(value)
+
+
+class Autocompleter(Generic[ChoiceT]):
+    """The provider of a option, with a LRU cache of its results by input."""
+
+    def __init__(
+        self, provider: commands.AutocompleteFunc[ChoiceT], cache_size: int = CACHE_SIZE
+    ) -> None:
+        """
+        Wrap a provider.
+
+        Args:
+            provider (commands.AutocompleteFunc[ChoiceT]): The autocomplete provider of the option
+            cache_size (int): Inputs to keep the results of. Defaults to CACHE_SIZE.
+        """
+        self._provider = provider
+        self._cache_size = cache_size
+        self._cache: OrderedDict[
+            str, list[commands.CommandChoice[ChoiceT]]
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def complete(self, value: str) -> list[commands.CommandChoice[ChoiceT]]:
+        """
+        Get the choices for a input.
+
+        Args:
+            value (str): The typed input
+
+        Returns:
+            list[commands.CommandChoice[ChoiceT]]: At most MAX_CHOICES choices
+        """
+        choices = self._cache.get(value)
+        if choices is not None:
+            self.hits += 1
+            self._cache.move_to_end(value)
+            return choices
+
+        self.misses += 1
+        choices = (await self._provider(value))[:MAX_CHOICES]
+        self._cache[value] = choices
+        if len(self._cache) > self._cache_size:
+            _ = self._cache.popitem(last=False)
+        return choices
+
+
+class AutocompleteDispatcher:
+    """Runs autocomplete requests, at most one per user at a time."""
+
+    def __init__(self) -> None:
+        """Create dispatcher."""
+        self._in_flight: dict[int, asyncio.Task[list[commands.CommandChoice[Any]]]] = {}
+        self.superseded = 0
+        self.timed_out = 0
+
+    async def run(
+        self,
+        ctx: context.AutocompleteContext,
+        autocompleter: Autocompleter[Any],
+        value: str,
+    ) -> None:
+        """
+        Answer a autocomplete request.
+
+        A earlier request of the same user that is still running is cancelled without being answered.
+        When the provider does not finish in time no choices are sent.
+
+        Args:
+            ctx (context.AutocompleteContext): The request
+            autocompleter (Autocompleter[Any]): Autocompleter of the focused option
+            value (str): The typed input
+
+        Raises:
+            asyncio.CancelledError: The request was cancelled for another reason than being superseded.
+        """
+        task = asyncio.ensure_future(autocompleter.complete(value))
+        previous = self._in_flight.get(ctx.user_id)
+        self._in_flight[ctx.user_id] = task
+        if previous is not None and not previous.done():
+            self.superseded += 1
+            _ = previous.cancel()
+
+        remaining = ctx.received_at + DEADLINE - RESPONSE_MARGIN - time.monotonic()
+        try:
+            choices = await asyncio.wait_for(task, max(0, remaining))
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.warning(f"autocomplete for {value!r} did not finish in time")
+            choices = []
+        except asyncio.CancelledError:
+            if task.cancelled() and self._in_flight.get(ctx.user_id) is not task:
+                return
+            raise
+        finally:
+            if self._in_flight.get(ctx.user_id) is task:
+                del self._in_flight[ctx.user_id]
+
+        await ctx.respond(choices)
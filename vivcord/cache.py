@@ -0,0 +1,990 @@
+"""In memory state built from gateway events."""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
+
+from vivcord import events
+from vivcord.memberstore import CompactMemberStore, MemberKey
+from vivcord.sharedcache import SharedCacheWriter, SharedStore
+from vivcord.traits import CacheStore, K, V
+
+if TYPE_CHECKING:
+    from typing import Callable, Iterator
+
+    from vivcord import datatypes
+    from vivcord.client import Client
+
+CacheKind = Literal["none", "lru", "ttl", "full", "compact", "shared"]
+
+
+class NoCache(CacheStore[K, V]):
+    """Store that never keeps anything."""
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a cached value.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: Always None
+        """
+        return None
+
+    def set(self, key: K, value: V) -> None:  # noqa: A003
+        """
+        Drop the value.
+
+        Args:
+            key (K): Key of the value
+            value (V): The value
+        """
+
+    def pop(self, key: K) -> V | None:
+        """
+        Remove a cached value.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: Always None
+        """
+        return None
+
+    def keys(self) -> Iterator[K]:
+        """
+        Iterate over the cached keys.
+
+        Returns:
+            Iterator[K]: Always empty
+        """
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+
+class FullCache(CacheStore[K, V]):
+    """Store that keeps everything until it is removed by a event."""
+
+    def __init__(self) -> None:
+        """Create a unbounded store."""
+        super().__init__()
+        self._data: dict[K, V] = {}
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a cached value.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: The value, or None if it is not cached
+        """
+        return self._data.get(key)
+
+    def set(self, key: K, value: V) -> None:  # noqa: A003
+        """
+        Cache a value.
+
+        Args:
+            key (K): Key of the value
+            value (V): The value
+        """
+        self._data[key] = value
+
+    def pop(self, key: K) -> V | None:
+        """
+        Remove a cached value.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: The removed value, or None if it was not cached
+        """
+        return self._data.pop(key, None)
+
+    def keys(self) -> Iterator[K]:
+        """
+        Iterate over the cached keys.
+
+        Returns:
+            Iterator[K]: The keys
+        """
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        """Remove all cached values."""
+        self._data.clear()
+
+
+class LRUCache(FullCache[K, V]):
+    """Store that evicts the least recently used value once it is full."""
+
+    def __init__(self, max_size: int) -> None:
+        """
+        Create a LRU store.
+
+        Args:
+            max_size (int): Values to keep before evicting
+        """
+        super().__init__()
+        self.max_size = max_size
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a cached value and mark it as recently used.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: The value, or None if it is not cached
+        """
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:  # noqa: A003
+        """
+        Cache a value, evicting the least recently used one if needed.
+
+        Args:
+            key (K): Key of the value
+            value (V): The value
+        """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            _ = self._data.popitem(last=False)
+            self.evictions += 1
+
+
+class TTLCache(CacheStore[K, V]):
+    """
+    Store where values expire a fixed time after they were last set.
+
+    Values are kept in expiry order, so expired values are dropped from the front
+    on every write and checked on every read, without a background task.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int | None = None) -> None:
+        """
+        Create a TTL store.
+
+        Args:
+            ttl_seconds (float): Seconds a value stays valid
+            max_size (int, optional): Values to keep before evicting the oldest. Defaults to None.
+        """
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._data: dict[K, tuple[float, V]] = {}
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a cached value if it has not expired.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: The value, or None if it is not cached or expired
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            self.evictions += 1
+            return None
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:  # noqa: A003
+        """
+        Cache a value.
+
+        Args:
+            key (K): Key of the value
+            value (V): The value
+        """
+        now = time.monotonic()
+        # re-insert so the dict stays sorted by expiry time.
+        _ = self._data.pop(key, None)
+        self._data[key] = (now + self.ttl_seconds, value)
+        self._expire(now)
+
+    def _expire(self, now: float) -> None:
+        """
+        Drop expired values and values over the size limit from the front.
+
+        Args:
+            now (float): Current monotonic time
+        """
+        while self._data:
+            key = next(iter(self._data))
+            if self._data[key][0] > now and (
+                self.max_size is None or len(self._data) <= self.max_size
+            ):
+                break
+            del self._data[key]
+            self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        """
+        Remove a cached value.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: The removed value, or None if it was not cached
+        """
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def keys(self) -> Iterator[K]:
+        """
+        Iterate over the keys that have not expired.
+
+        Returns:
+            Iterator[K]: The keys
+        """
+        now = time.monotonic()
+        return iter([key for key, (expires, _) in self._data.items() if expires > now])
+
+    def __len__(self) -> int:
+        # drop the expired values first, they would otherwise be reported until the next write.
+        self._expire(time.monotonic())
+        return len(self._data)
+
+    def clear(self) -> None:
+        """Remove all cached values."""
+        self._data.clear()
+
+
+class MessageCache(CacheStore[int, "datatypes.Message"]):
+    """
+    Recent messages, kept in a ring buffer per channel with a cap on the total.
+
+    Once a channel holds `per_channel` messages its oldest message is dropped for each new one,
+    and once `max_messages` are cached the oldest message of any channel is dropped.
+    Edits replace a message in place and do not make it newer.
+    """
+
+    def __init__(self, client: Client, per_channel: int, max_messages: int) -> None:
+        """
+        Create a message cache.
+
+        Args:
+            client (Client): Client to report evictions to
+            per_channel (int): Messages to keep per channel
+            max_messages (int): Messages to keep in total
+        """
+        super().__init__()
+        self._client = client
+        self.per_channel = per_channel
+        self.max_messages = max_messages
+        self.evictions_by_reason: dict[str, int] = {"channel": 0, "global": 0}
+
+        # insertion order is age, so the first message is the oldest one cached.
+        self._messages: OrderedDict[int, datatypes.Message] = OrderedDict()
+        self._channels: dict[int, deque[int]] = {}
+
+    def get(self, key: int) -> datatypes.Message | None:
+        """
+        Get a cached message.
+
+        Args:
+            key (int): Id of the message
+
+        Returns:
+            datatypes.Message | None: The message, or None if it is not cached
+        """
+        return self._messages.get(key)
+
+    def set(self, key: int, value: datatypes.Message) -> None:  # noqa: A003
+        """
+        Cache a message, evicting old ones if a limit is reached.
+
+        Args:
+            key (int): Id of the message
+            value (datatypes.Message): The message
+        """
+        if self.per_channel <= 0 or self.max_messages <= 0:
+            return
+        if key in self._messages:
+            self._messages[key] = value
+            return
+
+        channel = self._channels.get(value.channel_id)
+        if channel is None:
+            channel = self._channels[value.channel_id] = deque()
+        elif len(channel) >= self.per_channel:
+            del self._messages[channel.popleft()]
+            self._evicted("channel")
+
+        channel.append(key)
+        self._messages[key] = value
+
+        if len(self._messages) > self.max_messages:
+            # the oldest message overall is also the oldest one of its channel.
+            _, oldest = self._messages.popitem(last=False)
+            oldest_channel = self._channels[oldest.channel_id]
+            _ = oldest_channel.popleft()
+            if not oldest_channel:
+                del self._channels[oldest.channel_id]
+            self._evicted("global")
+
+    def _evicted(self, reason: str) -> None:
+        self.evictions += 1
+        self.evictions_by_reason[reason] += 1
+        self._client.metrics.cache_evictions.inc("message", reason)
+
+    def pop(self, key: int) -> datatypes.Message | None:
+        """
+        Remove a cached message.
+
+        Args:
+            key (int): Id of the message
+
+        Returns:
+            datatypes.Message | None: The removed message, or None if it was not cached
+        """
+        message = self._messages.pop(key, None)
+        if message is not None:
+            channel = self._channels[message.channel_id]
+            channel.remove(key)
+            if not channel:
+                del self._channels[message.channel_id]
+        return message
+
+    def pop_channel(self, channel_id: int) -> None:
+        """
+        Remove every cached message of a channel.
+
+        Args:
+            channel_id (int): Id of the channel
+        """
+        for key in self._channels.pop(channel_id, ()):
+            del self._messages[key]
+
+    def channel_messages(self, channel_id: int) -> list[datatypes.Message]:
+        """
+        Get the cached messages of a channel.
+
+        Args:
+            channel_id (int): Id of the channel
+
+        Returns:
+            list[datatypes.Message]: The messages, oldest first
+        """
+        return [self._messages[key] for key in self._channels.get(channel_id, ())]
+
+    def keys(self) -> Iterator[int]:
+        """
+        Iterate over the cached message ids, oldest first.
+
+        Returns:
+            Iterator[int]: The keys
+        """
+        return iter(list(self._messages))
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def clear(self) -> None:
+        """Remove all cached messages."""
+        self._messages.clear()
+        self._channels.clear()
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How a kind of entity is cached."""
+
+    kind: CacheKind = "full"
+    max_size: int | None = None
+    ttl_seconds: float | None = None
+
+    @classmethod
+    def none(cls) -> CachePolicy:
+        """
+        Do not cache the entity.
+
+        Returns:
+            CachePolicy: The policy
+        """
+        return cls("none")
+
+    @classmethod
+    def lru(cls, max_size: int) -> CachePolicy:
+        """
+        Keep the most recently used entities.
+
+        Args:
+            max_size (int): Entities to keep
+
+        Returns:
+            CachePolicy: The policy
+        """
+        return cls("lru", max_size=max_size)
+
+    @classmethod
+    def ttl(cls, seconds: float, max_size: int | None = None) -> CachePolicy:
+        """
+        Forget entities some time after they were last updated.
+
+        Args:
+            seconds (float): Seconds to keep a entity
+            max_size (int, optional): Entities to keep at most. Defaults to None.
+
+        Returns:
+            CachePolicy: The policy
+        """
+        return cls("ttl", max_size=max_size, ttl_seconds=seconds)
+
+    @classmethod
+    def full(cls) -> CachePolicy:
+        """
+        Keep every entity until discord says it is gone.
+
+        Returns:
+            CachePolicy: The policy
+        """
+        return cls("full")
+
+    @classmethod
+    def compact(cls) -> CachePolicy:
+        """
+        Keep every member in a `CompactMemberStore`, only valid for members.
+
+        The members users are still also cached as objects unless the users policy says otherwise,
+        so pair this with a bounded users policy for the full memory savings.
+
+        Returns:
+            CachePolicy: The policy
+        """
+        return cls("compact")
+
+    @classmethod
+    def shared(cls) -> CachePolicy:
+        """
+        Keep the entity in the memory mapped file set by `CacheConfig.shared_path`.
+
+        Other processes can read it with a `SharedCacheReader`.
+        Every lookup unpickles a new copy, so this is slower than the in process policies.
+
+        Returns:
+            CachePolicy: The policy
+        """
+        return cls("shared")
+
+    def create_store(self, client: Client) -> CacheStore[Any, Any]:
+        """
+        Create a store implementing this policy.
+
+        Args:
+            client (Client): Client the cached entities belong to
+
+        Raises:
+            ValueError: The policy is missing the size or ttl it needs, or is shared.
+
+        Returns:
+            CacheStore[Any, Any]: The store
+        """
+        if self.kind == "shared":
+            raise ValueError("shared stores are created by the StateCache")
+        if self.kind == "compact":
+            return CompactMemberStore(client)
+        if self.kind == "none":
+            return NoCache()
+        if self.kind == "full":
+            return FullCache()
+        if self.kind == "lru":
+            if self.max_size is None:
+                raise ValueError("lru cache policy needs a max_size")
+            return LRUCache(self.max_size)
+        if self.ttl_seconds is None:
+            raise ValueError("ttl cache policy needs ttl_seconds")
+        return TTLCache(self.ttl_seconds, self.max_size)
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    """Cache policy for every kind of entity."""
+
+    guilds: CachePolicy = field(default_factory=CachePolicy.full)
+    channels: CachePolicy = field(default_factory=CachePolicy.full)
+    roles: CachePolicy = field(default_factory=CachePolicy.full)
+    members: CachePolicy = field(default_factory=CachePolicy.full)
+    users: CachePolicy = field(default_factory=CachePolicy.full)
+
+    messages_per_channel: int = 100
+    max_messages: int = 10_000
+
+    shared_path: str | os.PathLike[str] | None = None
+    shared_slots: int = 1 << 20
+    shared_heap_size: int = 256 * 2**20
+
+
+class StateCache:
+    """
+    Guilds, channels, roles, members, users and recent messages seen on the gateway.
+
+    Members are keyed by `(guild_id, user_id)`, everything else by its id.
+    """
+
+    def __init__(self, client: Client, config: CacheConfig) -> None:
+        """
+        Create the cache and start listening for events.
+
+        Args:
+            client (Client): Client to listen for events on
+            config (CacheConfig): Policy for each kind of entity
+
+        Raises:
+            ValueError: A entity other than members uses the compact policy, or a shared policy has no path.
+        """
+        self._client = client
+        self.config = config
+
+        for entity in ("guilds", "channels", "roles", "users"):
+            if getattr(config, entity).kind == "compact":
+                raise ValueError(
+                    f"compact cache policy is only supported for members, not {entity}"
+                )
+
+        self.shared: SharedCacheWriter | None = None
+        policies = (
+            config.guilds,
+            config.channels,
+            config.roles,
+            config.members,
+            config.users,
+        )
+        if any(policy.kind == "shared" for policy in policies):
+            if config.shared_path is None:
+                raise ValueError("shared cache policy needs CacheConfig.shared_path")
+            self.shared = SharedCacheWriter(
+                client, config.shared_path, config.shared_slots, config.shared_heap_size
+            )
+
+        self.guilds: CacheStore[int, datatypes.Guild] = self._create_store(
+            "guild", config.guilds
+        )
+        self.channels: CacheStore[int, datatypes.Channel] = self._create_store(
+            "channel", config.channels
+        )
+        self.roles: CacheStore[int, datatypes.Role] = self._create_store(
+            "role", config.roles
+        )
+        self.members: CacheStore[MemberKey, datatypes.Member] = self._create_store(
+            "member", config.members
+        )
+        self.users: CacheStore[int, datatypes.User] = self._create_store(
+            "user", config.users
+        )
+        self.messages = MessageCache(
+            client, config.messages_per_channel, config.max_messages
+        )
+        self.stores: dict[str, CacheStore[Any, Any]] = {
+            "guild": self.guilds,
+            "channel": self.channels,
+            "role": self.roles,
+            "member": self.members,
+            "user": self.users,
+            "message": self.messages,
+        }
+
+        # channel and role ids per guild, used to drop them when the guild goes away.
+        self._guild_channels: dict[int, set[int]] = {}
+        self._guild_roles: dict[int, set[int]] = {}
+
+        client.register_handler(events.Ready, self._on_ready)
+        client.register_handler(events.GuildCreate, self._on_guild_create)
+        client.register_handler(events.GuildUpdate, self._on_guild_update)
+        client.register_handler(events.GuildDelete, self._on_guild_delete)
+        client.register_handler(events.ChannelCreate, self._on_channel_change)
+        client.register_handler(events.ChannelUpdate, self._on_channel_change)
+        client.register_handler(events.ChannelDelete, self._on_channel_delete)
+        client.register_handler(events.ThreadCreate, self._on_channel_change)
+        client.register_handler(events.ThreadUpdate, self._on_channel_change)
+        client.register_handler(events.ThreadDelete, self._on_thread_delete)
+        client.register_handler(events.GuildEmojisUpdate, self._on_emojis_update)
+        client.register_handler(events.GuildRoleCreate, self._on_role_change)
+        client.register_handler(events.GuildRoleUpdate, self._on_role_change)
+        client.register_handler(events.GuildRoleDelete, self._on_role_delete)
+        client.register_handler(events.GuildMemberAdd, self._on_member_add)
+        client.register_handler(events.GuildMemberUpdate, self._on_member_update)
+        client.register_handler(events.GuildMemberRemove, self._on_member_remove)
+        client.register_handler(events.GuildMembersChunk, self._on_members_chunk)
+        client.register_handler(events.UserUpdate, self._on_user_update)
+        client.register_handler(events.MessageCreate, self._on_message_create)
+        client.register_handler(events.MessageUpdate, self._on_message_update)
+        client.register_handler(events.MessageDelete, self._on_message_delete)
+        client.register_handler(events.MessageDeleteBulk, self._on_message_delete_bulk)
+
+    def _create_store(self, entity: str, policy: CachePolicy) -> CacheStore[Any, Any]:
+        """
+        Create the store of a entity.
+
+        Args:
+            entity (str): Entity name
+            policy (CachePolicy): Policy of the entity
+
+        Returns:
+            CacheStore[Any, Any]: The store
+        """
+        if policy.kind == "shared" and self.shared is not None:
+            return SharedStore(self.shared, entity)
+        return policy.create_store(self._client)
+
+    def close(self) -> None:
+        """Release the shared region, if there is one."""
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+    def sizes(self) -> dict[tuple[str, ...], float]:
+        """
+        Get the amount of cached entities of each kind.
+
+        Returns:
+            dict[tuple[str, ...], float]: Size by entity label
+        """
+        return {(entity,): len(store) for entity, store in self.stores.items()}
+
+    def export_entries(self) -> Iterator[tuple[str, Any, Any]]:
+        """
+        Iterate over everything in the cache, used to write snapshots.
+
+        The keys are copied first, so events may change the cache while this is iterated.
+
+        Yields:
+            tuple[str, Any, Any]: Entity name, key and value
+        """
+        for entity, store in self.stores.items():
+            for key in list(store.keys()):
+                value = store.get(key)
+                if value is not None:
+                    yield entity, key, value
+
+        for guild_id, channel_ids in list(self._guild_channels.items()):
+            yield "guild_channels", guild_id, set(channel_ids)
+        for guild_id, role_ids in list(self._guild_roles.items()):
+            yield "guild_roles", guild_id, set(role_ids)
+
+    def import_entry(self, entity: str, key: Any, value: Any) -> None:  # noqa: ANN401
+        """
+        Add a entry produced by `export_entries`.
+
+        Args:
+            entity (str): Entity name
+            key (Any): The key
+            value (Any): The value
+
+        Raises:
+            ValueError: The entity name is unknown.
+        """
+        if entity == "guild_channels":
+            self._guild_channels[key] = value
+        elif entity == "guild_roles":
+            self._guild_roles[key] = value
+        elif entity == "user":
+            self.users.set(key, self._client.user_map.add(value))
+        elif entity == "member":
+            if value.user is not None:
+                value.user = self._client.user_map.add(value.user)
+            self.members.set(key, value)
+        elif entity in self.stores:
+            self.stores[entity].set(key, value)
+        else:
+            raise ValueError(f"unknown cache entity {entity!r}")
+
+    def _lookup(self, entity: str, value: V | None) -> V | None:
+        """
+        Record a lookup in the metrics.
+
+        Args:
+            entity (str): Kind of entity looked up
+            value (V | None): Result of the lookup
+
+        Returns:
+            V | None: The value
+        """
+        result = "hit" if value is not None else "miss"
+        self._client.metrics.cache_lookups.inc(entity, result)
+        return value
+
+    def get_guild(self, guild_id: int) -> datatypes.Guild | None:
+        """
+        Get a cached guild.
+
+        Args:
+            guild_id (int): Id of the guild
+
+        Returns:
+            datatypes.Guild | None: The guild, or None if it is not cached
+        """
+        return self._lookup("guild", self.guilds.get(guild_id))
+
+    def get_channel(self, channel_id: int) -> datatypes.Channel | None:
+        """
+        Get a cached channel.
+
+        Args:
+            channel_id (int): Id of the channel
+
+        Returns:
+            datatypes.Channel | None: The channel, or None if it is not cached
+        """
+        return self._lookup("channel", self.channels.get(channel_id))
+
+    def get_role(self, role_id: int) -> datatypes.Role | None:
+        """
+        Get a cached role.
+
+        Args:
+            role_id (int): Id of the role
+
+        Returns:
+            datatypes.Role | None: The role, or None if it is not cached
+        """
+        return self._lookup("role", self.roles.get(role_id))
+
+    def get_member(self, guild_id: int, user_id: int) -> datatypes.Member | None:
+        """
+        Get a cached member.
+
+        Args:
+            guild_id (int): Guild of the member
+            user_id (int): User id of the member
+
+        Returns:
+            datatypes.Member | None: The member, or None if it is not cached
+        """
+        return self._lookup("member", self.members.get((guild_id, user_id)))
+
+    def get_user(self, user_id: int) -> datatypes.User | None:
+        """
+        Get a cached user.
+
+        Args:
+            user_id (int): Id of the user
+
+        Returns:
+            datatypes.User | None: The user, or None if it is not cached
+        """
+        return self._lookup("user", self.users.get(user_id))
+
+    def get_message(self, message_id: int) -> datatypes.Message | None:
+        """
+        Get a cached message.
+
+        Args:
+            message_id (int): Id of the message
+
+        Returns:
+            datatypes.Message | None: The message, or None if it is not cached
+        """
+        return self._lookup("message", self.messages.get(message_id))
+
+    def guild_roles(self, guild_id: int) -> dict[int, datatypes.Role]:
+        """
+        Get the cached roles of a guild, in the shape the permission resolver expects.
+
+        Args:
+            guild_id (int): The guild
+
+        Returns:
+            dict[int, datatypes.Role]: Roles by id
+        """
+        roles: dict[int, datatypes.Role] = {}
+        for role_id in self._guild_roles.get(guild_id, ()):
+            role = self.roles.get(role_id)
+            if role is not None:
+                roles[role_id] = role
+        return roles
+
+    def clear(self) -> None:
+        """Forget everything."""
+        for store in self.stores.values():
+            store.clear()
+        self._guild_channels.clear()
+        self._guild_roles.clear()
+
+    def _add_channel(self, channel: datatypes.Channel, guild_id: int | None) -> None:
+        self.channels.set(channel.id_, channel)
+        if guild_id is not None:
+            self._guild_channels.setdefault(guild_id, set()).add(channel.id_)
+
+    def _add_role(self, role: datatypes.Role, guild_id: int) -> None:
+        self.roles.set(role.id, role)
+        self._guild_roles.setdefault(guild_id, set()).add(role.id)
+
+    def _add_member(self, member: datatypes.Member, guild_id: int) -> None:
+        if member.user is None:
+            return
+        self.users.set(member.user.id_, member.user)
+        self.members.set((guild_id, member.user.id_), member)
+
+    def _update_guild(
+        self, guild_id: int, update: Callable[[datatypes.Guild], None]
+    ) -> None:
+        guild = self.guilds.get(guild_id)
+        if guild is not None:
+            update(guild)
+            # stores like `SharedStore` hand out copies, so write the change back.
+            self.guilds.set(guild_id, guild)
+
+    def _remove_guild(self, guild_id: int) -> None:
+        _ = self.guilds.pop(guild_id)
+        for channel_id in self._guild_channels.pop(guild_id, ()):
+            _ = self.channels.pop(channel_id)
+            self.messages.pop_channel(channel_id)
+        for role_id in self._guild_roles.pop(guild_id, ()):
+            _ = self.roles.pop(role_id)
+        # leaving a guild is rare, so a scan is cheaper than keeping a member index.
+        for key in [key for key in self.members.keys() if key[0] == guild_id]:
+            _ = self.members.pop(key)
+
+    async def _on_ready(self, event: events.Ready) -> None:
+        self.users.set(event.user.id_, event.user)
+
+    async def _on_guild_create(self, event: events.GuildCreate) -> None:
+        guild = event.guild
+        guild.set_roles(event.roles)
+        for role in event.roles:
+            self._add_role(role, guild.id_)
+        for channel in (*event.channels, *event.threads):
+            guild.add_channel(channel)
+            self._add_channel(channel, guild.id_)
+        self.guilds.set(guild.id_, guild)
+        for member in event.members:
+            self._add_member(member, guild.id_)
+
+    async def _on_guild_update(self, event: events.GuildUpdate) -> None:
+        guild = event.guild
+        cached = self.guilds.get(guild.id_)
+        if cached is not None:
+            guild.carry_over(cached)
+        guild.set_roles(event.roles)
+        self.guilds.set(guild.id_, guild)
+
+        for role_id in self._guild_roles.pop(guild.id_, ()):
+            _ = self.roles.pop(role_id)
+        for role in event.roles:
+            self._add_role(role, guild.id_)
+
+    async def _on_guild_delete(self, event: events.GuildDelete) -> None:
+        if event.unavailable:
+            # a outage, the guild is sent again in a GUILD_CREATE once it is back.
+            self._update_guild(
+                event.guild_id, lambda guild: setattr(guild, "unavailable", True)
+            )
+            return
+        self._remove_guild(event.guild_id)
+
+    def _remove_channel(self, channel_id: int, guild_id: int | None) -> None:
+        _ = self.channels.pop(channel_id)
+        self.messages.pop_channel(channel_id)
+        if guild_id is not None:
+            self._guild_channels.get(guild_id, set()).discard(channel_id)
+            self._update_guild(guild_id, lambda guild: guild.remove_channel(channel_id))
+
+    async def _on_channel_change(self, event: events.ChannelCreate) -> None:
+        self._add_channel(event.channel, event.guild_id)
+        if event.guild_id is not None:
+            self._update_guild(
+                event.guild_id, lambda guild: guild.add_channel(event.channel)
+            )
+
+    async def _on_channel_delete(self, event: events.ChannelDelete) -> None:
+        self._remove_channel(event.channel.id_, event.guild_id)
+
+    async def _on_thread_delete(self, event: events.ThreadDelete) -> None:
+        self._remove_channel(event.thread_id, event.guild_id)
+
+    async def _on_emojis_update(self, event: events.GuildEmojisUpdate) -> None:
+        emojis = {emoji.id_: emoji for emoji in event.emojis if emoji.id_ is not None}
+        self._update_guild(
+            event.guild_id, lambda guild: setattr(guild, "emojis", emojis)
+        )
+
+    async def _on_role_change(self, event: events.GuildRoleCreate) -> None:
+        self._add_role(event.role, event.guild_id)
+        self._update_guild(event.guild_id, lambda guild: guild.add_role(event.role))
+
+    async def _on_role_delete(self, event: events.GuildRoleDelete) -> None:
+        _ = self.roles.pop(event.role_id)
+        self._guild_roles.get(event.guild_id, set()).discard(event.role_id)
+        self._update_guild(
+            event.guild_id, lambda guild: guild.remove_role(event.role_id)
+        )
+
+    @staticmethod
+    def _count_member(guild: datatypes.Guild, change: int) -> None:
+        if guild.member_count is not None:
+            guild.member_count += change
+
+    async def _on_member_add(self, event: events.GuildMemberAdd) -> None:
+        self._add_member(event.member, event.guild_id)
+        self._update_guild(event.guild_id, lambda guild: self._count_member(guild, 1))
+
+    async def _on_member_update(self, event: events.GuildMemberUpdate) -> None:
+        self.users.set(event.user.id_, event.user)
+        key = (event.guild_id, event.user.id_)
+        member = self.members.get(key)
+        if member is not None:
+            member.user = event.user
+            member.role_ids = event.role_ids
+            member.nick = event.nick
+            # stores like `CompactMemberStore` hand out copies, so write the change back.
+            self.members.set(key, member)
+
+    async def _on_member_remove(self, event: events.GuildMemberRemove) -> None:
+        _ = self.members.pop((event.guild_id, event.user.id_))
+        self._update_guild(event.guild_id, lambda guild: self._count_member(guild, -1))
+
+    async def _on_members_chunk(self, event: events.GuildMembersChunk) -> None:
+        for member in event.members:
+            self._add_member(member, event.guild_id)
+
+    async def _on_user_update(self, event: events.UserUpdate) -> None:
+        self.users.set(event.user.id_, event.user)
+
+    async def _on_message_create(self, event: events.MessageCreate) -> None:
+        self.messages.set(event.message.id_, event.message)
+
+    async def _on_message_update(self, event: events.MessageUpdate) -> None:
+        previous = self.messages.get(event.message_id)
+        event.previous = previous
+        if event.message is None and previous is not None:
+            event.message = previous.updated(event.data)
+        # edits of messages older than the cache are not worth caching.
+        if event.message is not None and previous is not None:
+            self.messages.set(event.message_id, event.message)
+
+    async def _on_message_delete(self, event: events.MessageDelete) -> None:
+        event.previous = self.messages.pop(event.message_id)
+
+    async def _on_message_delete_bulk(self, event: events.MessageDeleteBulk) -> None:
+        for message_id in event.message_ids:
+            message = self.messages.pop(message_id)
+            if message is not None:
+                event.previous.append(message)
@@ -3,38 +3,90 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import time
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Callable, Coroutine, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    TypeVar,
+    overload,
+)
 
 import aiohttp
 
-from vivcord import context, events
+from vivcord import context, events, snapshot
 from vivcord._api import Api
 from vivcord._gateway import Gateway
+from vivcord._router import CommandRouter
+from vivcord.autocomplete import AutocompleteDispatcher
+from vivcord.cache import CacheConfig, StateCache
+from vivcord.datatypes import Snowflake
+from vivcord.datatypes.user import UserIdentityMap
+from vivcord.lagmonitor import LagMonitor
+from vivcord.metrics import Metrics
+from vivcord.offload import Offloader
+from vivcord.permissions import PermissionResolver
 from vivcord.taskmanager import TaskManger
+from vivcord.tracing import Tracer
 
 if TYPE_CHECKING:
     from typing import TypeAlias
 
     from vivcord import _typed_dicts as type_dicts
-    from vivcord import datatypes, traits
-    from vivcord.datatypes import Snowflake
+    from vivcord import commands, datatypes, traits
+    from vivcord.offload import ExecutorKind
 
 EventT = TypeVar("EventT", bound=events.Event)
 EventCallback: TypeAlias = Callable[[EventT], Coroutine[Any, Any, None]]
+OffloadedEventCallback: TypeAlias = Callable[[EventT], None]
 
 
 class Client:
     """VivCord client."""
 
-    def __init__(self, default_guild_id: Snowflake | int | None = None) -> None:
+    def __init__(
+        self,
+        default_guild_id: Snowflake | int | None = None,
+        *,
+        thread_workers: int | None = None,
+        process_workers: int | None = None,
+        lag_interval: float = 0.5,
+        lag_threshold: float = 0.25,
+        metrics_port: int | None = None,
+        trace_sample_rate: float = 0.0,
+        trace_exporter: traits.SpanExporter | None = None,
+        keep_raw_data: bool = False,
+        lazy_datatypes: bool = False,
+        cache_config: CacheConfig | None = None,
+        snapshot_path: str | os.PathLike[str] | None = None,
+    ) -> None:
         """
         Create a client.
 
         Args:
             default_guild_id (Snowflake, optional): A guild id to use for commands.. Defaults to None.
+            thread_workers (int, optional): Size of the pool used for `executor="thread"` handlers. Defaults to None.
+            process_workers (int, optional): Size of the pool used for `executor="process"` handlers. Defaults to None.
+            lag_interval (float): Seconds between event loop lag samples. Defaults to 0.5.
+            lag_threshold (float): Loop lag in seconds that gets reported as blocking. Defaults to 0.25.
+            metrics_port (int, optional): Serve prometheus metrics on this local port. Defaults to None.
+            trace_sample_rate (float): Fraction of gateway payloads to trace. Defaults to 0.0.
+            trace_exporter (traits.SpanExporter, optional): Where to send spans. Defaults to a in memory ring buffer.
+            keep_raw_data (bool): Keep the raw json payload on datatypes as `_raw_data`. Defaults to False.
+            lazy_datatypes (bool): Decode the attributes of users, members and channels when they are first read,
+                this keeps the payload alive with the object. Defaults to False.
+            cache_config (CacheConfig, optional): What entities to cache. Defaults to caching everything.
+            snapshot_path (str | os.PathLike[str], optional): Restore the cache from this file on start,
+                resume the session it was saved in and save it again on close. Defaults to None.
         """
         self.default_guild_id = default_guild_id
+        self.keep_raw_data = keep_raw_data
+        self.lazy_datatypes = lazy_datatypes
+        self.user_map = UserIdentityMap(self)
 
         self.api: Api = None  # type: ignore
         self._gateway: Gateway = None  # type: ignore
@@ -45,11 +97,178 @@ class Client:
         ] = defaultdict(list)
 
         self._commands: dict[str, traits.ApplicationCommand] = {}
+        self._router = CommandRouter()
+        self.autocomplete = AutocompleteDispatcher()
 
         self.task_manger = TaskManger()
+        self.cache = StateCache(self, cache_config or CacheConfig())
+        self.snapshot_path = snapshot_path
+        self.permissions = PermissionResolver(self)
+        self.offloader = Offloader(self, thread_workers, process_workers)
+        self.lag_monitor = LagMonitor(lag_interval, lag_threshold)
+        self.metrics = Metrics(self)
+        self.metrics_port = metrics_port
+        self.tracer = Tracer(trace_sample_rate, trace_exporter)
+
+    @property
+    def latency(self) -> float | None:
+        """
+        Round trip time of the last gateway heartbeat in seconds.
+
+        Returns:
+            float | None: The latency, or None if no heartbeat has been acknowledged yet
+        """
+        if self._gateway is None:  # type: ignore
+            return None
+        return self._gateway.latency
+
+    def get_guild(self, guild_id: Snowflake | int) -> datatypes.Guild | None:
+        """
+        Get a guild from the cache.
+
+        Args:
+            guild_id (Snowflake | int): Id of the guild
+
+        Returns:
+            datatypes.Guild | None: The guild, or None if it is not cached
+        """
+        return self.cache.get_guild(guild_id)
+
+    def get_channel(self, channel_id: Snowflake | int) -> datatypes.Channel | None:
+        """
+        Get a channel from the cache.
+
+        Args:
+            channel_id (Snowflake | int): Id of the channel
+
+        Returns:
+            datatypes.Channel | None: The channel, or None if it is not cached
+        """
+        return self.cache.get_channel(channel_id)
+
+    def get_role(self, role_id: Snowflake | int) -> datatypes.Role | None:
+        """
+        Get a role from the cache.
+
+        Args:
+            role_id (Snowflake | int): Id of the role
+
+        Returns:
+            datatypes.Role | None: The role, or None if it is not cached
+        """
+        return self.cache.get_role(role_id)
+
+    def get_member(
+        self, guild_id: Snowflake | int, user_id: Snowflake | int
+    ) -> datatypes.Member | None:
+        """
+        Get a member from the cache.
+
+        Args:
+            guild_id (Snowflake | int): Guild of the member
+            user_id (Snowflake | int): User id of the member
+
+        Returns:
+            datatypes.Member | None: The member, or None if it is not cached
+        """
+        return self.cache.get_member(guild_id, user_id)
+
+    def get_user(self, user_id: Snowflake | int) -> datatypes.User | None:
+        """
+        Get a user from the cache.
+
+        Args:
+            user_id (Snowflake | int): Id of the user
+
+        Returns:
+            datatypes.User | None: The user, or None if it is not cached
+        """
+        return self.cache.get_user(user_id)
+
+    def get_message(self, message_id: Snowflake | int) -> datatypes.Message | None:
+        """
+        Get a recent message from the cache.
+
+        Args:
+            message_id (Snowflake | int): Id of the message
+
+        Returns:
+            datatypes.Message | None: The message, or None if it is not cached
+        """
+        return self.cache.get_message(message_id)
+
+    def request_members(
+        self,
+        guild_id: Snowflake | int,
+        *,
+        query: str = "",
+        limit: int = 0,
+        user_ids: list[Snowflake | int] | None = None,
+        presences: bool = False,
+        timeout: float = 30.0,
+    ) -> AsyncIterator[events.GuildMembersChunk]:
+        """
+        Request members of a guild over the gateway.
+
+        The members of every chunk are added to the cache before the chunk is yielded.
+        Requesting all members ("" query, 0 limit) needs the guild members intent.
+
+        Args:
+            guild_id (Snowflake | int): Guild to request members of
+            query (str): Only members whose username starts with this, "" for all members. Defaults to "".
+            limit (int): Maximum amount of members, 0 for no limit. Defaults to 0.
+            user_ids (list[Snowflake | int], optional): Request these members instead of using a query.
+                Defaults to None.
+            presences (bool): Include the presences of the members, needs the presence intent. Defaults to False.
+            timeout (float): Seconds to wait for the next chunk. Defaults to 30.0.
+
+        Raises:
+            ValueError: The client is not connected.
+
+        Returns:
+            AsyncIterator[events.GuildMembersChunk]: The chunks as they arrive
+        """
+        if self._gateway is None:  # type: ignore
+            raise ValueError("client is not connected")
+        return self._gateway.request_members(
+            int(guild_id),
+            query=query,
+            limit=limit,
+            user_ids=[int(id_) for id_ in user_ids] if user_ids is not None else None,
+            presences=presences,
+            timeout=timeout,
+        )
+
+    async def change_presence(
+        self,
+        status: str = "online",
+        activities: list[type_dicts.PresenceActivityData] | None = None,
+        *,
+        afk: bool = False,
+        since: int | None = None,
+    ) -> None:
+        """
+        Change the presence of the bot.
+
+        Presence updates are coalesced, when one is still waiting for the rate limit this one replaces it.
+
+        Args:
+            status (str): "online", "dnd", "idle", "invisible" or "offline". Defaults to "online".
+            activities (list[type_dicts.PresenceActivityData], optional): The activities of the bot. Defaults to None.
+            afk (bool): If the bot is afk. Defaults to False.
+            since (int, optional): Unix time in milliseconds the bot went idle. Defaults to None.
+
+        Raises:
+            ValueError: The client is not connected.
+        """
+        if self._gateway is None:  # type: ignore
+            raise ValueError("client is not connected")
+        await self._gateway.update_presence(status, activities or [], afk, since)
 
     async def _register_commands(self) -> None:
         """Register all slash commnands with the api."""
+        # route exactly the subcommands discord is told about.
+        _ = self._router.build()
         global_commands: list[type_dicts.CommandStructure] = []
         guild_commands: dict[int, list[type_dicts.CommandStructure]] = defaultdict(list)
 
@@ -61,8 +280,8 @@ class Client:
 
         await self.api.overwrite_global_commands(global_commands)
 
-        for guild_id, commands in guild_commands.items():
-            await self.api.overwrite_guild_commands(guild_id, commands)
+        for guild_id, structures in guild_commands.items():
+            await self.api.overwrite_guild_commands(guild_id, structures)
 
     async def start(self, oauth: str, intents: datatypes.Intents) -> None:
         """
@@ -77,12 +296,23 @@ class Client:
         headers = {"Authorization": f"Bot {oauth}"}
         session = aiohttp.ClientSession(headers=headers)
 
-        self.api = Api(session)
+        self.api = Api(session, self.metrics, self.tracer)
+        if self.metrics_port is not None:
+            await self.metrics.start_server(port=self.metrics_port)
 
         gateway_url = await self.api.get_gateway()
         self._gateway = Gateway(self, session)
 
-        self.task_manger.add_task(self._gateway.start(gateway_url, oauth, intents))
+        resume = None
+        if self.snapshot_path is not None:
+            resume = snapshot.load_snapshot(self, self.cache, self.snapshot_path)
+            if resume is not None and resume.application_id is not None:
+                self.api.application_id = Snowflake(resume.application_id)
+
+        self.task_manger.add_task(self.lag_monitor.run())
+        self.task_manger.add_task(
+            self._gateway.start(gateway_url, oauth, intents, resume)
+        )
 
         try:
             await self.task_manger.start()
@@ -101,9 +331,30 @@ class Client:
         """
         asyncio.run(self.start(oauth, intents))
 
+    async def save_snapshot(self) -> None:
+        """
+        Save the cache and the gateway session to `snapshot_path`.
+
+        The file is written in the default executor, so this can be called while the client runs.
+
+        Raises:
+            ValueError: The client has no snapshot path.
+        """
+        if self.snapshot_path is None:
+            raise ValueError("client has no snapshot_path")
+
+        session = self._gateway.session if self._gateway is not None else None  # type: ignore
+        _ = await snapshot.save_snapshot(self, self.cache, self.snapshot_path, session)
+
     async def close(self) -> None:
         """Close down the client."""
         await self.task_manger.close()
+        if self.snapshot_path is not None:
+            await self.save_snapshot()
+        self.cache.close()
+        await self.offloader.shutdown()
+        await self.metrics.stop_server()
+        self.tracer.close()
 
         await self._gateway.close()
         await self.api.session.close()
@@ -112,6 +363,22 @@ class Client:
         """
         Handle a incoming event.
 
+        Args:
+            event (events.Event): The event that happend.
+        """
+        start = time.perf_counter()
+        try:
+            with self.tracer.span("dispatch", event=type(event).__name__):
+                await self._dispatch_event(event)
+        finally:
+            self.metrics.handler_seconds.observe(
+                time.perf_counter() - start, type(event).__name__
+            )
+
+    async def _dispatch_event(self, event: events.Event) -> None:
+        """
+        Run the internal and registered handlers for a event.
+
         Args:
             event (events.Event): The event that happend.
         """
@@ -119,7 +386,13 @@ class Client:
             self.api.application_id = event.application.id_
             await self._register_commands()
 
-        elif isinstance(event, context.ApplicationCommandContext):
+        elif isinstance(event, events.Resumed) and self.api.application_id is not None:
+            # a resumed restart gets no READY, commands may have changed since the snapshot.
+            await self._register_commands()
+
+        elif isinstance(
+            event, (context.ApplicationCommandContext, context.AutocompleteContext)
+        ):
             await event.handle_interaction()
 
         tasks: list[Coroutine[Any, Any, None]] = [
@@ -141,21 +414,60 @@ class Client:
         """
         self._event_handlers[event_type].append(callback)
 
+    def register_offloaded_handler(
+        self,
+        event_type: type[EventT],
+        callback: OffloadedEventCallback[EventT],
+        executor: ExecutorKind,
+    ) -> None:
+        """
+        Register a synchronous callback that runs in one of the client pools.
+
+        Args:
+            event_type (type[EventT]): Event the callback should respond to
+            callback (OffloadedEventCallback[EventT]): Callback that will be called when the event happens
+            executor (ExecutorKind): Pool to run the callback in
+        """
+
+        async def run_offloaded(event: EventT) -> None:
+            await self.offloader.run(executor, callback, event)
+
+        self.register_handler(event_type, run_offloaded)
+
+    @overload
     def on_event(
-        self, event_type: type[EventT]
+        self, event_type: type[EventT], executor: None = None
     ) -> Callable[[EventCallback[EventT]], EventCallback[EventT]]:
+        ...
+
+    @overload
+    def on_event(
+        self, event_type: type[EventT], executor: ExecutorKind
+    ) -> Callable[[OffloadedEventCallback[EventT]], OffloadedEventCallback[EventT]]:
+        ...
+
+    def on_event(
+        self, event_type: type[EventT], executor: ExecutorKind | None = None
+    ) -> Callable[[Any], Any]:
         """
         Register a event handler using decorators.
 
+        When `executor` is given the callback must be a normal (non async) function,
+        it is run in the clients thread or process pool instead of on the event loop.
+
         Args:
             event_type (type[EventT]): The type to register on
+            executor (ExecutorKind, optional): "thread" or "process" to offload the callback. Defaults to None.
 
         Returns:
-            Callable[[EventCallback[EventT]], EventCallback[EventT]]: The decorator that should be used.
+            Callable[[Any], Any]: The decorator that should be used.
         """
 
-        def decorator(callback: EventCallback[EventT]) -> EventCallback[EventT]:
-            self.register_handler(event_type, callback)
+        def decorator(callback: Any) -> Any:  # noqa: ANN401
+            if executor is None:
+                self.register_handler(event_type, callback)
+            else:
+                self.register_offloaded_handler(event_type, callback, executor)
             return callback
 
         return decorator
@@ -171,6 +483,7 @@ class Client:
             command.guild_id = self.default_guild_id
 
         self._commands[command.name] = command
+        self._router.add(command)
 
     def get_command(self, name: str) -> traits.ApplicationCommand | None:
         """
@@ -183,3 +496,19 @@ class Client:
             traits.ApplicationCommand | None: commnad, or None if not found.
         """
         return self._commands.get(name)
+
+    def route_command(
+        self, name: str, options: list[type_dicts.CommandOptionResult]
+    ) -> tuple[commands.SlashCommand[Any], list[type_dicts.CommandOptionResult]] | None:
+        """
+        Find the slash command or subcommand a interaction is for.
+
+        Args:
+            name (str): Name of the invoked command
+            options (list[type_dicts.CommandOptionResult]): Options of the interaction
+
+        Returns:
+            tuple[commands.SlashCommand[Any], list[type_dicts.CommandOptionResult]] | None:
+                The command and the options meant for it, or None if no command matches
+        """
+        return self._router.route(name, options)
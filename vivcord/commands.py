@@ -11,15 +11,21 @@ from typing import (
     Generic,
     ParamSpec,
     TypeVar,
+    overload,
 )
 
 from vivcord import datatypes, traits
+from vivcord._binder import ArgumentBinder
+from vivcord.autocomplete import Autocompleter
+from vivcord.limits import CommandLimiter, ConcurrencyLimit, Cooldown
 
 if TYPE_CHECKING:
     from typing import TypeAlias
 
     from vivcord import _typed_dicts as type_dicts
     from vivcord import context
+    from vivcord.limits import LimitScope
+    from vivcord.offload import ExecutorKind
 
 ChoiceT = TypeVar("ChoiceT", str, int, float)
 OptionT = TypeVar("OptionT")
@@ -28,7 +34,13 @@ ParamS = ParamSpec("ParamS")
 CommandCallback: TypeAlias = Callable[
     Concatenate["context.SlashCommandContext", ParamS], Coroutine[Any, Any, None]
 ]
-AutocompleteFunc: TypeAlias = Callable[[str], list["CommandChoice[ChoiceT]"]]
+OffloadedCommandCallback: TypeAlias = Callable[
+    Concatenate["context.SlashCommandContext", ParamS],
+    "datatypes.SendMessageData | None",
+]
+AutocompleteFunc: TypeAlias = Callable[
+    [str], Coroutine[Any, Any, list["CommandChoice[ChoiceT]"]]
+]
 
 
 class SlashCommand(Generic[ParamS]):
@@ -44,7 +56,8 @@ class SlashCommand(Generic[ParamS]):
         description: str,
         default_permission: bool,
         guild_id: datatypes.Snowflake | int | None,
-        func: CommandCallback[ParamS],
+        func: CommandCallback[ParamS] | OffloadedCommandCallback[ParamS],
+        executor: ExecutorKind | None = None,
     ) -> None:
         """
         Create slash command.
@@ -54,15 +67,46 @@ class SlashCommand(Generic[ParamS]):
             description (str): Command description
             default_permission (bool): Should this command be enabled by default?
             guild_id (datatypes.Snowflake | int | None): Potential guild_id for this command
-            func (CommandCallback[ParamS]): Callback function for the command
+            func (CommandCallback[ParamS] | OffloadedCommandCallback[ParamS]): Callback function for the command
+            executor (ExecutorKind, optional): Pool to run a synchronous func in. Defaults to None.
         """
         self.name = name
         self.description = description
         self.default_permission = default_permission
         self.guild_id = guild_id
         self.func = func
+        self.executor = executor
 
         self.options: list[traits.CommandOption[Any]] = []
+        self.binder: ArgumentBinder | None = None
+        self.autocompleters: dict[str, Autocompleter[Any]] = {}
+
+        self.cooldowns: list[Cooldown] = []
+        self.concurrency_limits: list[ConcurrencyLimit] = []
+        self.limiter: CommandLimiter | None = None
+
+    def compile(self) -> ArgumentBinder:  # noqa: A003
+        """
+        Build the argument binder, the autocompleters of the options and the limiter.
+
+        This is done when the commands are sent to discord or the command is first invoked,
+        after every option was added.
+
+        Returns:
+            ArgumentBinder: The binder
+        """
+        self.binder = ArgumentBinder(self)
+        self.autocompleters = {
+            option.name: Autocompleter(option.autocomplete)
+            for option in self.options
+            if isinstance(
+                option, (CommandOptionString, CommandOptionInt, CommandOptionFloat)
+            )
+            and option.autocomplete is not None
+        }
+        if self.cooldowns or self.concurrency_limits:
+            self.limiter = CommandLimiter(self.cooldowns, self.concurrency_limits)
+        return self.binder
 
     def convert_to_dict(self: SlashCommand[[]]) -> type_dicts.CommandStructure:
         """
@@ -79,6 +123,145 @@ class SlashCommand(Generic[ParamS]):
             "options": [option.convert_to_dict() for option in self.options],
         }
 
+    def convert_to_option(self: SlashCommand[[]]) -> type_dicts.CommandOption:
+        """
+        Convert the command to the option structure of a subcommand.
+
+        Returns:
+            type_dicts.CommandOption: subcommand json
+        """
+        return {
+            "type": 1,
+            "name": self.name,
+            "description": self.description,
+            "options": [option.convert_to_dict() for option in self.options],
+        }
+
+
+class SubcommandGroup:
+    """
+    A group of subcommands inside a `SlashCommandGroup`.
+
+    These are invoked with `/command group subcommand 1 2 yes`.
+    """
+
+    def __init__(self, name: str, description: str) -> None:
+        """
+        Create subcommand group.
+
+        Args:
+            name (str): Name of the group
+            description (str): Group description
+        """
+        self.name = name
+        self.description = description
+        self.subcommands: dict[str, SlashCommand[Any]] = {}
+
+    def add_command(self, command: SlashCommand[ParamS]) -> SlashCommand[ParamS]:
+        """
+        Add a subcommand, can be used as a decorator.
+
+        Args:
+            command (SlashCommand[ParamS]): The subcommand
+
+        Returns:
+            SlashCommand[ParamS]: The same subcommand
+        """
+        self.subcommands[command.name] = command
+        return command
+
+    def convert_to_option(self) -> type_dicts.CommandOption:
+        """
+        Convert the group to the option structure of a subcommand group.
+
+        Returns:
+            type_dicts.CommandOption: subcommand group json
+        """
+        return {
+            "type": 2,
+            "name": self.name,
+            "description": self.description,
+            "options": [
+                command.convert_to_option() for command in self.subcommands.values()
+            ],
+        }
+
+
+class SlashCommandGroup:
+    """
+    Discord slash command made of subcommands.
+
+    These are invoked with `/command subcommand 1 2 yes` or `/command group subcommand 1 2 yes`,
+    the command itself has no callback.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        default_permission: bool = True,
+        guild_id: datatypes.Snowflake | int | None = None,
+    ) -> None:
+        """
+        Create slash command group.
+
+        Args:
+            name (str): Name of the command
+            description (str): Command description
+            default_permission (bool): Should this command be enabled by default? Defaults to True.
+            guild_id (datatypes.Snowflake | int, optional): Potential guild_id for this command. Defaults to None.
+        """
+        self.name = name
+        self.description = description
+        self.default_permission = default_permission
+        self.guild_id = guild_id
+        self.subcommands: dict[str, SlashCommand[Any] | SubcommandGroup] = {}
+
+    def add_command(self, command: SlashCommand[ParamS]) -> SlashCommand[ParamS]:
+        """
+        Add a subcommand, can be used as a decorator.
+
+        Args:
+            command (SlashCommand[ParamS]): The subcommand
+
+        Returns:
+            SlashCommand[ParamS]: The same subcommand
+        """
+        self.subcommands[command.name] = command
+        return command
+
+    def group(self, name: str, description: str) -> SubcommandGroup:
+        """
+        Add a subcommand group.
+
+        Args:
+            name (str): Name of the group
+            description (str): Group description
+
+        Returns:
+            SubcommandGroup: The new group, add subcommands to it with `add_command`
+        """
+        group = SubcommandGroup(name, description)
+        self.subcommands[name] = group
+        return group
+
+    def convert_to_dict(self) -> type_dicts.CommandStructure:
+        """
+        Convert the command to json structure.
+
+        Returns:
+            type_dicts.CommandStructure: command json
+        """
+        return {
+            "type": 1,
+            "name": self.name,
+            "description": self.description,
+            "default_permission": self.default_permission,
+            "options": [
+                command.convert_to_option() for command in self.subcommands.values()
+            ],
+        }
+
 
 class CommandChoice(Generic[ChoiceT]):
     """A command Choice."""
@@ -123,7 +306,8 @@ class CommandOptionString(traits.CommandOption[str]):
             description (str): The option description.
             required (bool): Wether the option is required. Defaults to True.
             choices (list[CommandChoice[str]], optional): List of set options the user name pick from. Defaults to None.
-            autocomplete (AutocompleteFunc[str], optional): A callback function for autocomplete. Defaults to None.
+            autocomplete (AutocompleteFunc[str], optional): Async provider of choices for the typed input,
+                for example a `autocomplete.PrefixIndex`. Defaults to None.
         """
         super().__init__(name, description)
         self.required = required
@@ -176,7 +360,7 @@ class CommandOptionInt(traits.CommandOption[int]):
             choices (list[CommandChoice[int]], optional): Choices user has to choose from. Defaults to None.
             min_value (int, optional): Minimum value of int. Defaults to None.
             max_value (int, optional): Maximum value of int. Defaults to None.
-            autocomplete (AutocompleteFunc[int], optional): Callback for autocomplete. Defaults to None.
+            autocomplete (AutocompleteFunc[int], optional): Async provider of choices for the typed input. Defaults to None.
         """
         super().__init__(name, description)
         self.required = required
@@ -238,7 +422,7 @@ class CommandOptionBoolean(traits.CommandOption[bool]):
         """
         return {
             "type": 5,
-            "name": self.description,
+            "name": self.name,
             "description": self.description,
             "required": self.required,
         }
@@ -404,7 +588,7 @@ class CommandOptionFloat(traits.CommandOption[float]):
             choices (list[CommandChoice[int]], optional): Choices user has to choose from. Defaults to None.
             min_value (int, optional): Minimum value of int. Defaults to None.
             max_value (int, optional): Maximum value of int. Defaults to None.
-            autocomplete (AutocompleteFunc[int], optional): Callback for autocomplete. Defaults to None.
+            autocomplete (AutocompleteFunc[int], optional): Async provider of choices for the typed input. Defaults to None.
         """
         super().__init__(name, description)
         self.required = required
@@ -442,27 +626,60 @@ class CommandOptionFloat(traits.CommandOption[float]):
         return data
 
 
+@overload
 def slash_command(
     name: str,
     description: str,
     default_permission: bool = True,
     guild_id: int | None = None,
+    executor: None = None,
 ) -> Callable[[CommandCallback[ParamS]], SlashCommand[ParamS]]:
+    ...
+
+
+@overload
+def slash_command(
+    name: str,
+    description: str,
+    default_permission: bool = True,
+    guild_id: int | None = None,
+    *,
+    executor: ExecutorKind,
+) -> Callable[[OffloadedCommandCallback[ParamS]], SlashCommand[ParamS]]:
+    ...
+
+
+def slash_command(
+    name: str,
+    description: str,
+    default_permission: bool = True,
+    guild_id: int | None = None,
+    executor: ExecutorKind | None = None,
+) -> Callable[[Any], SlashCommand[ParamS]]:
     """
     Convert function to a slash command.
 
+    When `executor` is given the function must be a normal (non async) function,
+    it is run in the clients thread or process pool and the `SendMessageData` it returns
+    (if any) is sent as the response.
+
     Args:
         name (str): Name of command
         description (str): Command description
         default_permission (bool): The default permission for the command. Defaults to True.
         guild_id (int, optional): Guild id if it is a guild only command. Defaults to None.
+        executor (ExecutorKind, optional): "thread" or "process" to offload the command body. Defaults to None.
 
     Returns:
-        Callable[[CommandCallback[ParamS]], _SlashCommand[ParamS]]: Decorator
+        Callable[[Any], _SlashCommand[ParamS]]: Decorator
     """
 
-    def decorator(func: CommandCallback[ParamS]) -> SlashCommand[ParamS]:
-        return SlashCommand(name, description, default_permission, guild_id, func)
+    def decorator(
+        func: CommandCallback[ParamS] | OffloadedCommandCallback[ParamS],
+    ) -> SlashCommand[ParamS]:
+        return SlashCommand(
+            name, description, default_permission, guild_id, func, executor
+        )
 
     return decorator
 
@@ -487,3 +704,51 @@ def with_argument(
         return command  # type: ignore
 
     return decorator
+
+
+def with_cooldown(
+    rate: int, per: float, scope: LimitScope = "user"
+) -> Callable[[SlashCommand[ParamS]], SlashCommand[ParamS]]:
+    """
+    Limit how often a slash command can be used.
+
+    Every scope key has a token bucket of `rate` uses that refills over `per` seconds,
+    invocations finding it empty get a ephemeral rejection instead of running the command.
+
+    Args:
+        rate (int): Uses allowed per `per` seconds
+        per (float): Seconds for a empty bucket to refill
+        scope (LimitScope): "global", "guild" or "user". Defaults to "user".
+
+    Returns:
+        Callable[[SlashCommand[ParamS]], SlashCommand[ParamS]]: Decorator
+    """
+
+    def decorator(command: SlashCommand[ParamS]) -> SlashCommand[ParamS]:
+        command.cooldowns.append(Cooldown(rate, per, scope))
+        return command
+
+    return decorator
+
+
+def with_max_concurrency(
+    limit: int, scope: LimitScope = "global"
+) -> Callable[[SlashCommand[ParamS]], SlashCommand[ParamS]]:
+    """
+    Limit how many executions of a slash command run at the same time.
+
+    Invocations over the limit get a ephemeral rejection instead of running the command.
+
+    Args:
+        limit (int): Executions allowed at the same time per scope key
+        scope (LimitScope): "global", "guild" or "user". Defaults to "global".
+
+    Returns:
+        Callable[[SlashCommand[ParamS]], SlashCommand[ParamS]]: Decorator
+    """
+
+    def decorator(command: SlashCommand[ParamS]) -> SlashCommand[ParamS]:
+        command.concurrency_limits.append(ConcurrencyLimit(limit, scope))
+        return command
+
+    return decorator
@@ -2,18 +2,17 @@
 
 from __future__ import annotations
 
-import typing
+import time
 from enum import IntEnum
-from typing import TYPE_CHECKING
-
-from loguru import logger
+from typing import TYPE_CHECKING, Any
 
 from vivcord import _typed_dicts as type_dicts
-from vivcord import commands, datatypes, events, helpers
+from vivcord import datatypes, events, helpers
 
 if TYPE_CHECKING:
     from typing import TypeAlias
 
+    from vivcord import commands
     from vivcord.client import Client
 
 
@@ -68,7 +67,11 @@ class _InteractionContext(events.Event):
         self.member = (
             datatypes.Member(client, data["member"]) if "member" in data else None
         )
-        self.user = datatypes.User(client, data["user"]) if "user" in data else None
+        self.user = client.user_map.intern(data["user"]) if "user" in data else None
+
+        # in guilds the user is only sent as part of the member.
+        user = self.member.user if self.member is not None else self.user
+        self.user_id = user.id_ if user is not None else 0
 
     async def handle_interaction(self) -> None:
         """
@@ -130,106 +133,117 @@ class SlashCommandContext(ApplicationCommandContext):
         Args:
             client (Client): Vivcord client
             data (type_dicts.InteractionEventData): Interaction event data
-
-        Raises:
-            ValueError: unknown argument gotten
         """
         super().__init__(client, data)
 
-        self._resolved = self._int_data.get("resolved")
-        self._arguments: dict[str, OPTION_VALS] = {}
-
-        for value in self._int_data.get("options", []):
-            option_value = value.get("value", 0)
-            logger.debug(
-                f"parsing argument {value['name']} with data: {option_value!r} of type {value['type']}"
-            )
-
-            user_given_value = OPTION_VALS
-            type_ = value["type"]
-
-            if type_ in {3, 4, 10}:
-                user_given_value = option_value
-            else:
-                option_value = typing.cast(int, option_value)
-                # when we got this type of value we know we have values in the resolved dict!
-                self._resolved = typing.cast(type_dicts.ResolvedData, self._resolved)
-
-                match value["type"]:
-                    case 6:
-                        if option_value in self._resolved.get("users", {}):
-                            user_given_value = datatypes.User(
-                                client,
-                                helpers.fail_if_none(
-                                    self._resolved.get("users"),
-                                    KeyError("Expected users key"),
-                                )[option_value],
-                            )
-                        else:
-                            user_given_value = datatypes.Member(
-                                client,
-                                helpers.fail_if_none(
-                                    self._resolved.get("members"),
-                                    KeyError("Expected members key"),
-                                )[option_value],
-                            )
-                    case 7:
-                        user_given_value = datatypes.Channel(
-                            client,
-                            helpers.fail_if_none(
-                                self._resolved.get("channels"),
-                                KeyError("Expected channels key"),
-                            )[option_value],
-                        )
-                    case 8:
-                        user_given_value = datatypes.Role(
-                            client,
-                            helpers.fail_if_none(
-                                self._resolved.get("roles"),
-                                KeyError("Expected roles key"),
-                            )[option_value],
-                        )
-                    case 9:
-                        if option_value in self._resolved.get("users", {}):
-                            user_given_value = datatypes.User(
-                                client,
-                                helpers.fail_if_none(
-                                    self._resolved.get("users"),
-                                    KeyError("Expected users key"),
-                                )[option_value],
-                            )
-                        else:
-                            user_given_value = datatypes.Role(
-                                client,
-                                helpers.fail_if_none(
-                                    self._resolved.get("roles"),
-                                    KeyError("Expected roles key"),
-                                )[option_value],
-                            )
-                    case _:
-                        raise ValueError(f"Unknown option type {value['type']}")
-
-            self._arguments[value["name"]] = user_given_value
+        # bound to arguments by the command binder, only once the command is known.
+        self._options = self._int_data.get("options", [])
+        self._resolved = self._int_data.get("resolved", {})
 
     async def handle_interaction(self) -> None:
         """
         Execute slash command callback.
 
         Raises:
-            KeyError: Provided name not found in client.
-            TypeError: Command found, but was not a slash command
+            KeyError: No command or subcommand found for the interaction.
         """
-        command = self._client.get_command(self._name)
-        if command is None:
+        route = self._client.route_command(self._name, self._options)
+        if route is None:
             raise KeyError(f"application command {self._name!r} not found!")
-        if not isinstance(command, commands.SlashCommand):
-            raise TypeError("expected slash command")
+        command, options = route
+
+        binder = command.binder if command.binder is not None else command.compile()
+        limiter = command.limiter
+        guild_id = int(self.guild_id) if self.guild_id is not None else None
+        if limiter is not None:
+            rejection = limiter.acquire(guild_id, self.user_id)
+            if rejection is not None:
+                await self.send(datatypes.SendMessageData(rejection, ephemeral=True))
+                return
+
+        try:
+            with self._client.tracer.span(
+                "interaction.resolve_options", command=self._name
+            ):
+                arguments = binder.bind(self._client, options, self._resolved)
+
+            with self._client.tracer.span("command.callback", command=self._name):
+                if command.executor is None:
+                    await command.func(self, *arguments)  # type: ignore
+                    return
+
+                response = await self._client.offloader.run(
+                    command.executor, command.func, self, *arguments
+                )
+        finally:
+            if limiter is not None:
+                limiter.release(guild_id, self.user_id)
+
+        if response is not None:
+            await self.send(response)
+
+
+class AutocompleteContext(_InteractionContext):
+    """Interaction context for a autocomplete request, sent while a user types a option."""
 
-        arguments: list[OPTION_VALS | None] = [
-            self._arguments.get(option.name) for option in command.options
-        ]
+    def __init__(self, client: Client, data: type_dicts.InteractionEventData) -> None:
+        """
+        Create a autocomplete interaction context.
+
+        Args:
+            client (Client): Vivcord client
+            data (type_dicts.InteractionEventData): Interaction event data
+
+        Raises:
+            ValueError: interaction data missing
+        """
+        super().__init__(client, data)
+        # the response deadline starts when discord sent the request, this is the closest we know.
+        self.received_at = time.monotonic()
+
+        int_data = data.get("data")
+        if int_data is None:
+            raise ValueError("interaction data missing")
+        self._name = int_data["name"]
+        self._options = int_data.get("options", [])
+
+    async def respond(self, choices: list[commands.CommandChoice[Any]]) -> None:
+        """
+        Send the choices.
+
+        Args:
+            choices (list[commands.CommandChoice[Any]]): Choices to show, at most 25
+        """
+        await self._client.api.respond_to_interaction(
+            self._id,
+            self._token,
+            {
+                "type": 8,
+                "data": {"choices": [choice.convert_to_dict() for choice in choices]},
+            },
+        )
+
+    async def handle_interaction(self) -> None:
+        """
+        Run the autocomplete provider of the focused option.
+
+        Raises:
+            KeyError: No command or autocompleted option found for the interaction.
+        """
+        route = self._client.route_command(self._name, self._options)
+        if route is None:
+            raise KeyError(f"application command {self._name!r} not found!")
+        command, options = route
 
-        await command.func(self, *arguments)
+        for option in options:
+            if option.get("focused", False):
+                autocompleter = command.autocompleters.get(option["name"])
+                if autocompleter is None:
+                    raise KeyError(f"option {option['name']!r} has no autocomplete")
+                await self._client.autocomplete.run(
+                    self, autocompleter, str(option.get("value", ""))
+                )
+                return
 
 
 @events.event_map_manager.register_type("INTERACTION_CREATE")  # type: ignore
@@ -267,5 +281,7 @@ def parse_interaction(
                     raise ValueError(
                         f"unknown application command type {command_type!r}"
                     )
+        case 4:
+            return AutocompleteContext(client, data)
         case _:
             raise ValueError(f"unknown interaction type {interaction_type!r}")
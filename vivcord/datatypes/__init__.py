@@ -7,13 +7,17 @@ __all__ = (
     "embed",
     "Intents",
     "Permission",
+    "PermissionOverwrite",
     "Snowflake",
     "User",
     "Member",
     "Guild",
+    "Emoji",
     "channel",
     "Channel",
     "Message",
+    "MessageType",
+    "MessageFlags",
     "SendMessageData",
     "Role",
     "Application",
@@ -24,10 +28,16 @@ from typing import TYPE_CHECKING
 from vivcord.datatypes import channel, embed
 from vivcord.datatypes.channel import Channel
 from vivcord.datatypes.embed import Embed
+from vivcord.datatypes.emoji import Emoji
 from vivcord.datatypes.guild import Guild
 from vivcord.datatypes.intents import Intents
-from vivcord.datatypes.message import Message, SendMessageData
-from vivcord.datatypes.permission import Permission
+from vivcord.datatypes.message import (
+    Message,
+    MessageFlags,
+    MessageType,
+    SendMessageData,
+)
+from vivcord.datatypes.permission import Permission, PermissionOverwrite
 from vivcord.datatypes.role import Role
 from vivcord.datatypes.snowflake import Snowflake
 from vivcord.datatypes.user import Member, User
@@ -40,6 +50,8 @@ if TYPE_CHECKING:
 class Application:
     """A discord application."""
 
+    __slots__ = ("id_", "owner")
+
     def __init__(self, client: Client, data: type_dicts.ApplicationData) -> None:
         """
         Create application instance.
@@ -49,4 +61,4 @@ class Application:
             data (type_dicts.ApplicationData): Data from discord
         """
         self.id_ = Snowflake(data["id"])
-        self.owner = User(client, data["owner"]) if "owner" in data else None
+        self.owner = client.user_map.intern(data["owner"]) if "owner" in data else None
@@ -2,22 +2,20 @@
 
 from __future__ import annotations
 
-from datetime import datetime
 from enum import IntEnum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, TypeVar
 
-from loguru import logger
-
-from vivcord import helpers
-from vivcord.datatypes.not_implemented import ToBeImplemented
-from vivcord.datatypes.permission import Permission
+from vivcord import _logging, helpers, timestamps
+from vivcord.datatypes.lazy import Decoder, LazyDecodable, lazy_variant
+from vivcord.datatypes.permission import Permission, PermissionOverwrite
 from vivcord.datatypes.snowflake import Snowflake
-from vivcord.datatypes.user import User
 
 if TYPE_CHECKING:
     from vivcord import _typed_dicts as type_dicts
     from vivcord.client import Client
 
+ChannelT = TypeVar("ChannelT", bound="Channel")
+
 
 class ChannelType(IntEnum):
     """Discord channel type."""
@@ -35,9 +33,72 @@ class ChannelType(IntEnum):
     GUILD_STAGE_VOICE = 13
 
 
-class Channel:
+THREAD_TYPES = frozenset(
+    {
+        ChannelType.GUILD_NEWS_THREAD,
+        ChannelType.GUILD_PUBLIC_THREAD,
+        ChannelType.GUILD_PRIVATE_THREAD,
+    }
+)
+
+# The channel tree uses multiple inheritance, and only one base of a class may add slots.
+# So the in between classes have empty slots and the concrete channels declare the attributes of all their bases.
+_TEXT_SLOTS = ("last_message_id", "last_pin_timestamp")
+_GUILD_SLOTS = (
+    "guild_id",
+    "position",
+    "permission_overwrites",
+    "name",
+    "current_user_permissions",
+)
+_NON_GROUP_SLOTS = ("parent_id",)
+
+# channel class of every channel type, filled by `_register`.
+_CHANNEL_TYPES: dict[int, type[Channel]] = {}
+
+
+def _register(
+    *channel_types: ChannelType,
+) -> Callable[[type[ChannelT]], type[ChannelT]]:
+    """
+    Register the class `Channel.parse_channel` creates for channel types.
+
+    Args:
+        *channel_types (ChannelType): Channel types to create the class for
+
+    Returns:
+        Callable[[type[ChannelT]], type[ChannelT]]: Decorator that can be used on class to register it
+    """
+
+    def decorator(cls: type[ChannelT]) -> type[ChannelT]:
+        for channel_type in channel_types:
+            _CHANNEL_TYPES[channel_type] = cls
+        return cls
+
+    return decorator
+
+
+def _channel_type(value: int) -> ChannelType | int:
+    """
+    Convert a channel type, keeping types newer than this library as int.
+
+    Args:
+        value (int): channel type from discord
+
+    Returns:
+        ChannelType | int: The known type, or the raw value
+    """
+    try:
+        return ChannelType(value)
+    except ValueError:
+        return value
+
+
+class Channel(LazyDecodable):
     """Discord channel."""
 
+    __slots__ = ("_client", "_raw_data", "id_", "type_")
+
     def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
         """
         Construct channel instance.
@@ -47,60 +108,37 @@ class Channel:
             data (type_dicts.ChannelData): channel json data
         """
         self._client = client
-        self._raw_data = data
+        self._raw_data = data if client.keep_raw_data else None
 
         self.id_ = Snowflake(data["id"])
-        self.type_ = ChannelType(data["type"])
+        self.type_ = _channel_type(data["type"])
 
     @staticmethod
     def parse_channel(client: Client, data: type_dicts.ChannelData) -> Channel:
         """
         Create channel from data.
 
+        Channel types this library does not know yet are created as a plain `Channel`.
+
         Args:
             client (Client): Vivcord client
             data (type_dicts.ChannelData): channel json
 
-        Raises:
-            ValueError: Unknown channel type
-
         Returns:
             Channel: Parsed channel
         """
-        logger.debug(f"creating channel with data: {data!r}")
-        match data["type"]:
-            case 0:
-                channel_type = GuildTextChannel
-            case 1:
-                channel_type = DMChannel
-            case 2:
-                channel_type = GuildVoiceChannel
-            case 3:
-                channel_type = GroupDMChannel
-            case 4:
-                channel_type = GuildCategoryChannel
-            # TODO: parse more channel types.
-            # case 5:
-            #     return GuildNewsChannel(client, data)
-            # case 6:
-            #     return GuildStoreChannel(client, data)
-            # case 10:
-            #     return GuildNewsThreadChannel(client, data)
-            # case 11:
-            #     return GuildPublicThreadChannel(client, data)
-            # case 12:
-            #     return GuildPrivateThreadChannel(client, data)
-            # case 13:
-            #     return GuildStageVoiceChannel(client, data)
-            case _:
-                raise ValueError(f"Unknown channel type: {data['type']}")
-
+        _logging.sampled_debug(
+            "channel parse", "creating channel with data: {!r}", data
+        )
+        channel_type = _CHANNEL_TYPES.get(data["type"], Channel)
         return channel_type(client, data)
 
 
 class TextChannel(Channel):
     """A channel that handels text."""
 
+    __slots__ = ()
+
     def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
         """
         Construct text channel instance.
@@ -116,17 +154,16 @@ class TextChannel(Channel):
             Snowflake(last_message_id) if last_message_id is not None else None
         )
 
-        last_pin_timestamp = data.get("last_pin_timestamp")
-        self.last_pin_timestamp = (
-            datetime.fromtimestamp(int(last_pin_timestamp))
-            if last_pin_timestamp is not None
-            else None
+        self.last_pin_timestamp = timestamps.parse_optional_iso(
+            data.get("last_pin_timestamp")
         )
 
 
 class GuildChannel(Channel):
     """Channel in a guild."""
 
+    __slots__ = ()
+
     def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
         """
         Construct guild channel instance.
@@ -140,8 +177,16 @@ class GuildChannel(Channel):
         guild_id = helpers.check_expected_value(data.get("guild_id"), 0)
         self.guild_id = Snowflake(guild_id)
 
-        self.position = helpers.check_expected_value(data.get("position"), -1)
-        self.permission_overwrites = ToBeImplemented()
+        # threads have no position and no overwrites of their own.
+        self.position = (
+            data.get("position", -1)
+            if self.type_ in THREAD_TYPES
+            else helpers.check_expected_value(data.get("position"), -1)
+        )
+        self.permission_overwrites = [
+            PermissionOverwrite(overwrite)
+            for overwrite in data.get("permission_overwrites", [])
+        ]
         self.name = helpers.check_expected_value(data.get("name"), "")
 
         perms = data.get("permissions")
@@ -150,13 +195,18 @@ class GuildChannel(Channel):
         )
 
 
+@_register(ChannelType.GUILD_CATEGORY)
 class GuildCategoryChannel(GuildChannel):
     """A guild channel."""
 
+    __slots__ = _GUILD_SLOTS
+
 
 class GuildNonGroup(GuildChannel):
     """A guild channel that is not the group type."""
 
+    __slots__ = ()
+
     def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
         """
         Construct guild non group channel instance.
@@ -171,9 +221,20 @@ class GuildNonGroup(GuildChannel):
         self.parent_id = Snowflake(parent_id) if parent_id is not None else None
 
 
+@_register(ChannelType.GUILD_TEXT)
 class GuildTextChannel(TextChannel, GuildNonGroup):
     """A guild text channel."""
 
+    __slots__ = (
+        *_TEXT_SLOTS,
+        *_GUILD_SLOTS,
+        *_NON_GROUP_SLOTS,
+        "topic",
+        "nsfw",
+        "slowmode_delay",
+        "default_auto_archive_duration",
+    )
+
     def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
         """
         Construct guild text channel instance.
@@ -192,9 +253,19 @@ class GuildTextChannel(TextChannel, GuildNonGroup):
         )
 
 
+@_register(ChannelType.GUILD_VOICE)
 class GuildVoiceChannel(GuildNonGroup):
     """Voice channel."""
 
+    __slots__ = (
+        *_GUILD_SLOTS,
+        *_NON_GROUP_SLOTS,
+        "bitrate",
+        "user_limit",
+        "rtc_region",
+        "video_quality_mode",
+    )
+
     def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
         """
         Construct guild voice channel instance.
@@ -213,9 +284,12 @@ class GuildVoiceChannel(GuildNonGroup):
         )
 
 
+@_register(ChannelType.DM)
 class DMChannel(TextChannel):
     """A dm."""
 
+    __slots__ = (*_TEXT_SLOTS, "recpients")
+
     def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
         """
         Construct dm channel instance.
@@ -230,12 +304,15 @@ class DMChannel(TextChannel):
         if recps is None:
             self.recpients = []
         else:
-            self.recpients = [User(client, recp) for recp in recps]
+            self.recpients = [client.user_map.intern(recp) for recp in recps]
 
 
+@_register(ChannelType.GROUP_DM)
 class GroupDMChannel(DMChannel):
     """A dm with multiple people."""
 
+    __slots__ = ("owner_id", "application_id")
+
     def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
         """
         Construct group dm channel instance.
@@ -248,3 +325,229 @@ class GroupDMChannel(DMChannel):
 
         self.owner_id = helpers.check_expected_value(data.get("owner_id"), 0)
         self.application_id = data.get("application_id")
+
+
+@_register(ChannelType.GUILD_NEWS)
+class GuildNewsChannel(GuildTextChannel):
+    """A announcement channel, other guilds can follow it."""
+
+    __slots__ = ()
+
+
+@_register(ChannelType.GUILD_STORE)
+class GuildStoreChannel(GuildNonGroup):
+    """A channel selling a game."""
+
+    __slots__ = (*_GUILD_SLOTS, *_NON_GROUP_SLOTS, "nsfw")
+
+    def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
+        """
+        Construct guild store channel instance.
+
+        Args:
+            client (Client): Vivcord client
+            data (type_dicts.ChannelData): channel json data
+        """
+        super().__init__(client, data)
+
+        self.nsfw = data.get("nsfw", False)
+
+
+@_register(ChannelType.GUILD_STAGE_VOICE)
+class GuildStageVoiceChannel(GuildVoiceChannel):
+    """A voice channel for hosting events with a audience."""
+
+    __slots__ = ()
+
+
+# https://discord.com/developers/docs/resources/channel#thread-metadata-object
+class ThreadMetadata:
+    """Thread specific fields of a thread."""
+
+    __slots__ = (
+        "archived",
+        "auto_archive_duration",
+        "archive_timestamp",
+        "locked",
+        "invitable",
+        "create_timestamp",
+    )
+
+    def __init__(self, data: type_dicts.ThreadMetadataData) -> None:
+        """
+        Create thread metadata.
+
+        Args:
+            data (type_dicts.ThreadMetadataData): thread metadata json data
+        """
+        self.archived = data["archived"]
+        self.auto_archive_duration = data["auto_archive_duration"]
+        self.archive_timestamp = timestamps.parse_iso(data["archive_timestamp"])
+        self.locked = data["locked"]
+        self.invitable = data.get("invitable")
+
+        self.create_timestamp = timestamps.parse_optional_iso(
+            data.get("create_timestamp")
+        )
+
+
+@_register(
+    ChannelType.GUILD_NEWS_THREAD,
+    ChannelType.GUILD_PUBLIC_THREAD,
+    ChannelType.GUILD_PRIVATE_THREAD,
+)
+class ThreadChannel(TextChannel, GuildNonGroup):
+    """A thread, `parent_id` is the channel it was started in."""
+
+    __slots__ = (
+        *_TEXT_SLOTS,
+        *_GUILD_SLOTS,
+        *_NON_GROUP_SLOTS,
+        "owner_id",
+        "slowmode_delay",
+        "message_count",
+        "member_count",
+        "metadata",
+    )
+
+    def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
+        """
+        Construct thread channel instance.
+
+        Args:
+            client (Client): Vivcord client
+            data (type_dicts.ChannelData): channel json data
+        """
+        super().__init__(client, data)
+
+        owner_id = data.get("owner_id")
+        self.owner_id = Snowflake(owner_id) if owner_id is not None else None
+        self.slowmode_delay = data.get("rate_limit_per_user")
+        self.message_count = data.get("message_count")
+        self.member_count = data.get("member_count")
+
+        metadata = data.get("thread_metadata")
+        self.metadata = ThreadMetadata(metadata) if metadata is not None else None
+
+
+# decoders of the lazy channel variants, grouped like the slots above.
+_CHANNEL_DECODERS: dict[str, Decoder] = {
+    "id_": lambda client, data: Snowflake(data["id"]),
+    "type_": lambda client, data: _channel_type(data["type"]),
+}
+_TEXT_DECODERS: dict[str, Decoder] = {
+    "last_message_id": lambda client, data: Snowflake(data["last_message_id"])
+    if data.get("last_message_id") is not None
+    else None,
+    "last_pin_timestamp": lambda client, data: timestamps.parse_optional_iso(
+        data.get("last_pin_timestamp")
+    ),
+}
+_GUILD_DECODERS: dict[str, Decoder] = {
+    "guild_id": lambda client, data: Snowflake(
+        helpers.check_expected_value(data.get("guild_id"), 0)
+    ),
+    "position": lambda client, data: data.get("position", -1)
+    if data["type"] in THREAD_TYPES
+    else helpers.check_expected_value(data.get("position"), -1),
+    "permission_overwrites": lambda client, data: [
+        PermissionOverwrite(overwrite)
+        for overwrite in data.get("permission_overwrites", [])
+    ],
+    "name": lambda client, data: helpers.check_expected_value(data.get("name"), ""),
+    "current_user_permissions": lambda client, data: Permission(
+        int(data["permissions"])
+    )
+    if data.get("permissions") is not None
+    else None,
+}
+_NON_GROUP_DECODERS: dict[str, Decoder] = {
+    "parent_id": lambda client, data: Snowflake(
+        helpers.check_expected_value(data.get("parent_id"), 0)
+    ),
+}
+_DM_DECODERS: dict[str, Decoder] = {
+    "recpients": lambda client, data: [
+        client.user_map.intern(recp)
+        for recp in helpers.check_expected_value(data.get("recipients"), None) or []
+    ],
+}
+
+_GUILD_TEXT_DECODERS: dict[str, Decoder] = {
+    **_CHANNEL_DECODERS,
+    **_TEXT_DECODERS,
+    **_GUILD_DECODERS,
+    **_NON_GROUP_DECODERS,
+    "topic": lambda client, data: helpers.check_expected_value(data.get("topic"), ""),
+    "nsfw": lambda client, data: helpers.check_expected_value(data.get("nsfw"), False),
+    "slowmode_delay": lambda client, data: data.get("rate_limit_per_user"),
+    "default_auto_archive_duration": lambda client, data: (
+        helpers.check_expected_value(data.get("default_auto_archive_duration"), 0)
+    ),
+}
+_GUILD_VOICE_DECODERS: dict[str, Decoder] = {
+    **_CHANNEL_DECODERS,
+    **_GUILD_DECODERS,
+    **_NON_GROUP_DECODERS,
+    "bitrate": lambda client, data: helpers.check_expected_value(
+        data.get("bitrate"), 0
+    ),
+    "user_limit": lambda client, data: helpers.check_expected_value(
+        data.get("user_limit"), 0
+    ),
+    "rtc_region": lambda client, data: data.get("rtc_regeion"),
+    "video_quality_mode": lambda client, data: helpers.check_expected_value(
+        data.get("video_quality_mode"), 1
+    ),
+}
+
+LazyChannel = lazy_variant(Channel, _CHANNEL_DECODERS)
+LazyGuildTextChannel = lazy_variant(GuildTextChannel, _GUILD_TEXT_DECODERS)
+LazyGuildNewsChannel = lazy_variant(GuildNewsChannel, _GUILD_TEXT_DECODERS)
+LazyGuildVoiceChannel = lazy_variant(GuildVoiceChannel, _GUILD_VOICE_DECODERS)
+LazyGuildStageVoiceChannel = lazy_variant(GuildStageVoiceChannel, _GUILD_VOICE_DECODERS)
+LazyGuildCategoryChannel = lazy_variant(
+    GuildCategoryChannel, {**_CHANNEL_DECODERS, **_GUILD_DECODERS}
+)
+LazyGuildStoreChannel = lazy_variant(
+    GuildStoreChannel,
+    {
+        **_CHANNEL_DECODERS,
+        **_GUILD_DECODERS,
+        **_NON_GROUP_DECODERS,
+        "nsfw": lambda client, data: data.get("nsfw", False),
+    },
+)
+LazyThreadChannel = lazy_variant(
+    ThreadChannel,
+    {
+        **_CHANNEL_DECODERS,
+        **_TEXT_DECODERS,
+        **_GUILD_DECODERS,
+        **_NON_GROUP_DECODERS,
+        "owner_id": lambda client, data: Snowflake(data["owner_id"])
+        if data.get("owner_id") is not None
+        else None,
+        "slowmode_delay": lambda client, data: data.get("rate_limit_per_user"),
+        "message_count": lambda client, data: data.get("message_count"),
+        "member_count": lambda client, data: data.get("member_count"),
+        "metadata": lambda client, data: ThreadMetadata(data["thread_metadata"])
+        if data.get("thread_metadata") is not None
+        else None,
+    },
+)
+LazyDMChannel = lazy_variant(
+    DMChannel, {**_CHANNEL_DECODERS, **_TEXT_DECODERS, **_DM_DECODERS}
+)
+LazyGroupDMChannel = lazy_variant(
+    GroupDMChannel,
+    {
+        **_CHANNEL_DECODERS,
+        **_TEXT_DECODERS,
+        **_DM_DECODERS,
+        "owner_id": lambda client, data: helpers.check_expected_value(
+            data.get("owner_id"), 0
+        ),
+        "application_id": lambda client, data: data.get("application_id"),
+    },
+)
@@ -2,16 +2,30 @@
 
 from __future__ import annotations
 
-from datetime import datetime
 from typing import TYPE_CHECKING
 
+from vivcord import timestamps
+
 if TYPE_CHECKING:
+    from datetime import datetime
+
     from vivcord import _typed_dicts as type_dicts
 
 
 class Embed:
     """Discord embed."""
 
+    __slots__ = (
+        "title",
+        "description",
+        "url",
+        "timestamp",
+        "color",
+        "footer",
+        "image",
+        "thumbnail",
+    )
+
     def __init__(
         self,
         title: str | None = None,
@@ -71,9 +85,7 @@ class Embed:
             data.get("title"),
             data.get("description"),
             url=data.get("url"),
-            timestamp=datetime.fromtimestamp(int(data["timestamp"]))
-            if "timestamp" in data
-            else None,
+            timestamp=timestamps.parse_optional_iso(data.get("timestamp")),
             color=data.get("color"),
             footer=EmbedFooter.from_json(data["footer"]) if "footer" in data else None,
             image=EmbedImage.from_json(data["image"]) if "image" in data else None,
@@ -98,7 +110,7 @@ class Embed:
         if self.url:
             data["url"] = self.url
         if self.timestamp:
-            data["timestamp"] = str(int(self.timestamp.timestamp()))
+            data["timestamp"] = timestamps.format_iso(self.timestamp)
         if self.color:
             data["color"] = self.color
         if self.footer:
@@ -112,6 +124,8 @@ class Embed:
 class EmbedFooter:
     """Embed footer."""
 
+    __slots__ = ("text", "icon_url")
+
     def __init__(
         self,
         text: str,
@@ -160,6 +174,8 @@ class EmbedFooter:
 class EmbedImage:
     """Embed image."""
 
+    __slots__ = ("url", "width", "height")
+
     def __init__(
         self, url: str, height: int | None = None, width: int | None = None
     ) -> None:
@@ -208,6 +224,8 @@ class EmbedImage:
 class EmbedThumbnail:
     """Embed thumbnail."""
 
+    __slots__ = ("url", "width", "height")
+
     def __init__(
         self, url: str, height: int | None = None, width: int | None = None
     ) -> None:
@@ -0,0 +1,50 @@
+"""Custom emojis of a guild."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from vivcord.datatypes.snowflake import Snowflake
+
+if TYPE_CHECKING:
+    from vivcord import _typed_dicts as type_dicts
+    from vivcord.client import Client
+
+
+# https://discord.com/developers/docs/resources/emoji#emoji-object
+class Emoji:
+    """A custom emoji."""
+
+    __slots__ = (
+        "_client",
+        "_raw_data",
+        "id_",
+        "name",
+        "role_ids",
+        "user",
+        "require_colons",
+        "managed",
+        "animated",
+        "available",
+    )
+
+    def __init__(self, client: Client, data: type_dicts.EmojiData) -> None:
+        """
+        Create emoji.
+
+        Args:
+            client (Client): vivcord client
+            data (type_dicts.EmojiData): emoji json data
+        """
+        self._client = client
+        self._raw_data = data if client.keep_raw_data else None
+
+        emoji_id = data["id"]
+        self.id_ = Snowflake(emoji_id) if emoji_id is not None else None
+        self.name = data["name"]
+        self.role_ids = [Snowflake(id_) for id_ in data.get("roles", [])]
+        self.user = client.user_map.intern(data["user"]) if "user" in data else None
+        self.require_colons = data.get("require_colons", True)
+        self.managed = data.get("managed", False)
+        self.animated = data.get("animated", False)
+        self.available = data.get("available", True)
@@ -1,39 +1,146 @@
 """Flags to set specific settings on objects."""
 
+from __future__ import annotations
 
-class UserFlags:
-    """Discord user flags."""
+from typing import TYPE_CHECKING, overload
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+class flag(int):  # noqa: N801
+    """
+    A single bit of a BitFlags type.
+
+    On the class this is the precomputed bit value,
+    on a instance it is a property telling if the bit is set.
+    Combining flags gives a instance of the BitFlags type they belong to.
+    """
+
+    # no __slots__, int subclasses can only have a __dict__ and the owner is stored in it.
+    _owner: type[BitFlags] | None = None
+
+    def __set_name__(self, owner: type[BitFlags], name: str) -> None:
+        self._owner = owner
+
+    @overload
+    def __get__(self, instance: None, owner: type[BitFlags]) -> flag:
+        ...
+
+    @overload
+    def __get__(self, instance: BitFlags, owner: type[BitFlags]) -> bool:
+        ...
 
-    def __init__(self, flags: int) -> None:
+    def __get__(self, instance: BitFlags | None, owner: type[BitFlags]) -> flag | bool:
+        if instance is None:
+            return self
+        return int.__and__(instance, self) == self
+
+    def _wrap(self, value: int) -> int:
         """
-        Construct a flags instance.
+        Turn a combined value into the BitFlags type of this flag.
 
         Args:
-            flags (int): The user flags encoded as a int.
+            value (int): The combined value
+
+        Returns:
+            int: The value as the owning BitFlags type, a plain int for a flag outside of one
         """
-        self._raw_flag = flags
-
-        self.staff = bool(flags & (1 << 0))
-        self.partner = bool(flags & (1 << 1))
-        self.hypesquad = bool(flags & (1 << 2))
-        self.bug_hunter_level_1 = bool(flags & (1 << 3))
-        self.hypersquad_online_house_1 = bool(flags & (1 << 6))
-        self.hypersquad_online_house_2 = bool(flags & (1 << 7))
-        self.hypersquad_online_house_3 = bool(flags & (1 << 8))
-        self.premium_early_supporter = bool(flags & (1 << 9))
-        self.team_pseudo_user = bool(flags & (1 << 10))
-        self.bug_hunter_level_2 = bool(flags & (1 << 14))
-        self.partner = bool(flags & (1 << 15))
-        self.verified_bot = bool(flags & (1 << 16))
-        self.verified_developer = bool(flags & (1 << 17))
-        self.certified_moderator = bool(flags & (1 << 18))
-        self.bot_http_interactions = bool(flags & (1 << 19))
+        return self._owner(value) if self._owner is not None else value
+
+    # BitFlags operands get NotImplemented, so their reflected operator keeps their exact type.
+    def __or__(self, other: int) -> int:
+        if isinstance(other, BitFlags):
+            return NotImplemented
+        return self._wrap(int(self) | int(other))
+
+    def __and__(self, other: int) -> int:
+        if isinstance(other, BitFlags):
+            return NotImplemented
+        return self._wrap(int(self) & int(other))
+
+    def __xor__(self, other: int) -> int:
+        if isinstance(other, BitFlags):
+            return NotImplemented
+        return self._wrap(int(self) ^ int(other))
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __invert__(self) -> int:
+        if self._owner is None:
+            return ~int(self)
+        return self._owner(self._owner.all_bits & ~int(self))
+
+
+class BitFlags(int):
+    """
+    Immutable set of flags stored in a single int.
+
+    Supports `|` (union), `&` (intersection), `-` (difference), `^`, `~` (complement within the known flags)
+    and `flag in flags`.
+    """
+
+    __slots__ = ()
+
+    # every flag declared on the type, the universe `~` complements in.
+    all_bits = 0
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        all_bits = cls.all_bits
+        for value in vars(cls).values():
+            if isinstance(value, flag):
+                all_bits |= int(value)
+        cls.all_bits = all_bits
+
+    def __or__(self, other: int) -> Self:
+        return type(self)(int(self) | int(other))
+
+    def __and__(self, other: int) -> Self:
+        return type(self)(int(self) & int(other))
+
+    def __sub__(self, other: int) -> Self:
+        return type(self)(int(self) & ~int(other))
+
+    def __xor__(self, other: int) -> Self:
+        return type(self)(int(self) ^ int(other))
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __invert__(self) -> Self:
+        return type(self)(self.all_bits & ~int(self))
+
+    def __contains__(self, other: int) -> bool:
+        return int(self) & other == other
 
     def __str__(self) -> str:
-        return str(self._raw_flag)
+        return int.__repr__(self)
 
     def __repr__(self) -> str:
-        return f"UserFlags({self._raw_flag})"
+        return f"{self.__class__.__name__}({int.__repr__(self)})"
+
+
+# https://discord.com/developers/docs/resources/user#user-object-user-flags
+class UserFlags(BitFlags):
+    """Discord user flags."""
+
+    __slots__ = ()
 
-    def __int__(self) -> int:
-        return self._raw_flag
+    staff = flag(1 << 0)
+    partner = flag(1 << 1)
+    hypesquad = flag(1 << 2)
+    bug_hunter_level_1 = flag(1 << 3)
+    hypersquad_online_house_1 = flag(1 << 6)
+    hypersquad_online_house_2 = flag(1 << 7)
+    hypersquad_online_house_3 = flag(1 << 8)
+    premium_early_supporter = flag(1 << 9)
+    team_pseudo_user = flag(1 << 10)
+    bug_hunter_level_2 = flag(1 << 14)
+    verified_bot = flag(1 << 16)
+    verified_developer = flag(1 << 17)
+    certified_moderator = flag(1 << 18)
+    bot_http_interactions = flag(1 << 19)
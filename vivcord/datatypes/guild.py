@@ -1,7 +1,267 @@
 """Discord server."""
 
+from __future__ import annotations
 
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING
+
+from vivcord.datatypes.channel import THREAD_TYPES
+from vivcord.datatypes.emoji import Emoji
+from vivcord.datatypes.snowflake import Snowflake
+
+if TYPE_CHECKING:
+    from vivcord import _typed_dicts as type_dicts
+    from vivcord.client import Client
+    from vivcord.datatypes.channel import Channel
+    from vivcord.datatypes.role import Role
+    from vivcord.datatypes.user import Member
+
+
+def _role_key(role: Role) -> tuple[int, int]:
+    """
+    Sort key of a role, roles with the same position are ordered by id with the oldest role on top.
+
+    Args:
+        role (Role): The role
+
+    Returns:
+        tuple[int, int]: Key that sorts from the lowest to the highest role
+    """
+    return role.position, -role.id
+
+
+# https://discord.com/developers/docs/resources/guild#guild-object
 class Guild:
-    """Discord server."""
+    """
+    Discord server.
+
+    The state cache keeps `channels`, `threads`, `roles` and `emojis` up to date from gateway events,
+    together with the channels by category and the roles by position.
+    Members are not indexed here, they live in the member cache keyed by guild and user id,
+    so `get_member` respects the members cache policy.
+    """
+
+    __slots__ = (
+        "_client",
+        "_raw_data",
+        "id_",
+        "name",
+        "icon",
+        "owner_id",
+        "description",
+        "preferred_locale",
+        "member_count",
+        "large",
+        "unavailable",
+        "channels",
+        "threads",
+        "roles",
+        "emojis",
+        "_category_channels",
+        "_role_order",
+    )
+
+    def __init__(self, client: Client, data: type_dicts.GuildData) -> None:
+        """
+        Create guild.
+
+        Args:
+            client (Client): vivcord client
+            data (type_dicts.GuildData): guild json data
+        """
+        self._client = client
+        self._raw_data = data if client.keep_raw_data else None
+
+        self.id_ = Snowflake(data["id"])
+        self.unavailable = data.get("unavailable", False)
+        self.member_count = data.get("member_count")
+        self.large = data.get("large", False)
+
+        self.channels: dict[Snowflake, Channel] = {}
+        self.threads: dict[Snowflake, Channel] = {}
+        self.roles: dict[Snowflake, Role] = {}
+        # channel ids by parent category id, None holds the channels without a category.
+        self._category_channels: dict[Snowflake | None, set[Snowflake]] = {}
+        # `_role_key` of every role, sorted from the lowest to the highest role.
+        self._role_order: list[tuple[int, int]] = []
+        self.update(data)
+
+    def update(self, data: type_dicts.GuildData) -> None:
+        """
+        Update the fields sent in GUILD_UPDATE.
+
+        Args:
+            data (type_dicts.GuildData): guild json data
+        """
+        self.name = data["name"]
+        self.icon = data["icon"]
+        self.owner_id = Snowflake(data["owner_id"])
+        self.description = data["description"]
+        self.preferred_locale = data["preferred_locale"]
+        self.emojis = {
+            emoji.id_: emoji
+            for emoji in (
+                Emoji(self._client, emoji) for emoji in data.get("emojis", [])
+            )
+            if emoji.id_ is not None
+        }
+
+    def carry_over(self, previous: Guild) -> None:
+        """
+        Keep the state GUILD_UPDATE does not send from the previous version of this guild.
+
+        Args:
+            previous (Guild): The guild before the update
+        """
+        self.member_count = previous.member_count
+        self.large = previous.large
+        self.channels = previous.channels
+        self.threads = previous.threads
+        self._category_channels = previous._category_channels
+
+    @staticmethod
+    def _parent_id(channel: Channel) -> Snowflake | None:
+        parent_id: Snowflake | None = getattr(channel, "parent_id", None)
+        # channels without a parent get a parent id of 0 when it is missing from the payload.
+        return parent_id or None
+
+    def add_channel(self, channel: Channel) -> None:
+        """
+        Add or replace a channel or thread.
+
+        Args:
+            channel (Channel): The channel
+        """
+        if channel.type_ in THREAD_TYPES:
+            self.threads[channel.id_] = channel
+            return
+
+        previous = self.channels.get(channel.id_)
+        if previous is not None:
+            self._category_channels.get(self._parent_id(previous), set()).discard(
+                channel.id_
+            )
+        self.channels[channel.id_] = channel
+        self._category_channels.setdefault(self._parent_id(channel), set()).add(
+            channel.id_
+        )
+
+    def remove_channel(self, channel_id: int) -> Channel | None:
+        """
+        Remove a channel or thread.
+
+        Args:
+            channel_id (int): Id of the channel
+
+        Returns:
+            Channel | None: The removed channel, or None if it was not indexed
+        """
+        thread = self.threads.pop(channel_id, None)  # type: ignore
+        if thread is not None:
+            return thread
+
+        channel = self.channels.pop(channel_id, None)  # type: ignore
+        if channel is not None:
+            self._category_channels.get(self._parent_id(channel), set()).discard(
+                channel.id_
+            )
+        return channel
+
+    def channels_in(self, category_id: int | None) -> list[Channel]:
+        """
+        Get the channels in a category.
+
+        Args:
+            category_id (int, optional): Id of the category, or None for the channels without one
+
+        Returns:
+            list[Channel]: The channels, sorted by position
+        """
+        channels = [
+            self.channels[channel_id]
+            for channel_id in self._category_channels.get(category_id, ())  # type: ignore
+        ]
+        channels.sort(
+            key=lambda channel: (getattr(channel, "position", 0), channel.id_)
+        )
+        return channels
+
+    def add_role(self, role: Role) -> None:
+        """
+        Add or replace a role.
+
+        Args:
+            role (Role): The role
+        """
+        self.remove_role(role.id)
+        self.roles[role.id] = role
+        insort(self._role_order, _role_key(role))
+
+    def remove_role(self, role_id: int) -> Role | None:
+        """
+        Remove a role.
+
+        Args:
+            role_id (int): Id of the role
+
+        Returns:
+            Role | None: The removed role, or None if it was not indexed
+        """
+        role = self.roles.pop(role_id, None)  # type: ignore
+        if role is not None:
+            index = bisect_left(self._role_order, _role_key(role))
+            del self._role_order[index]
+        return role
+
+    def set_roles(self, roles: list[Role]) -> None:
+        """
+        Replace every role, used for the full list sent in GUILD_CREATE and GUILD_UPDATE.
+
+        Args:
+            roles (list[Role]): The roles
+        """
+        self.roles = {role.id: role for role in roles}
+        self._role_order = sorted(_role_key(role) for role in roles)
+
+    @property
+    def sorted_roles(self) -> list[Role]:
+        """
+        Get the roles from the lowest to the highest.
+
+        Returns:
+            list[Role]: The roles
+        """
+        return [
+            self.roles[Snowflake(-negative_id)] for _, negative_id in self._role_order
+        ]
+
+    def highest_role(self, member: Member) -> Role | None:
+        """
+        Get the highest role of a member.
+
+        Args:
+            member (Member): A member of this guild
+
+        Returns:
+            Role | None: The role, or None if the member has no roles
+        """
+        highest: Role | None = None
+        for role_id in member.role_ids:
+            role = self.roles.get(role_id)
+            if role is not None and (
+                highest is None or _role_key(role) > _role_key(highest)
+            ):
+                highest = role
+        return highest
+
+    def get_member(self, user_id: int) -> Member | None:
+        """
+        Get a member of this guild from the cache.
+
+        Args:
+            user_id (int): User id of the member
 
-    # TODO: this
+        Returns:
+            Member | None: The member, or None if it is not cached
+        """
+        return self._client.cache.get_member(self.id_, user_id)
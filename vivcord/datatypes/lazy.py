@@ -0,0 +1,102 @@
+"""Datatypes that decode their attributes on first access."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Mapping, TypeVar, cast
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from vivcord.client import Client
+
+DatatypeT = TypeVar("DatatypeT", bound="LazyDecodable")
+
+Decoder = Callable[["Client", Any], Any]
+
+_LAZY_TYPES: dict[type[Any], type[Any]] = {}
+
+
+class LazyDecodable:
+    """
+    Base of the datatypes that have a lazy variant.
+
+    Creating one with a client that has `lazy_datatypes` set creates the lazy variant instead,
+    which only keeps the payload and decodes each attribute when it is first read.
+    """
+
+    __slots__ = ()
+
+    def __new__(
+        cls, client: Client | None = None, *args: Any, **kwargs: Any  # noqa: ANN401
+    ) -> Self:
+        lazy = _LAZY_TYPES.get(cls)
+        if lazy is not None and client is not None and client.lazy_datatypes:
+            return cast("Self", object.__new__(lazy))
+        return object.__new__(cls)
+
+
+class _LazyVariant:
+    """
+    Methods of the lazy variants.
+
+    The attributes stay the slots of the eager type. A unset slot falls through to `__getattr__`,
+    which decodes and stores the value, so every later read is a plain slot read.
+    """
+
+    __slots__ = ()
+
+    _decoders: Mapping[str, Decoder]
+    _client: Client
+    _data: Any
+
+    def __init__(self, client: Client, data: Any) -> None:  # noqa: ANN401
+        self._client = client
+        self._raw_data = data if client.keep_raw_data else None
+        self._data = data
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        decode = self._decoders.get(name)
+        if decode is None:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        value = decode(self._client, self._data)
+        setattr(self, name, value)
+        return value
+
+
+def lazy_variant(
+    eager: type[DatatypeT], decoders: Mapping[str, Decoder]
+) -> type[DatatypeT]:
+    """
+    Create the lazy variant of a datatype.
+
+    Every attribute of the eager type needs a decoder, they are only checked when read.
+
+    Args:
+        eager (type[DatatypeT]): The eager datatype
+        decoders (Mapping[str, Decoder]): Decoder for every attribute
+
+    Raises:
+        TypeError: A decoder is not for a slot of the eager type.
+
+    Returns:
+        type[DatatypeT]: The lazy datatype, a subclass of the eager one
+    """
+    slots = {name for cls in eager.__mro__ for name in getattr(cls, "__slots__", ())}
+    unknown = set(decoders) - slots
+    if unknown:
+        raise TypeError(f"{eager.__name__} has no slots named {sorted(unknown)}")
+
+    lazy = type(
+        f"Lazy{eager.__name__}",
+        (_LazyVariant, eager),
+        {
+            "__slots__": ("_data",),
+            "__module__": eager.__module__,
+            "__doc__": f"{eager.__name__} that decodes its attributes on first access.",
+            "_decoders": dict(decoders),
+        },
+    )
+    _LAZY_TYPES[eager] = lazy
+    return cast("type[DatatypeT]", lazy)
@@ -2,29 +2,295 @@
 
 from __future__ import annotations
 
+import copy
+from enum import IntEnum
 from typing import TYPE_CHECKING
 
+from vivcord import timestamps
+from vivcord.datatypes.embed import Embed
+from vivcord.datatypes.flags import BitFlags, flag
+from vivcord.datatypes.snowflake import Snowflake
+from vivcord.datatypes.user import Member
+
 if TYPE_CHECKING:
     from vivcord import _typed_dicts as typed_dicts
-    from vivcord.datatypes import Embed
+    from vivcord.client import Client
+
+
+# https://discord.com/developers/docs/resources/channel#message-object-message-types
+class MessageType(IntEnum):
+    """Discord message type."""
+
+    DEFAULT = 0
+    RECIPIENT_ADD = 1
+    RECIPIENT_REMOVE = 2
+    CALL = 3
+    CHANNEL_NAME_CHANGE = 4
+    CHANNEL_ICON_CHANGE = 5
+    CHANNEL_PINNED_MESSAGE = 6
+    GUILD_MEMBER_JOIN = 7
+    USER_PREMIUM_GUILD_SUBSCRIPTION = 8
+    USER_PREMIUM_GUILD_SUBSCRIPTION_TIER_1 = 9
+    USER_PREMIUM_GUILD_SUBSCRIPTION_TIER_2 = 10
+    USER_PREMIUM_GUILD_SUBSCRIPTION_TIER_3 = 11
+    CHANNEL_FOLLOW_ADD = 12
+    GUILD_DISCOVERY_DISQUALIFIED = 14
+    GUILD_DISCOVERY_REQUALIFIED = 15
+    GUILD_DISCOVERY_GRACE_PERIOD_INITIAL_WARNING = 16
+    GUILD_DISCOVERY_GRACE_PERIOD_FINAL_WARNING = 17
+    THREAD_CREATED = 18
+    REPLY = 19
+    CHAT_INPUT_COMMAND = 20
+    THREAD_STARTER_MESSAGE = 21
+    GUILD_INVITE_REMINDER = 22
+    CONTEXT_MENU_COMMAND = 23
+
+
+def _message_type(value: int) -> MessageType | int:
+    """
+    Convert a message type, keeping types newer than this library as int.
+
+    Args:
+        value (int): message type from discord
+
+    Returns:
+        MessageType | int: The known type, or the raw value
+    """
+    try:
+        return MessageType(value)
+    except ValueError:
+        return value
+
+
+# https://discord.com/developers/docs/resources/channel#message-object-message-flags
+class MessageFlags(BitFlags):
+    """Discord message flags."""
+
+    __slots__ = ()
+
+    crossposted = flag(1 << 0)
+    is_crosspost = flag(1 << 1)
+    suppress_embeds = flag(1 << 2)
+    source_message_deleted = flag(1 << 3)
+    urgent = flag(1 << 4)
+    has_thread = flag(1 << 5)
+    ephemeral = flag(1 << 6)
+    loading = flag(1 << 7)
+    failed_to_mention_some_roles_in_thread = flag(1 << 8)
+
+
+# https://discord.com/developers/docs/resources/channel#attachment-object
+class Attachment:
+    """A file attached to a message."""
+
+    __slots__ = (
+        "id_",
+        "filename",
+        "size",
+        "url",
+        "proxy_url",
+        "description",
+        "content_type",
+        "height",
+        "width",
+        "ephemeral",
+    )
+
+    def __init__(self, data: typed_dicts.AttachmentData) -> None:
+        """
+        Create attachment.
+
+        Args:
+            data (typed_dicts.AttachmentData): attachment json data
+        """
+        self.id_ = Snowflake(data["id"])
+        self.filename = data["filename"]
+        self.size = data["size"]
+        self.url = data["url"]
+        self.proxy_url = data["proxy_url"]
+
+        self.description = data.get("description")
+        self.content_type = data.get("content_type")
+        self.height = data.get("height")
+        self.width = data.get("width")
+        self.ephemeral = data.get("ephemeral", False)
+
+
+# https://discord.com/developers/docs/resources/channel#reaction-object
+class Reaction:
+    """Reactions of one emoji on a message."""
+
+    __slots__ = ("count", "me", "emoji_id", "emoji_name")
+
+    def __init__(self, data: typed_dicts.ReactionData) -> None:
+        """
+        Create reaction.
+
+        Args:
+            data (typed_dicts.ReactionData): reaction json data
+        """
+        self.count = data["count"]
+        self.me = data["me"]
+
+        emoji_id = data["emoji"]["id"]
+        self.emoji_id = Snowflake(emoji_id) if emoji_id is not None else None
+        self.emoji_name = data["emoji"]["name"]
+
+
+# https://discord.com/developers/docs/resources/channel#message-reference-object-message-reference-structure
+class MessageReference:
+    """The message a reply, crosspost or pin notification points to."""
 
+    __slots__ = ("message_id", "channel_id", "guild_id")
 
+    def __init__(self, data: typed_dicts.MessageReferenceData) -> None:
+        """
+        Create message reference.
+
+        Args:
+            data (typed_dicts.MessageReferenceData): reference json data
+        """
+        message_id = data.get("message_id")
+        channel_id = data.get("channel_id")
+        guild_id = data.get("guild_id")
+        self.message_id = Snowflake(message_id) if message_id is not None else None
+        self.channel_id = Snowflake(channel_id) if channel_id is not None else None
+        self.guild_id = Snowflake(guild_id) if guild_id is not None else None
+
+
+# https://discord.com/developers/docs/resources/channel#message-object
 class Message:
     """A message gotten from discord."""
 
-    # TODO:
-    pass
+    __slots__ = (
+        "_client",
+        "_raw_data",
+        "id_",
+        "channel_id",
+        "guild_id",
+        "author",
+        "member",
+        "content",
+        "timestamp",
+        "edited_timestamp",
+        "tts",
+        "mention_everyone",
+        "mentions",
+        "mention_role_ids",
+        "attachments",
+        "embeds",
+        "reactions",
+        "pinned",
+        "type_",
+        "webhook_id",
+        "flags",
+        "message_reference",
+        "referenced_message",
+    )
+
+    def __init__(self, client: Client, data: typed_dicts.MessageData) -> None:
+        """
+        Create message.
+
+        Args:
+            client (Client): vivcord client
+            data (typed_dicts.MessageData): message json data
+        """
+        self._client = client
+        self._raw_data = data if client.keep_raw_data else None
+
+        self.id_ = Snowflake(data["id"])
+        self.channel_id = Snowflake(data["channel_id"])
+        guild_id = data.get("guild_id")
+        self.guild_id = Snowflake(guild_id) if guild_id is not None else None
+
+        self.author = client.user_map.intern(data["author"])
+        self.timestamp = timestamps.parse_iso(data["timestamp"])
+        self.tts = data["tts"]
+        self.type_ = _message_type(data["type"])
+
+        webhook_id = data.get("webhook_id")
+        self.webhook_id = Snowflake(webhook_id) if webhook_id is not None else None
+        self.member = Member(client, data["member"]) if "member" in data else None
+        if self.member is not None and self.member.user is None:
+            # the member object of a message does not repeat the author.
+            self.member.user = self.author
+
+        reference = data.get("message_reference")
+        self.message_reference = (
+            MessageReference(reference) if reference is not None else None
+        )
+        referenced = data.get("referenced_message")
+        self.referenced_message = (
+            Message(client, referenced) if referenced is not None else None
+        )
+
+        self.reactions: list[Reaction] = []
+        self.flags = MessageFlags(0)
+        self._apply(data)
+
+    def _apply(self, data: typed_dicts.MessageData) -> None:
+        """
+        Set the fields that can change when the message is edited.
+
+        Missing keys are left alone, because MESSAGE_UPDATE can be partial.
+
+        Args:
+            data (typed_dicts.MessageData): message json data
+        """
+        client = self._client
+        if "content" in data:
+            self.content = data["content"]
+        if "edited_timestamp" in data:
+            self.edited_timestamp = timestamps.parse_optional_iso(
+                data["edited_timestamp"]
+            )
+        if "mention_everyone" in data:
+            self.mention_everyone = data["mention_everyone"]
+        if "mentions" in data:
+            self.mentions = [client.user_map.intern(user) for user in data["mentions"]]
+        if "mention_roles" in data:
+            self.mention_role_ids = [Snowflake(id_) for id_ in data["mention_roles"]]
+        if "attachments" in data:
+            self.attachments = [Attachment(item) for item in data["attachments"]]
+        if "embeds" in data:
+            self.embeds = [Embed.from_json(embed) for embed in data["embeds"]]
+        if "reactions" in data:
+            self.reactions = [Reaction(reaction) for reaction in data["reactions"]]
+        if "pinned" in data:
+            self.pinned = data["pinned"]
+        if "flags" in data:
+            self.flags = MessageFlags(data["flags"])
+
+    def updated(self, data: typed_dicts.MessageData) -> Message:
+        """
+        Create the edited version of this message, leaving this one unchanged.
+
+        Args:
+            data (typed_dicts.MessageData): full or partial message json from MESSAGE_UPDATE
+
+        Returns:
+            Message: The edited message
+        """
+        message = copy.copy(self)
+        message._apply(data)
+        if self._client.keep_raw_data and self._raw_data is not None:
+            message._raw_data = {**self._raw_data, **data}  # type: ignore
+        return message
 
 
 class SendMessageData:
     """Data that should be sent to discord when you are creating messages."""
 
+    __slots__ = ("content", "embeds", "ephemeral")
+
     def __init__(
         self,
         content: str | None = None,
         *,
         embed: Embed | None = None,
         embeds: list[Embed] | None = None,
+        ephemeral: bool = False,
     ) -> None:
         """
         Create message data.
@@ -33,9 +299,11 @@ class SendMessageData:
             content (str, optional): message content. Defaults to None.
             embed (Embed, optional): message embed. Defaults to None.
             embeds (list[Embeds], optional): list of embeds to attach. Defaults to []
+            ephemeral (bool): only show a interaction response to the invoking user. Defaults to False.
         """
         self.content = content
         self.embeds = embeds or []
+        self.ephemeral = ephemeral
 
         if embed is not None:
             self.embeds.append(embed)
@@ -54,4 +322,7 @@ class SendMessageData:
 
         data["embeds"] = [embed.to_json() for embed in self.embeds]
 
+        if self.ephemeral:
+            data["flags"] = int(MessageFlags.ephemeral)
+
         return data
@@ -15,6 +15,19 @@ if TYPE_CHECKING:
 class Role:
     """Discord role."""
 
+    __slots__ = (
+        "_client",
+        "_raw_data",
+        "id",
+        "name",
+        "color",
+        "hoisted",
+        "position",
+        "permissions",
+        "managed",
+        "mentionable",
+    )
+
     def __init__(self, client: Client, data: type_dicts.RoleData):
         """
         Create role.
@@ -24,7 +37,7 @@ class Role:
             data (type_dicts.RoleData): role json data
         """
         self._client = client
-        self._raw_data = data
+        self._raw_data = data if client.keep_raw_data else None
 
         self.id = Snowflake(data["id"])
         self.name = data["name"]
@@ -2,33 +2,78 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from typing import TYPE_CHECKING
 
-# https://discord.com/developers/docs/reference#convert-snowflake-to-datetime
-DISCORD_EPOCH = 1420070400000
+from vivcord.timestamps import DISCORD_EPOCH, snowflake_time
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+__all__ = ("DISCORD_EPOCH", "Snowflake")
 
 
 # https://discord.com/developers/docs/reference#snowflakes
-class Snowflake:
-    """A discord id."""
+class Snowflake(int):
+    """
+    A discord id.
+
+    This is a int, so it hashes and compares like the raw id and can be used as a dict key.
+    The info stored in the id is only extracted when it is accessed.
+    """
+
+    __slots__ = ()
 
-    def __init__(self, snowflake_id: int | str) -> None:
+    def __new__(cls, snowflake_id: int | str) -> Snowflake:
         """
-        Parse snowflake data from id.
+        Create a snowflake from a id.
 
         Args:
-            snowflake_id (int): Id to get data from
+            snowflake_id (int | str): The id
+
+        Returns:
+            Snowflake: The snowflake
         """
-        snowflake_id = int(snowflake_id)
+        return super().__new__(cls, snowflake_id)
 
-        self._raw_id = snowflake_id
+    @property
+    def timestamp(self) -> datetime:
+        """
+        When the id was created.
 
-        self.timestamp = datetime.fromtimestamp(
-            ((snowflake_id >> 22) + DISCORD_EPOCH) / 1000
-        )
-        self.type_dicts_worker_id = (snowflake_id & 0x3E0000) >> 17
-        self.type_dicts_process_id = (snowflake_id & 0x1F000) >> 12
-        self.increment = snowflake_id & 0xFFF
+        Returns:
+            datetime: Timezone aware creation time
+        """
+        return snowflake_time(self)
+
+    @property
+    def worker_id(self) -> int:
+        """
+        Internal worker id of the id.
+
+        Returns:
+            int: The worker id
+        """
+        return (self & 0x3E0000) >> 17
+
+    @property
+    def process_id(self) -> int:
+        """
+        Internal process id of the id.
+
+        Returns:
+            int: The process id
+        """
+        return (self & 0x1F000) >> 12
+
+    @property
+    def increment(self) -> int:
+        """
+        How many ids were generated on the process before this one.
+
+        Returns:
+            int: The increment
+        """
+        return self & 0xFFF
 
     @classmethod
     def from_timestamp(cls, timestamp: int) -> Snowflake:
@@ -44,10 +89,7 @@ class Snowflake:
         return cls((timestamp - DISCORD_EPOCH) << 22)
 
     def __str__(self) -> str:
-        return str(self._raw_id)
+        return int.__repr__(self)
 
     def __repr__(self) -> str:
-        return f"Snowflake({self._raw_id})"
-
-    def __int__(self) -> int:
-        return self._raw_id
+        return f"Snowflake({int.__repr__(self)})"
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-from datetime import datetime
 from enum import IntEnum
 from typing import TYPE_CHECKING
+from weakref import WeakValueDictionary
 
+from vivcord import timestamps
 from vivcord.datatypes.flags import UserFlags
+from vivcord.datatypes.lazy import LazyDecodable, lazy_variant
 from vivcord.datatypes.permission import Permission
 from vivcord.datatypes.snowflake import Snowflake
 
@@ -25,9 +27,30 @@ class NitroType(IntEnum):
 
 
 # https://discord.com/developers/docs/resources/user#user-object-user-structure
-class User:
+class User(LazyDecodable):
     """Reperesents a user."""
 
+    __slots__ = (
+        "__weakref__",
+        "_client",
+        "_raw_data",
+        "id_",
+        "username",
+        "discriminator",
+        "bot",
+        "system",
+        "mfa_enabled",
+        "premium_type",
+        "_avatar_hash",
+        "_banner_hash",
+        "accent_color",
+        "locale",
+        "verified",
+        "email",
+        "flags",
+        "private_flags",
+    )
+
     def __init__(self, client: Client, data: type_dicts.UserData) -> None:
         """
         Construct a User instance.
@@ -39,35 +62,153 @@ class User:
             data (type_dicts.UserData): The raw user data
         """
         self._client = client
-        self._raw_data = data
-
         self.id_ = Snowflake(data["id"])
+
+        self.bot = False
+        self.system = False
+        self.mfa_enabled = False
+        self.premium_type = None
+        self._banner_hash = None
+        self.accent_color = None
+        self.locale = None
+        self.verified = None
+        self.email = None
+        self.flags = None
+        self.private_flags = None
+        self.update(data)
+
+    def update(self, data: type_dicts.UserData) -> None:
+        """
+        Update the user in place from a newer payload.
+
+        Fields the payload leaves out keep their value,
+        a message author does not carry the email or locale the bot user got in READY.
+
+        Args:
+            data (type_dicts.UserData): The raw user data
+        """
+        self._raw_data = data if self._client.keep_raw_data else None
+
         self.username = data["username"]
         self.discriminator = data["discriminator"]
+        self._avatar_hash = data["avatar"]
 
-        self.bot = data.get("bot", False)
-        self.system = data.get("system", False)
-        self.mfa_enabled = data.get("mfa_enabled", False)
-        self.premium_type = (
-            NitroType(data["premium_type"]) if "premium_type" in data else None
-        )
+        if "bot" in data:
+            self.bot = data["bot"]
+        if "system" in data:
+            self.system = data["system"]
+        if "mfa_enabled" in data:
+            self.mfa_enabled = data["mfa_enabled"]
+        if "premium_type" in data:
+            self.premium_type = NitroType(data["premium_type"])
 
-        self._avatar_hash = data["avatar"]
-        self._banner_hash = data.get("banner")
-        self.accent_color = data.get("accent_color")
+        if "banner" in data:
+            self._banner_hash = data["banner"]
+        if "accent_color" in data:
+            self.accent_color = data["accent_color"]
+
+        if "locale" in data:
+            self.locale = data["locale"]
+        if "verified" in data:
+            self.verified = data["verified"]
+        if "email" in data:
+            self.email = data["email"]
+
+        if "public_flags" in data:
+            self.flags = UserFlags(data["public_flags"])
+        if "flags" in data:
+            self.private_flags = UserFlags(data["flags"])
+
+
+class UserIdentityMap:
+    """
+    The `User` of every user id that is still referenced somewhere.
+
+    Payloads of a user that is already alive update that user in place instead of creating a new one,
+    so members, messages and events share one object per user.
+    Only weak references are kept, a user nothing else references is dropped.
+    """
+
+    def __init__(self, client: Client) -> None:
+        """
+        Create a empty identity map.
+
+        Args:
+            client (Client): Client the users belong to
+        """
+        self._client = client
+        self._users: WeakValueDictionary[int, User] = WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> User | None:
+        """
+        Get the live user with a id.
+
+        Args:
+            user_id (int): Id of the user
+
+        Returns:
+            User | None: The user, or None if no user with that id is referenced
+        """
+        return self._users.get(user_id)
+
+    def intern(self, data: type_dicts.UserData) -> User:
+        """
+        Get the user of a payload, updating the live one if there is one.
+
+        Args:
+            data (type_dicts.UserData): The raw user data
 
-        self.locale = data.get("locale")
-        self.verified = data.get("verified")
-        self.email = data.get("email")
+        Returns:
+            User: The user
+        """
+        user = self._users.get(int(data["id"]))
+        if user is None:
+            self.misses += 1
+            user = User(self._client, data)
+            self._users[user.id_] = user
+        else:
+            self.hits += 1
+            user.update(data)
+        return user
+
+    def add(self, user: User) -> User:
+        """
+        Add a user created elsewhere, like one loaded from a snapshot.
+
+        Args:
+            user (User): The user
+
+        Returns:
+            User: The live user with the same id, which is `user` if there was none
+        """
+        return self._users.setdefault(user.id_, user)
 
-        self.flags = UserFlags(data["public_flags"]) if "public_flags" in data else None
-        self.private_flags = UserFlags(data["flags"]) if "flags" in data else None
+    def __len__(self) -> int:
+        return len(self._users)
 
 
 # https://discord.com/developers/docs/resources/guild#guild-member-object
-class Member:
+class Member(LazyDecodable):
     """Discord member."""
 
+    __slots__ = (
+        "_client",
+        "_raw_data",
+        "role_ids",
+        "joined_at",
+        "deaf",
+        "mute",
+        "user",
+        "nick",
+        "avatar_hash",
+        "premium_since",
+        "pending",
+        "permissions",
+        "timeout_until",
+    )
+
     def __init__(self, client: Client, data: type_dicts.MemberData) -> None:
         """
         Construct member instace.
@@ -77,29 +218,76 @@ class Member:
             data (type_dicts.MemberData): json data
         """
         self._client = client
-        self._raw_data = data
+        self._raw_data = data if client.keep_raw_data else None
 
         self.role_ids = [Snowflake(id_) for id_ in data["roles"]]
-        self.joined_at = datetime.fromisoformat(data["joined_at"])
+        self.joined_at = timestamps.parse_iso(data["joined_at"])
         self.deaf = data["deaf"]
         self.mute = data["mute"]
 
-        self.user = User(client, data["user"]) if "user" in data else None
+        self.user = client.user_map.intern(data["user"]) if "user" in data else None
         self.nick = data.get("nick")
         self.avatar_hash = data.get("avatar")
 
-        prem = data.get("fromtimestamp")
-        self.premium_since = (
-            datetime.fromtimestamp(int(prem)) if prem is not None else None
-        )
+        self.premium_since = timestamps.parse_optional_iso(data.get("premium_since"))
         self.pending = data.get("pending")
 
         perms = data.get("permissions")
         self.permissions = Permission(int(perms)) if perms is not None else None
 
-        timeout_time = data.get("communication_disabled_until")
-        self.timeout_until = (
-            datetime.fromtimestamp(int(timeout_time))
-            if timeout_time is not None
-            else None
+        self.timeout_until = timestamps.parse_optional_iso(
+            data.get("communication_disabled_until")
         )
+
+
+LazyUser = lazy_variant(
+    User,
+    {
+        "id_": lambda client, data: Snowflake(data["id"]),
+        "username": lambda client, data: data["username"],
+        "discriminator": lambda client, data: data["discriminator"],
+        "bot": lambda client, data: data.get("bot", False),
+        "system": lambda client, data: data.get("system", False),
+        "mfa_enabled": lambda client, data: data.get("mfa_enabled", False),
+        "premium_type": lambda client, data: NitroType(data["premium_type"])
+        if "premium_type" in data
+        else None,
+        "_avatar_hash": lambda client, data: data["avatar"],
+        "_banner_hash": lambda client, data: data.get("banner"),
+        "accent_color": lambda client, data: data.get("accent_color"),
+        "locale": lambda client, data: data.get("locale"),
+        "verified": lambda client, data: data.get("verified"),
+        "email": lambda client, data: data.get("email"),
+        "flags": lambda client, data: UserFlags(data["public_flags"])
+        if "public_flags" in data
+        else None,
+        "private_flags": lambda client, data: UserFlags(data["flags"])
+        if "flags" in data
+        else None,
+    },
+)
+
+LazyMember = lazy_variant(
+    Member,
+    {
+        "role_ids": lambda client, data: [Snowflake(id_) for id_ in data["roles"]],
+        "joined_at": lambda client, data: timestamps.parse_iso(data["joined_at"]),
+        "deaf": lambda client, data: data["deaf"],
+        "mute": lambda client, data: data["mute"],
+        "user": lambda client, data: client.user_map.intern(data["user"])
+        if "user" in data
+        else None,
+        "nick": lambda client, data: data.get("nick"),
+        "avatar_hash": lambda client, data: data.get("avatar"),
+        "premium_since": lambda client, data: timestamps.parse_optional_iso(
+            data.get("premium_since")
+        ),
+        "pending": lambda client, data: data.get("pending"),
+        "permissions": lambda client, data: Permission(int(data["permissions"]))
+        if data.get("permissions") is not None
+        else None,
+        "timeout_until": lambda client, data: timestamps.parse_optional_iso(
+            data.get("communication_disabled_until")
+        ),
+    },
+)
@@ -145,6 +145,402 @@ class Ready(Event):
             data (dict[str, Any]): data to be used
         """
         self.version = data["v"]
-        self.user = datatypes.User(client, data["user"])
+        self.user = client.user_map.intern(data["user"])
         self.application = datatypes.Application(client, data["application"])
+        self.session_id = data["session_id"]
+        self.resume_gateway_url = data.get("resume_gateway_url")
         # Todo: more of this
+
+
+# https://discord.com/developers/docs/topics/gateway#resumed
+@event_map_manager.register_type("RESUMED")
+class Resumed(Event):
+    """A resume succeeded, all missed events have been replayed."""
+
+
+# https://discord.com/developers/docs/topics/gateway#invalid-session
+@event_map_manager.register_op(9)
+class InvalidSession(Event):
+    """The session can not be resumed, or identifying failed."""
+
+    def __init__(self, client: Client, data: bool) -> None:
+        """
+        Create invalid session event.
+
+        Args:
+            client (Client): Discord client
+            data (bool): If the session may be resumed
+        """
+        self.resumable = data
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-create
+@event_map_manager.register_type("GUILD_CREATE")
+class GuildCreate(Event):
+    """A guild became available, sent for every guild after connecting and when joining a guild."""
+
+    def __init__(self, client: Client, data: type_dicts.GuildData) -> None:
+        """
+        Create guild create event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildData): data to be used
+        """
+        self.guild = datatypes.Guild(client, data)
+        self.roles = [datatypes.Role(client, role) for role in data["roles"]]
+        self.members = [
+            datatypes.Member(client, member) for member in data.get("members", [])
+        ]
+
+        self.channels: list[datatypes.Channel] = []
+        for channel in data.get("channels", []):
+            # channels in GUILD_CREATE do not include the guild id.
+            channel["guild_id"] = data["id"]
+            self.channels.append(datatypes.Channel.parse_channel(client, channel))
+        self.threads = [
+            datatypes.Channel.parse_channel(client, thread)
+            for thread in data.get("threads", [])
+        ]
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-update
+@event_map_manager.register_type("GUILD_UPDATE")
+class GuildUpdate(Event):
+    """A guild was updated."""
+
+    def __init__(self, client: Client, data: type_dicts.GuildData) -> None:
+        """
+        Create guild update event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildData): data to be used
+        """
+        self.guild = datatypes.Guild(client, data)
+        self.roles = [datatypes.Role(client, role) for role in data["roles"]]
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-delete
+@event_map_manager.register_type("GUILD_DELETE")
+class GuildDelete(Event):
+    """The bot left a guild, or the guild became unavailable."""
+
+    def __init__(self, client: Client, data: type_dicts.UnavailableGuildData) -> None:
+        """
+        Create guild delete event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.UnavailableGuildData): data to be used
+        """
+        self.guild_id = datatypes.Snowflake(data["id"])
+        self.unavailable = data.get("unavailable", False)
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-member-add
+@event_map_manager.register_type("GUILD_MEMBER_ADD")
+class GuildMemberAdd(Event):
+    """A member joined a guild."""
+
+    def __init__(
+        self, client: Client, data: type_dicts.GuildMemberAddEventData
+    ) -> None:
+        """
+        Create guild member add event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildMemberAddEventData): data to be used
+        """
+        self.guild_id = datatypes.Snowflake(data["guild_id"])
+        self.member = datatypes.Member(client, data)
+
+
+# https://discord.com/developers/docs/topics/gateway#user-update
+@event_map_manager.register_type("USER_UPDATE")
+class UserUpdate(Event):
+    """The bot user was updated."""
+
+    def __init__(self, client: Client, data: type_dicts.UserData) -> None:
+        """
+        Create user update event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.UserData): data to be used
+        """
+        self.user = client.user_map.intern(data)
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-role-create
+@event_map_manager.register_type("GUILD_ROLE_CREATE")
+class GuildRoleCreate(Event):
+    """A role was created."""
+
+    def __init__(self, client: Client, data: type_dicts.GuildRoleEventData) -> None:
+        """
+        Create guild role create event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildRoleEventData): data to be used
+        """
+        self.guild_id = datatypes.Snowflake(data["guild_id"])
+        self.role = datatypes.Role(client, data["role"])
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-role-update
+@event_map_manager.register_type("GUILD_ROLE_UPDATE")
+class GuildRoleUpdate(GuildRoleCreate):
+    """A role was updated."""
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-role-delete
+@event_map_manager.register_type("GUILD_ROLE_DELETE")
+class GuildRoleDelete(Event):
+    """A role was deleted."""
+
+    def __init__(
+        self, client: Client, data: type_dicts.GuildRoleDeleteEventData
+    ) -> None:
+        """
+        Create guild role delete event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildRoleDeleteEventData): data to be used
+        """
+        self.guild_id = datatypes.Snowflake(data["guild_id"])
+        self.role_id = datatypes.Snowflake(data["role_id"])
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-member-update
+@event_map_manager.register_type("GUILD_MEMBER_UPDATE")
+class GuildMemberUpdate(Event):
+    """A member was updated."""
+
+    def __init__(
+        self, client: Client, data: type_dicts.GuildMemberUpdateEventData
+    ) -> None:
+        """
+        Create guild member update event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildMemberUpdateEventData): data to be used
+        """
+        self.guild_id = datatypes.Snowflake(data["guild_id"])
+        self.user = client.user_map.intern(data["user"])
+        self.role_ids = [datatypes.Snowflake(id_) for id_ in data["roles"]]
+        self.nick = data.get("nick")
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-member-remove
+@event_map_manager.register_type("GUILD_MEMBER_REMOVE")
+class GuildMemberRemove(Event):
+    """A member left or was removed from a guild."""
+
+    def __init__(
+        self, client: Client, data: type_dicts.GuildMemberRemoveEventData
+    ) -> None:
+        """
+        Create guild member remove event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildMemberRemoveEventData): data to be used
+        """
+        self.guild_id = datatypes.Snowflake(data["guild_id"])
+        self.user = client.user_map.intern(data["user"])
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-members-chunk
+@event_map_manager.register_type("GUILD_MEMBERS_CHUNK")
+class GuildMembersChunk(Event):
+    """A part of the members sent in response to `Client.request_members`."""
+
+    def __init__(
+        self, client: Client, data: type_dicts.GuildMembersChunkEventData
+    ) -> None:
+        """
+        Create guild members chunk event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildMembersChunkEventData): data to be used
+        """
+        self.guild_id = datatypes.Snowflake(data["guild_id"])
+        self.members = [datatypes.Member(client, member) for member in data["members"]]
+        self.chunk_index = data["chunk_index"]
+        self.chunk_count = data["chunk_count"]
+        self.not_found = [datatypes.Snowflake(id_) for id_ in data.get("not_found", [])]
+        # there is no presence datatype yet, so they are passed on as sent.
+        self.presences = data.get("presences", [])
+        self.nonce = data.get("nonce")
+
+
+# https://discord.com/developers/docs/topics/gateway#channel-create
+@event_map_manager.register_type("CHANNEL_CREATE")
+class ChannelCreate(Event):
+    """A channel was created."""
+
+    def __init__(self, client: Client, data: type_dicts.ChannelData) -> None:
+        """
+        Create channel create event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.ChannelData): data to be used
+        """
+        self.channel = datatypes.Channel.parse_channel(client, data)
+        guild_id = data.get("guild_id")
+        self.guild_id = datatypes.Snowflake(guild_id) if guild_id is not None else None
+
+
+# https://discord.com/developers/docs/topics/gateway#channel-update
+@event_map_manager.register_type("CHANNEL_UPDATE")
+class ChannelUpdate(ChannelCreate):
+    """A channel was updated."""
+
+
+# https://discord.com/developers/docs/topics/gateway#channel-delete
+@event_map_manager.register_type("CHANNEL_DELETE")
+class ChannelDelete(ChannelCreate):
+    """A channel was deleted."""
+
+
+# https://discord.com/developers/docs/topics/gateway#thread-create
+@event_map_manager.register_type("THREAD_CREATE")
+class ThreadCreate(ChannelCreate):
+    """A thread was created, or the bot was added to a private thread."""
+
+
+# https://discord.com/developers/docs/topics/gateway#thread-update
+@event_map_manager.register_type("THREAD_UPDATE")
+class ThreadUpdate(ChannelCreate):
+    """A thread was updated."""
+
+
+# https://discord.com/developers/docs/topics/gateway#thread-delete
+@event_map_manager.register_type("THREAD_DELETE")
+class ThreadDelete(Event):
+    """A thread was deleted."""
+
+    def __init__(self, client: Client, data: type_dicts.ThreadDeleteEventData) -> None:
+        """
+        Create thread delete event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.ThreadDeleteEventData): data to be used
+        """
+        self.thread_id = datatypes.Snowflake(data["id"])
+        self.guild_id = datatypes.Snowflake(data["guild_id"])
+        self.parent_id = datatypes.Snowflake(data["parent_id"])
+
+
+# https://discord.com/developers/docs/topics/gateway#guild-emojis-update
+@event_map_manager.register_type("GUILD_EMOJIS_UPDATE")
+class GuildEmojisUpdate(Event):
+    """The emojis of a guild changed, `emojis` is the full new list."""
+
+    def __init__(
+        self, client: Client, data: type_dicts.GuildEmojisUpdateEventData
+    ) -> None:
+        """
+        Create guild emojis update event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.GuildEmojisUpdateEventData): data to be used
+        """
+        self.guild_id = datatypes.Snowflake(data["guild_id"])
+        self.emojis = [datatypes.Emoji(client, emoji) for emoji in data["emojis"]]
+
+
+# https://discord.com/developers/docs/topics/gateway#message-create
+@event_map_manager.register_type("MESSAGE_CREATE")
+class MessageCreate(Event):
+    """A message was sent."""
+
+    def __init__(self, client: Client, data: type_dicts.MessageCreateEventData) -> None:
+        """
+        Create message create event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.MessageCreateEventData): data to be used
+        """
+        self.message = datatypes.Message(client, data)
+
+
+# https://discord.com/developers/docs/topics/gateway#message-update
+@event_map_manager.register_type("MESSAGE_UPDATE")
+class MessageUpdate(Event):
+    """
+    A message was edited.
+
+    Discord only sends the changed fields for some edits (like embeds being resolved),
+    `message` is then the cached message with the changes applied, or None if it was not cached.
+    `previous` is the cached message from before the edit, if any, and `data` the payload as sent.
+    """
+
+    def __init__(self, client: Client, data: type_dicts.MessageCreateEventData) -> None:
+        """
+        Create message update event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.MessageCreateEventData): data to be used
+        """
+        self.data = data
+        self.message_id = datatypes.Snowflake(data["id"])
+        self.channel_id = datatypes.Snowflake(data["channel_id"])
+        guild_id = data.get("guild_id")
+        self.guild_id = datatypes.Snowflake(guild_id) if guild_id is not None else None
+
+        self.message = datatypes.Message(client, data) if "author" in data else None
+        self.previous: datatypes.Message | None = None
+
+
+# https://discord.com/developers/docs/topics/gateway#message-delete
+@event_map_manager.register_type("MESSAGE_DELETE")
+class MessageDelete(Event):
+    """A message was deleted, `previous` is the cached message if any."""
+
+    def __init__(self, client: Client, data: type_dicts.MessageDeleteEventData) -> None:
+        """
+        Create message delete event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.MessageDeleteEventData): data to be used
+        """
+        self.message_id = datatypes.Snowflake(data["id"])
+        self.channel_id = datatypes.Snowflake(data["channel_id"])
+        guild_id = data.get("guild_id")
+        self.guild_id = datatypes.Snowflake(guild_id) if guild_id is not None else None
+        self.previous: datatypes.Message | None = None
+
+
+# https://discord.com/developers/docs/topics/gateway#message-delete-bulk
+@event_map_manager.register_type("MESSAGE_DELETE_BULK")
+class MessageDeleteBulk(Event):
+    """Multiple messages were deleted, `previous` holds the ones that were cached."""
+
+    def __init__(
+        self, client: Client, data: type_dicts.MessageDeleteBulkEventData
+    ) -> None:
+        """
+        Create message delete bulk event.
+
+        Args:
+            client (Client): Discord client
+            data (type_dicts.MessageDeleteBulkEventData): data to be used
+        """
+        self.message_ids = [datatypes.Snowflake(id_) for id_ in data["ids"]]
+        self.channel_id = datatypes.Snowflake(data["channel_id"])
+        guild_id = data.get("guild_id")
+        self.guild_id = datatypes.Snowflake(guild_id) if guild_id is not None else None
+        self.previous: list[datatypes.Message] = []
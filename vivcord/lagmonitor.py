@@ -0,0 +1,205 @@
+"""Notice when the event loop is blocked."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+
+@dataclass
+class SlowCallback:
+    """A moment the loop was blocked for longer than the threshold."""
+
+    blocked_for: float
+    task_name: str | None
+    stack: str
+
+
+@dataclass
+class LagStats:
+    """Summary of the recent scheduling delay of the loop."""
+
+    samples: int
+    p50: float
+    p90: float
+    p99: float
+    max: float  # noqa: A003
+    heartbeat_latency: float | None
+
+    @property
+    def network_latency(self) -> float | None:
+        """
+        Heartbeat latency with the local loop delay taken out.
+
+        Returns:
+            float | None: Estimated network part of the heartbeat latency
+        """
+        if self.heartbeat_latency is None:
+            return None
+        return max(self.heartbeat_latency - self.p50, 0.0)
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """
+    Get a percentile from already sorted samples.
+
+    Args:
+        ordered (list[float]): Sorted samples
+        percent (float): Percentile between 0 and 100
+
+    Returns:
+        float: The sample at the percentile, or 0 if there are no samples
+    """
+    if not ordered:
+        return 0.0
+    index = min(int(len(ordered) * percent / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+class LagMonitor:
+    """
+    Measure how late the event loop wakes up and who is blocking it.
+
+    A coroutine sleeps for `interval` seconds and records how much later than expected it woke up.
+    A watchdog thread checks that the coroutine keeps ticking,
+    if it does not it captures the stack of the loop thread while it is still blocked.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        threshold: float = 0.25,
+        history: int = 1024,
+    ) -> None:
+        """
+        Create a LagMonitor.
+
+        Args:
+            interval (float): Seconds between samples. Defaults to 0.5.
+            threshold (float): Lag in seconds that counts as blocking. Defaults to 0.25.
+            history (int): How many samples and slow callbacks to keep. Defaults to 1024.
+        """
+        self.interval = interval
+        self.threshold = threshold
+
+        self.samples: deque[float] = deque(maxlen=history)
+        self.slow_callbacks: deque[SlowCallback] = deque(maxlen=history)
+        self.heartbeat_latency: float | None = None
+
+        self._last_tick = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._stopped = threading.Event()
+
+    def stats(self) -> LagStats:
+        """
+        Summarise the recorded samples.
+
+        Returns:
+            LagStats: Percentiles of the loop lag together with the gateway latency
+        """
+        ordered = sorted(self.samples)
+        return LagStats(
+            samples=len(ordered),
+            p50=_percentile(ordered, 50),
+            p90=_percentile(ordered, 90),
+            p99=_percentile(ordered, 99),
+            max=ordered[-1] if ordered else 0.0,
+            heartbeat_latency=self.heartbeat_latency,
+        )
+
+    def record_heartbeat(self, latency: float) -> None:
+        """
+        Record a gateway heartbeat round trip and report what made it slow.
+
+        Args:
+            latency (float): Seconds between sending the heartbeat and handling the ack
+        """
+        self.heartbeat_latency = latency
+        if latency < self.threshold:
+            return
+
+        recent_lag = self.samples[-1] if self.samples else 0.0
+        if recent_lag >= self.threshold:
+            logger.warning(
+                f"slow heartbeat ack ({latency:.3f}s), event loop was blocked for {recent_lag:.3f}s"
+            )
+        else:
+            logger.warning(
+                f"slow heartbeat ack ({latency:.3f}s), event loop is healthy so this is network latency"
+            )
+
+    async def run(self) -> None:
+        """Sample the loop lag until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stopped.clear()
+
+        watchdog = threading.Thread(
+            target=self._watchdog, name="vivcord-lag-watchdog", daemon=True
+        )
+        watchdog.start()
+
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval, None)
+                now = time.monotonic()
+                self._last_tick = now
+
+                lag = now - expected
+                self.samples.append(lag)
+                if lag >= self.threshold:
+                    logger.warning(f"event loop was blocked for {lag:.3f}s")
+        finally:
+            self._stopped.set()
+
+    def _watchdog(self) -> None:
+        """Capture the loop thread stack when the sampler stops ticking."""
+        reported_tick = None
+        while not self._stopped.wait(self.threshold / 2):
+            last_tick = self._last_tick
+            blocked_for = time.monotonic() - last_tick - self.interval
+            if blocked_for < self.threshold or reported_tick == last_tick:
+                continue
+
+            # only report every blocking period once.
+            reported_tick = last_tick
+            self._report_blocked(blocked_for)
+
+    def _report_blocked(self, blocked_for: float) -> None:
+        """
+        Record the stack of the blocked loop thread.
+
+        Args:
+            blocked_for (float): How long the loop has been blocked for so far
+        """
+        if self._loop_thread_id is None:
+            return
+
+        frame: FrameType | None = sys._current_frames().get(  # noqa: SLF001
+            self._loop_thread_id
+        )
+        if frame is None:
+            return
+
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        task_name = task.get_name() if task is not None else None
+        stack = "".join(traceback.format_stack(frame))
+
+        self.slow_callbacks.append(SlowCallback(blocked_for, task_name, stack))
+        logger.warning(
+            f"event loop blocked for {blocked_for:.3f}s in task {task_name!r}:\n{stack}"
+        )
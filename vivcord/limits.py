@@ -0,0 +1,263 @@
+"""
+Concurrency limits and cooldowns of slash commands.
+
+Limits are checked before the options are bound and the callback runs,
+so a rejected invocation costs a dict lookup and a ephemeral response.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+LimitScope: TypeAlias = Literal["global", "guild", "user"]
+
+
+@dataclass(frozen=True)
+class Cooldown:
+    """
+    Token bucket cooldown, `rate` uses per `per` seconds for every scope key.
+
+    A bucket starts full, so `rate` uses can happen right away.
+    """
+
+    rate: int
+    per: float
+    scope: LimitScope = "user"
+
+
+@dataclass(frozen=True)
+class ConcurrencyLimit:
+    """At most `limit` executions running at the same time for every scope key."""
+
+    limit: int
+    scope: LimitScope = "global"
+
+
+def scope_key(scope: LimitScope, guild_id: int | None, user_id: int) -> int:
+    """
+    Get the key a invocation is limited under.
+
+    Args:
+        scope (LimitScope): The scope of the limit
+        guild_id (int, optional): Guild of the invocation, None in DMs
+        user_id (int): User of the invocation
+
+    Returns:
+        int: The key, DMs count as a guild of their own per user
+    """
+    if scope == "global":
+        return 0
+    if scope == "guild" and guild_id is not None:
+        return guild_id
+    return user_id
+
+
+class CooldownBuckets:
+    """
+    The token buckets of a cooldown by scope key.
+
+    A bucket is two floats in a dict. Buckets that were idle long enough to be full again are
+    indistinguishable from new ones, so they are dropped in a sweep at most once per `per` seconds.
+    """
+
+    def __init__(self, cooldown: Cooldown) -> None:
+        """
+        Create the buckets.
+
+        Args:
+            cooldown (Cooldown): The cooldown
+        """
+        self.cooldown = cooldown
+        self._refill = cooldown.rate / cooldown.per
+        self._buckets: dict[int, tuple[float, float]] = {}
+        self._next_sweep = time.monotonic() + cooldown.per
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def retry_after(self, key: int, now: float) -> float:
+        """
+        Check a bucket without taking a token.
+
+        Args:
+            key (int): Scope key of the bucket
+            now (float): Current monotonic time
+
+        Returns:
+            float: 0 if a token is available, else seconds until the next token
+        """
+        tokens = self._tokens(key, now)
+        return (1 - tokens) / self._refill if tokens < 1 else 0.0
+
+    def take(self, key: int, now: float) -> float:
+        """
+        Take a token from a bucket.
+
+        Args:
+            key (int): Scope key of the bucket
+            now (float): Current monotonic time
+
+        Returns:
+            float: 0 if a token was taken, else seconds until the next token
+        """
+        tokens = self._tokens(key, now)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self._refill
+        self._buckets[key] = (tokens - 1, now)
+        return 0.0
+
+    def _tokens(self, key: int, now: float) -> float:
+        """
+        Get the tokens of a bucket, refilled up to now.
+
+        Args:
+            key (int): Scope key of the bucket
+            now (float): Current monotonic time
+
+        Returns:
+            float: Tokens in the bucket
+        """
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        rate = self.cooldown.rate
+        tokens, updated = self._buckets.get(key, (rate, now))
+        return min(rate, tokens + (now - updated) * self._refill)
+
+    def _sweep(self, now: float) -> None:
+        """
+        Drop the buckets that are full again.
+
+        Args:
+            now (float): Current monotonic time
+        """
+        per = self.cooldown.per
+        self._buckets = {
+            key: bucket
+            for key, bucket in self._buckets.items()
+            if now - bucket[1] < per
+        }
+        self._next_sweep = now + per
+
+
+class ConcurrencyCounter:
+    """Running executions of a concurrency limit by scope key, keys without executions are removed."""
+
+    def __init__(self, limit: ConcurrencyLimit) -> None:
+        """
+        Create the counter.
+
+        Args:
+            limit (ConcurrencyLimit): The limit
+        """
+        self.limit = limit
+        self._running: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._running)
+
+    def full(self, key: int) -> bool:
+        """
+        Check if another execution would go over the limit.
+
+        Args:
+            key (int): Scope key
+
+        Returns:
+            bool: If the limit is reached
+        """
+        return self._running.get(key, 0) >= self.limit.limit
+
+    def enter(self, key: int) -> None:
+        """
+        Count a started execution.
+
+        Args:
+            key (int): Scope key
+        """
+        self._running[key] = self._running.get(key, 0) + 1
+
+    def exit(self, key: int) -> None:  # noqa: A003
+        """
+        Count a finished execution.
+
+        Args:
+            key (int): Scope key
+        """
+        running = self._running.get(key, 0) - 1
+        if running > 0:
+            self._running[key] = running
+        else:
+            _ = self._running.pop(key, None)
+
+
+class CommandLimiter:
+    """The cooldowns and concurrency limits of a single command."""
+
+    def __init__(
+        self, cooldowns: list[Cooldown], concurrency_limits: list[ConcurrencyLimit]
+    ) -> None:
+        """
+        Create the limiter.
+
+        Args:
+            cooldowns (list[Cooldown]): Cooldowns of the command
+            concurrency_limits (list[ConcurrencyLimit]): Concurrency limits of the command
+        """
+        self.cooldowns = [CooldownBuckets(cooldown) for cooldown in cooldowns]
+        self.concurrency = [ConcurrencyCounter(limit) for limit in concurrency_limits]
+        self.rejected = 0
+
+    def acquire(self, guild_id: int | None, user_id: int) -> str | None:
+        """
+        Start a execution if every limit allows it.
+
+        Every limit is checked before any cooldown token is taken,
+        so a invocation rejected by one limit does not use up the other cooldowns.
+        A accepted execution has to be ended with `release`.
+
+        Args:
+            guild_id (int, optional): Guild of the invocation, None in DMs
+            user_id (int): User of the invocation
+
+        Returns:
+            str | None: Why the invocation was rejected, None if it may run
+        """
+        for counter in self.concurrency:
+            if counter.full(scope_key(counter.limit.scope, guild_id, user_id)):
+                self.rejected += 1
+                return "This command is already running, try again once it finished."
+
+        now = time.monotonic()
+        for buckets in self.cooldowns:
+            key = scope_key(buckets.cooldown.scope, guild_id, user_id)
+            retry_after = buckets.retry_after(key, now)
+            if retry_after:
+                self.rejected += 1
+                # rounded up, "try again in 0.0s" would be wrong.
+                retry_after = math.ceil(retry_after * 10) / 10
+                return f"This command is on cooldown, try again in {retry_after:.1f}s."
+
+        for buckets in self.cooldowns:
+            _ = buckets.take(scope_key(buckets.cooldown.scope, guild_id, user_id), now)
+        for counter in self.concurrency:
+            counter.enter(scope_key(counter.limit.scope, guild_id, user_id))
+        return None
+
+    def release(self, guild_id: int | None, user_id: int) -> None:
+        """
+        End a execution started with `acquire`.
+
+        Args:
+            guild_id (int, optional): Guild of the invocation, None in DMs
+            user_id (int): User of the invocation
+        """
+        for counter in self.concurrency:
+            counter.exit(scope_key(counter.limit.scope, guild_id, user_id))
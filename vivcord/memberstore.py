@@ -0,0 +1,514 @@
+"""Compact, column oriented storage for huge member caches."""
+
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Generic, Hashable, TypeVar
+
+from vivcord import timestamps
+from vivcord.datatypes import Member, Snowflake, User
+from vivcord.datatypes.flags import UserFlags
+from vivcord.traits import CacheStore
+
+if TYPE_CHECKING:
+    from typing import Iterator
+
+    from vivcord.client import Client
+
+H = TypeVar("H", bound=Hashable)
+
+MemberKey = tuple[int, int]
+PackedAvatar = tuple[int, int, int]
+
+# slot markers of the open addressing index.
+_EMPTY = -1
+_DELETED = -2
+
+# sentinels for missing values in columns that can not hold None.
+_NO_TIME = -(2**63)
+_NO_FLAGS = 2**32 - 1
+
+_LOW_64 = 2**64 - 1
+
+# bits of the flags column.
+_DEAF = 1 << 0
+_MUTE = 1 << 1
+_PENDING = 1 << 2
+_PENDING_UNKNOWN = 1 << 3
+_BOT = 1 << 4
+_SYSTEM = 1 << 5
+_HAS_AVATAR = 1 << 6
+_ANIMATED_AVATAR = 1 << 7
+
+
+def _to_micros(value: datetime | None) -> int:
+    """
+    Convert a datetime to microseconds since the epoch.
+
+    Args:
+        value (datetime | None): The datetime
+
+    Returns:
+        int: Microseconds, or `_NO_TIME` for None
+    """
+    if value is None:
+        return _NO_TIME
+    if value.tzinfo is None:
+        value = value.astimezone()
+    delta = value - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime | None:
+    """
+    Convert microseconds since the epoch to a datetime.
+
+    Args:
+        value (int): Microseconds, or `_NO_TIME`
+
+    Returns:
+        datetime | None: Timezone aware datetime, or None
+    """
+    if value == _NO_TIME:
+        return None
+    return timestamps.from_unix_micros(value)
+
+
+def _pack_avatar(avatar: str) -> PackedAvatar | None:
+    """
+    Pack a avatar hash into flags and two 64 bit ints.
+
+    Args:
+        avatar (str): The avatar hash
+
+    Returns:
+        PackedAvatar | None: Flags, high and low bits, or None if the hash is not a md5 hex digest
+    """
+    flags = _HAS_AVATAR
+    digest = avatar
+    if digest.startswith("a_"):
+        flags |= _ANIMATED_AVATAR
+        digest = digest[2:]
+
+    try:
+        value = int(digest, 16)
+    except ValueError:
+        return None
+    # int() also accepts things like a sign, underscores or upper case.
+    if value < 0 or digest != f"{value:032x}":
+        return None
+    return flags, value >> 64, value & _LOW_64
+
+
+class InternTable(Generic[H]):
+    """
+    Deduplicated values referenced by index.
+
+    Index 0 is always None, so a column of indexes can hold missing values.
+    Values are never removed, this is meant for values that repeat a lot, like role sets and discriminators.
+    """
+
+    def __init__(self) -> None:
+        """Create a empty table."""
+        self._values: list[H | None] = [None]
+        self._indexes: dict[H, int] = {}
+
+    def intern(self, value: H | None) -> int:
+        """
+        Get the index of a value, adding it if it is new.
+
+        Args:
+            value (H | None): The value
+
+        Returns:
+            int: The index
+        """
+        if value is None:
+            return 0
+        index = self._indexes.get(value)
+        if index is None:
+            index = self._indexes[value] = len(self._values)
+            self._values.append(value)
+        return index
+
+    def __getitem__(self, index: int) -> H | None:
+        return self._values[index]
+
+    def __len__(self) -> int:
+        return len(self._values) - 1
+
+
+class _RareFields:
+    """Member fields that are usually missing, kept out of the columns."""
+
+    __slots__ = ("premium_since", "timeout_until", "guild_avatar", "odd_avatar")
+
+    def __init__(
+        self,
+        premium_since: datetime | None,
+        timeout_until: datetime | None,
+        guild_avatar: str | None,
+        odd_avatar: str | None,
+    ) -> None:
+        self.premium_since = premium_since
+        self.timeout_until = timeout_until
+        self.guild_avatar = guild_avatar
+        self.odd_avatar = odd_avatar
+
+
+class CompactMemberStore(CacheStore[MemberKey, Member]):
+    """
+    Member cache keeping every field in typed arrays instead of objects.
+
+    Each member is a row in a set of `array` columns.
+    Role id sets, discriminators and nicks are interned,
+    usernames are stored as utf-8 in a single buffer and avatar hashes as two 64 bit ints.
+    Fields most members do not have, like `premium_since`, are kept in a side dict.
+    Rows are found through a open addressing hash index, so lookups stay O(1).
+
+    `get` materializes a new `Member` (and `User`) every time it is called,
+    changes to it are only stored when it is passed to `set` again.
+    """
+
+    def __init__(self, client: Client) -> None:
+        """
+        Create a empty store.
+
+        Args:
+            client (Client): Client the materialized members belong to
+        """
+        super().__init__()
+        self._client = client
+
+        self._guild_ids = array("Q")
+        self._user_ids = array("Q")
+        self._joined_at = array("q")
+        self._flags = array("B")
+        self._public_flags = array("I")
+        self._roles = array("I")
+        self._discriminators = array("H")
+        self._nicks = array("I")
+        self._avatar_high = array("Q")
+        self._avatar_low = array("Q")
+        self._name_offsets = array("I")
+        self._name_lengths = array("H")
+        self._columns = (
+            self._guild_ids,
+            self._user_ids,
+            self._joined_at,
+            self._flags,
+            self._public_flags,
+            self._roles,
+            self._discriminators,
+            self._nicks,
+            self._avatar_high,
+            self._avatar_low,
+            self._name_offsets,
+            self._name_lengths,
+        )
+
+        self._role_sets: InternTable[tuple[Snowflake, ...]] = InternTable()
+        self._discriminator_table: InternTable[str] = InternTable()
+        self._nick_table: InternTable[str] = InternTable()
+        self._names = bytearray()
+        self._name_garbage = 0
+        self._rare: dict[MemberKey, _RareFields] = {}
+
+        self._slots = array("i", [_EMPTY]) * 8
+        self._deleted_slots = 0
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    def _find(self, guild_id: int, user_id: int) -> tuple[int, int]:
+        """
+        Find the index slot of a member.
+
+        Args:
+            guild_id (int): Guild of the member
+            user_id (int): User id of the member
+
+        Returns:
+            tuple[int, int]: The slot and row, the row is -1 and the slot free if the member is not stored
+        """
+        slots = self._slots
+        mask = len(slots) - 1
+        slot = hash((guild_id, user_id)) & mask
+        free = -1
+        while True:
+            row = slots[slot]
+            if row == _EMPTY:
+                return (free if free != -1 else slot), -1
+            if row == _DELETED:
+                if free == -1:
+                    free = slot
+            elif self._user_ids[row] == user_id and self._guild_ids[row] == guild_id:
+                return slot, row
+            slot = (slot + 1) & mask
+
+    def _rebuild_index(self) -> None:
+        """Resize the hash index to twice the rows and drop deleted slots."""
+        size = 8
+        while size < len(self) * 2 + 2:
+            size *= 2
+
+        self._slots = array("i", [_EMPTY]) * size
+        self._deleted_slots = 0
+        for row in range(len(self)):
+            slot, _ = self._find(self._guild_ids[row], self._user_ids[row])
+            self._slots[slot] = row
+
+    def _store_name(self, row: int, name: str) -> None:
+        """
+        Write a username into the name buffer.
+
+        Args:
+            row (int): Row of the member, may be the next row to append
+            name (str): The username
+        """
+        encoded = name.encode()
+        if row < len(self):
+            start, length = self._name_offsets[row], self._name_lengths[row]
+            end = start + length
+            if self._names[start:end] == encoded:
+                return
+            self._name_garbage += length
+            self._name_offsets[row] = len(self._names)
+            self._name_lengths[row] = len(encoded)
+        else:
+            self._name_offsets.append(len(self._names))
+            self._name_lengths.append(len(encoded))
+        self._names += encoded
+
+    def _compact_names(self) -> None:
+        """Rewrite the name buffer without the names of removed or renamed members."""
+        names = bytearray()
+        for row in range(len(self)):
+            start = self._name_offsets[row]
+            end = start + self._name_lengths[row]
+            self._name_offsets[row] = len(names)
+            names += self._names[start:end]
+        self._names = names
+        self._name_garbage = 0
+
+    def get(self, key: MemberKey) -> Member | None:
+        """
+        Materialize a stored member.
+
+        Args:
+            key (MemberKey): `(guild_id, user_id)`
+
+        Returns:
+            Member | None: A new member view, or None if the member is not stored
+        """
+        _, row = self._find(*key)
+        if row == -1:
+            return None
+        return self._materialize(row)
+
+    def set(self, key: MemberKey, value: Member) -> None:  # noqa: A003
+        """
+        Store a member, replacing the stored version.
+
+        Args:
+            key (MemberKey): `(guild_id, user_id)`
+            value (Member): The member
+        """
+        guild_id, user_id = key
+        slot, row = self._find(guild_id, user_id)
+        user = value.user
+
+        flags = 0
+        if value.deaf:
+            flags |= _DEAF
+        if value.mute:
+            flags |= _MUTE
+        if value.pending is None:
+            flags |= _PENDING_UNKNOWN
+        elif value.pending:
+            flags |= _PENDING
+
+        avatar_high = avatar_low = 0
+        public_flags = _NO_FLAGS
+        discriminator = username = odd_avatar = None
+        if user is not None:
+            username, discriminator = user.username, user.discriminator
+            public_flags = int(user.flags) if user.flags is not None else _NO_FLAGS
+            if user.bot:
+                flags |= _BOT
+            if user.system:
+                flags |= _SYSTEM
+
+            avatar = user._avatar_hash
+            if avatar is not None:
+                packed = _pack_avatar(avatar)
+                if packed is None:
+                    # not a md5 hex digest, discord does not send these today.
+                    flags |= _HAS_AVATAR
+                    odd_avatar = avatar
+                else:
+                    avatar_flags, avatar_high, avatar_low = packed
+                    flags |= avatar_flags
+
+        if (
+            value.premium_since is not None
+            or value.timeout_until is not None
+            or value.avatar_hash is not None
+            or odd_avatar is not None
+        ):
+            self._rare[key] = _RareFields(
+                value.premium_since, value.timeout_until, value.avatar_hash, odd_avatar
+            )
+        else:
+            _ = self._rare.pop(key, None)
+
+        values = (
+            guild_id,
+            user_id,
+            _to_micros(value.joined_at),
+            flags,
+            public_flags,
+            self._role_sets.intern(tuple(value.role_ids)),
+            self._discriminator_table.intern(discriminator),
+            self._nick_table.intern(value.nick),
+            avatar_high,
+            avatar_low,
+        )
+
+        if row == -1:
+            row = len(self)
+            self._store_name(row, username or "")
+            for column, item in zip(self._columns, values):
+                column.append(item)
+
+            if self._slots[slot] == _DELETED:
+                self._deleted_slots -= 1
+            self._slots[slot] = row
+            if (len(self) + self._deleted_slots) * 2 > len(self._slots):
+                self._rebuild_index()
+        else:
+            self._store_name(row, username or "")
+            for column, item in zip(self._columns, values):
+                column[row] = item
+
+        if self._name_garbage > 4096 and self._name_garbage * 2 > len(self._names):
+            self._compact_names()
+
+    def pop(self, key: MemberKey) -> Member | None:
+        """
+        Remove a stored member.
+
+        Args:
+            key (MemberKey): `(guild_id, user_id)`
+
+        Returns:
+            Member | None: The removed member, or None if it was not stored
+        """
+        slot, row = self._find(*key)
+        if row == -1:
+            return None
+
+        member = self._materialize(row)
+        _ = self._rare.pop(key, None)
+        self._slots[slot] = _DELETED
+        self._deleted_slots += 1
+        self._name_garbage += self._name_lengths[row]
+
+        # move the last row into the hole so the columns stay dense.
+        last = len(self) - 1
+        if row != last:
+            last_slot, _ = self._find(self._guild_ids[last], self._user_ids[last])
+            for column in self._columns:
+                column[row] = column[last]
+            self._slots[last_slot] = row
+        for column in self._columns:
+            _ = column.pop()
+
+        return member
+
+    def keys(self) -> Iterator[MemberKey]:
+        """
+        Iterate over the stored keys.
+
+        Returns:
+            Iterator[MemberKey]: The `(guild_id, user_id)` keys
+        """
+        return iter(list(zip(self._guild_ids, self._user_ids)))
+
+    def clear(self) -> None:
+        """Remove all stored members."""
+        for column in self._columns:
+            del column[:]
+        self._names = bytearray()
+        self._name_garbage = 0
+        self._rare.clear()
+        self._slots = array("i", [_EMPTY]) * 8
+        self._deleted_slots = 0
+
+    def _materialize(self, row: int) -> Member:
+        """
+        Create a member from a row.
+
+        Args:
+            row (int): The row
+
+        Returns:
+            Member: The member
+        """
+        flags = self._flags[row]
+        user_id = self._user_ids[row]
+        rare = self._rare.get((self._guild_ids[row], user_id))
+
+        avatar: str | None = None
+        if rare is not None and rare.odd_avatar is not None:
+            avatar = rare.odd_avatar
+        elif flags & _HAS_AVATAR:
+            avatar = f"{self._avatar_high[row] << 64 | self._avatar_low[row]:032x}"
+            if flags & _ANIMATED_AVATAR:
+                avatar = "a_" + avatar
+
+        start = self._name_offsets[row]
+        end = start + self._name_lengths[row]
+        public_flags = self._public_flags[row]
+        discriminator = self._discriminator_table[self._discriminators[row]]
+
+        # a user that is still alive elsewhere is as fresh as the row, share it.
+        user = self._client.user_map.get(user_id)
+        if user is None and discriminator is not None:
+            user = User.__new__(User)
+            user._client = self._client
+            user._raw_data = None
+            user.id_ = Snowflake(user_id)
+            user.username = self._names[start:end].decode()
+            user.discriminator = discriminator
+            user.bot = bool(flags & _BOT)
+            user.system = bool(flags & _SYSTEM)
+            user.mfa_enabled = False
+            user.premium_type = None
+            user._avatar_hash = avatar
+            user._banner_hash = None
+            user.accent_color = None
+            user.locale = None
+            user.verified = None
+            user.email = None
+            user.flags = UserFlags(public_flags) if public_flags != _NO_FLAGS else None
+            user.private_flags = None
+            # register it, so users built later for the same id (here or by the gateway) share it.
+            user = self._client.user_map.add(user)
+
+        member = Member.__new__(Member)
+        member._client = self._client
+        member._raw_data = None
+        member.role_ids = list(self._role_sets[self._roles[row]] or ())
+        member.joined_at = _from_micros(self._joined_at[row])  # type: ignore
+        member.deaf = bool(flags & _DEAF)
+        member.mute = bool(flags & _MUTE)
+        member.user = user
+        member.nick = self._nick_table[self._nicks[row]]
+        member.avatar_hash = rare.guild_avatar if rare is not None else None
+        member.premium_since = rare.premium_since if rare is not None else None
+        member.pending = None if flags & _PENDING_UNKNOWN else bool(flags & _PENDING)
+        member.permissions = None
+        member.timeout_until = rare.timeout_until if rare is not None else None
+        return member
@@ -0,0 +1,537 @@
+"""Runtime metrics in the prometheus text format."""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+from loguru import logger
+
+if TYPE_CHECKING:
+    from typing import Callable, Iterator, Mapping, TypeAlias
+
+    from vivcord.client import Client
+
+# https://prometheus.io/docs/instrumenting/exposition_formats/#text-based-format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = tuple[str, ...]
+if TYPE_CHECKING:
+    GaugeFunction: TypeAlias = Callable[[], float | Mapping[LabelValues, float] | None]
+
+
+def _escape(value: str) -> str:
+    """
+    Escape a label value.
+
+    Args:
+        value (str): Raw label value
+
+    Returns:
+        str: Escaped label value
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value.
+
+    Args:
+        value (float): The value
+
+    Returns:
+        str: The value as prometheus expects it
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    Base for all metric types.
+
+    Metrics are only updated from the event loop thread so plain dict updates are used instead of locks.
+    """
+
+    type_ = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        """
+        Create a metric.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple[str, ...]): Names of the labels. Defaults to ().
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        """
+        Render the label part of a sample.
+
+        Args:
+            values (LabelValues): Values for the labels
+            extra (str): Already rendered extra label. Defaults to "".
+
+        Returns:
+            str: The rendered labels, including braces if there are any
+        """
+        pairs = [
+            f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterator[str]:
+        """
+        Render the samples of this metric.
+
+        Yields:
+            str: A sample line
+        """
+        yield from ()
+
+    def render(self) -> Iterator[str]:
+        """
+        Render this metric including help and type lines.
+
+        Yields:
+            str: A exposition line
+        """
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_}"
+        yield from self.samples()
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    type_ = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        """
+        Create a counter.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple[str, ...]): Names of the labels. Defaults to ().
+        """
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            *labels (str): Label values, in the same order as the label names
+            amount (float): Amount to add. Defaults to 1.
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        """
+        Get the current value.
+
+        Args:
+            *labels (str): Label values
+
+        Returns:
+            float: The counter value
+        """
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        """
+        Render the samples of this metric.
+
+        Yields:
+            str: A sample line
+        """
+        for labels, value in self._values.items():
+            yield f"{self.name}{self._labels(labels)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A value that can go up and down."""
+
+    type_ = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        function: GaugeFunction | None = None,
+    ) -> None:
+        """
+        Create a gauge.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple[str, ...]): Names of the labels. Defaults to ().
+            function (GaugeFunction, optional): Called on every scrape to get the value, or the values by labels.
+        """
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._function = function
+
+    def set(self, value: float, *labels: str) -> None:  # noqa: A003
+        """
+        Set the gauge.
+
+        Args:
+            value (float): New value
+            *labels (str): Label values
+        """
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increase the gauge.
+
+        Args:
+            *labels (str): Label values
+            amount (float): Amount to add. Defaults to 1.
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """
+        Decrease the gauge.
+
+        Args:
+            *labels (str): Label values
+            amount (float): Amount to subtract. Defaults to 1.
+        """
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def get(self, *labels: str) -> float:
+        """
+        Get the current value.
+
+        Args:
+            *labels (str): Label values
+
+        Returns:
+            float: The gauge value
+        """
+        values = self._collect()
+        return values.get(labels, 0)
+
+    def _collect(self) -> Mapping[LabelValues, float]:
+        """
+        Get the current values by labels, calling the function if there is one.
+
+        Returns:
+            Mapping[LabelValues, float]: The values
+        """
+        if self._function is None:
+            return self._values
+
+        value = self._function()
+        if value is None:
+            return {}
+        if isinstance(value, (int, float)):
+            return {(): value}
+        return value
+
+    def samples(self) -> Iterator[str]:
+        """
+        Render the samples of this metric.
+
+        Yields:
+            str: A sample line
+        """
+        for labels, value in self._collect().items():
+            yield f"{self.name}{self._labels(labels)} {_format_value(value)}"
+
+
+class _HistogramValue:
+    """Bucket counts for a single label set."""
+
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self, bucket_count: int) -> None:
+        self.buckets = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Observations counted in buckets."""
+
+    type_ = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """
+        Create a histogram.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple[str, ...]): Names of the labels. Defaults to ().
+            buckets (tuple[float, ...]): Sorted upper bounds of the buckets. Defaults to DEFAULT_BUCKETS.
+        """
+        super().__init__(name, documentation, labelnames)
+        self._bounds = (*buckets, math.inf)
+        self._values: dict[LabelValues, _HistogramValue] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record a observation.
+
+        Args:
+            value (float): The observed value
+            *labels (str): Label values
+        """
+        data = self._values.get(labels)
+        if data is None:
+            data = self._values[labels] = _HistogramValue(len(self._bounds))
+
+        # buckets are stored non-cumulative so a observation is a single increment.
+        data.buckets[bisect_left(self._bounds, value)] += 1
+        data.sum += value
+        data.count += 1
+
+    def count(self, *labels: str) -> int:
+        """
+        Get the amount of observations.
+
+        Args:
+            *labels (str): Label values
+
+        Returns:
+            int: Number of observations
+        """
+        data = self._values.get(labels)
+        return data.count if data is not None else 0
+
+    def samples(self) -> Iterator[str]:
+        """
+        Render the samples of this metric.
+
+        Yields:
+            str: A sample line
+        """
+        for labels, data in self._values.items():
+            cumulative = 0
+            for bound, amount in zip(self._bounds, data.buckets):
+                cumulative += amount
+                le = self._labels(labels, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{self._labels(labels)} {_format_value(data.sum)}"
+            yield f"{self.name}_count{self._labels(labels)} {data.count}"
+
+
+class Metrics:
+    """All metrics collected by a client."""
+
+    def __init__(self, client: Client) -> None:
+        """
+        Create the client metrics.
+
+        Args:
+            client (Client): The client to collect metrics for
+        """
+        self._client = client
+        self._runner: web.AppRunner | None = None
+
+        self.gateway_events = Counter(
+            "vivcord_gateway_events_total",
+            "Events received from the gateway.",
+            ("op", "type"),
+        )
+        self.gateway_parse_seconds = Histogram(
+            "vivcord_gateway_parse_seconds", "Time spent parsing gateway events."
+        )
+        self.dispatch_queue_depth = Gauge(
+            "vivcord_dispatch_queue_depth", "Events parsed but not yet fully handled."
+        )
+        self.handler_seconds = Histogram(
+            "vivcord_handler_seconds", "Time spent handling a event.", ("event",)
+        )
+        self.heartbeat_rtt_seconds = Histogram(
+            "vivcord_gateway_heartbeat_rtt_seconds",
+            "Round trip time of gateway heartbeats.",
+        )
+        self.gateway_send_wait_seconds = Histogram(
+            "vivcord_gateway_send_wait_seconds",
+            "Time a gateway command waited for the send rate limit.",
+            ("op",),
+        )
+        self.gateway_commands_coalesced = Counter(
+            "vivcord_gateway_commands_coalesced_total",
+            "Gateway commands that replaced a queued one instead of being sent.",
+            ("op",),
+        )
+
+        self.rest_requests = Counter(
+            "vivcord_rest_requests_total",
+            "Requests made to the rest api.",
+            ("method", "route", "status"),
+        )
+        self.rest_request_seconds = Histogram(
+            "vivcord_rest_request_seconds",
+            "Latency of rest api requests.",
+            ("method", "route"),
+        )
+        self.rest_ratelimit_wait_seconds = Histogram(
+            "vivcord_rest_ratelimit_wait_seconds",
+            "Time discord asked us to wait after hitting a ratelimit.",
+            ("route",),
+        )
+
+        self.tasks = Gauge(
+            "vivcord_tasks",
+            "Tasks managed by the task manager.",
+            function=lambda: client.task_manger.task_count,
+        )
+        self.loop_lag_p99_seconds = Gauge(
+            "vivcord_loop_lag_p99_seconds",
+            "99th percentile of the event loop scheduling delay.",
+            function=lambda: client.lag_monitor.stats().p99,
+        )
+        self.offload_pending = Gauge(
+            "vivcord_offload_pending",
+            "Offloaded calls waiting or running in a pool.",
+            function=lambda: sum(
+                stats.pending for stats in client.offloader.stats.values()
+            ),
+        )
+        self.offload_max_queue_wait_seconds = Gauge(
+            "vivcord_offload_max_queue_wait_seconds",
+            "Longest time a offloaded call waited for a worker.",
+            function=lambda: max(
+                stats.max_queue_wait for stats in client.offloader.stats.values()
+            ),
+        )
+
+        self.cache_entries = Gauge(
+            "vivcord_cache_entries",
+            "Entities held in the state cache.",
+            ("entity",),
+            function=lambda: client.cache.sizes(),
+        )
+        self.cache_lookups = Counter(
+            "vivcord_cache_lookups_total",
+            "State cache lookups.",
+            ("entity", "result"),
+        )
+        self.cache_evictions = Counter(
+            "vivcord_cache_evictions_total",
+            "Entities dropped from the state cache to stay within its limits.",
+            ("entity", "reason"),
+        )
+
+        self.metrics: list[_Metric] = [
+            self.gateway_events,
+            self.gateway_parse_seconds,
+            self.dispatch_queue_depth,
+            self.handler_seconds,
+            self.heartbeat_rtt_seconds,
+            self.gateway_send_wait_seconds,
+            self.gateway_commands_coalesced,
+            self.rest_requests,
+            self.rest_request_seconds,
+            self.rest_ratelimit_wait_seconds,
+            self.tasks,
+            self.loop_lag_p99_seconds,
+            self.offload_pending,
+            self.offload_max_queue_wait_seconds,
+            self.cache_entries,
+            self.cache_lookups,
+            self.cache_evictions,
+        ]
+
+    def register(self, metric: _Metric) -> None:
+        """
+        Add a extra metric to the exposition.
+
+        Args:
+            metric (_Metric): Metric to add
+        """
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        """
+        Render all metrics in the text exposition format.
+
+        Returns:
+            str: The exposition text
+        """
+        lines = [line for metric in self.metrics for line in metric.render()]
+        lines.append("")
+        return "\n".join(lines)
+
+    async def _handle_scrape(self, request: web.Request) -> web.Response:
+        """
+        Serve the metrics.
+
+        Args:
+            request (web.Request): The scrape request
+
+        Returns:
+            web.Response: Response with the exposition text
+        """
+        return web.Response(
+            body=self.render().encode(), headers={"Content-Type": CONTENT_TYPE}
+        )
+
+    async def start_server(self, host: str = "127.0.0.1", port: int = 9100) -> None:
+        """
+        Serve the metrics on `http://host:port/metrics`.
+
+        Args:
+            host (str): Interface to listen on. Defaults to "127.0.0.1".
+            port (int): Port to listen on. Defaults to 9100.
+        """
+        app = web.Application()
+        _ = app.router.add_get("/metrics", self._handle_scrape)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"serving metrics on http://{host}:{port}/metrics")
+
+    async def stop_server(self) -> None:
+        """Stop the metrics server if it is running."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
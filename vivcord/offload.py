@@ -0,0 +1,291 @@
+"""Run cpu heavy handler bodies outside of the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sys
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Literal
+
+from loguru import logger
+
+from vivcord._pickling import dumps, loads
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, TypeAlias, TypeVar
+
+    from vivcord.client import Client
+
+    ResultT = TypeVar("ResultT")
+
+ExecutorKind: TypeAlias = Literal["thread", "process"]
+
+
+@dataclass
+class OffloadStats:
+    """Queue wait metrics for a single pool."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    # calls a worker picked up, failed calls are only missing when they never reached a worker.
+    started: int = 0
+    total_queue_wait: float = 0.0
+    max_queue_wait: float = 0.0
+
+    @property
+    def pending(self) -> int:
+        """
+        Calls that were submitted but have not finished yet.
+
+        Returns:
+            int: Number of pending calls
+        """
+        return self.submitted - self.completed - self.failed
+
+    @property
+    def mean_queue_wait(self) -> float:
+        """
+        Average time (in seconds) a call waited for a free worker.
+
+        Returns:
+            float: Mean queue wait
+        """
+        return self.total_queue_wait / self.started if self.started else 0.0
+
+    def record_wait(self, wait: float) -> None:
+        """
+        Record how long a call waited before a worker picked it up.
+
+        Args:
+            wait (float): Time waited in seconds
+        """
+        self.started += 1
+        self.total_queue_wait += wait
+        self.max_queue_wait = max(self.max_queue_wait, wait)
+
+
+@dataclass(frozen=True)
+class _FuncAttributeReference:
+    """
+    Picklable reference to the `func` of a module level object, like a `SlashCommand`.
+
+    Decorators such as `slash_command` rebind the module level name of the function they wrap,
+    so pickle can not find the function under its own name anymore.
+    """
+
+    module: str
+    qualname: str
+
+    def __call__(self, *args: Any) -> Any:  # noqa: ANN401
+        target: Any = importlib.import_module(self.module)
+        for part in self.qualname.split("."):
+            target = getattr(target, part)
+        return target.func(*args)
+
+
+def _picklable(func: Callable[..., ResultT]) -> Callable[..., ResultT]:
+    """
+    Get a version of func a worker process can import.
+
+    Args:
+        func (Callable[..., ResultT]): Function to send to a worker
+
+    Returns:
+        Callable[..., ResultT]: func, or a reference to the object its name was rebound to
+    """
+    target: Any = sys.modules.get(func.__module__)
+    try:
+        for part in func.__qualname__.split("."):
+            target = getattr(target, part)
+    except AttributeError:
+        # not reachable by name (e.g. a local function), pickling reports the error.
+        return func
+    if target is not func and getattr(target, "func", None) is func:
+        return _FuncAttributeReference(func.__module__, func.__qualname__)
+    return func
+
+
+class _CallFailed(Exception):  # noqa: N818
+    """The error of a offloaded call, together with the time the call waited for a worker."""
+
+    def __init__(self, wait: float, error: BaseException) -> None:
+        # passed on as args, so process pools can pickle it.
+        super().__init__(wait, error)
+        self.wait = wait
+        self.error = error
+
+
+def _timed_call(
+    func: Callable[..., ResultT], submitted_at: float, *args: Any  # noqa: ANN401
+) -> tuple[float, ResultT]:
+    """
+    Call func and report when the call was picked up by a worker.
+
+    Args:
+        func (Callable[..., ResultT]): Function to call
+        submitted_at (float): Wall clock time the call was submitted at
+        *args (Any): Arguments for func
+
+    Raises:
+        _CallFailed: func raised, wrapping its error.
+
+    Returns:
+        tuple[float, ResultT]: Time spent in the queue and the result of func
+    """
+    # wall clock time because monotonic clocks are not comparable across processes on every platform.
+    wait = time.time() - submitted_at
+    try:
+        return wait, func(*args)
+    except Exception as error:  # noqa: B902
+        raise _CallFailed(wait, error) from error
+
+
+def _timed_marshalled_call(
+    func: Callable[..., ResultT], submitted_at: float, payload: bytes
+) -> tuple[float, ResultT]:
+    """
+    Unmarshal the arguments in the worker process and call func.
+
+    Args:
+        func (Callable[..., ResultT]): Function to call
+        submitted_at (float): Wall clock time the call was submitted at
+        payload (bytes): Arguments pickled without the client
+
+    Raises:
+        _CallFailed: Unmarshalling the arguments or func raised, wrapping the error.
+
+    Returns:
+        tuple[float, ResultT]: Time spent in the queue and the result of func
+    """
+    wait = time.time() - submitted_at
+    try:
+        return wait, func(*loads(None, payload))
+    except Exception as error:  # noqa: B902
+        raise _CallFailed(wait, error) from error
+
+
+class Offloader:
+    """
+    Thread and process pools owned by the client.
+
+    Pools are only created the first time they are used.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        thread_workers: int | None = None,
+        process_workers: int | None = None,
+    ) -> None:
+        """
+        Create a Offloader.
+
+        Args:
+            client (Client): The client the pools belong to.
+            thread_workers (int, optional): Size of the thread pool. Defaults to the ThreadPoolExecutor default.
+            process_workers (int, optional): Size of the process pool. Defaults to the cpu count.
+        """
+        self._client = client
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+
+        self._pools: dict[ExecutorKind, Executor] = {}
+        self.stats: dict[ExecutorKind, OffloadStats] = {
+            "thread": OffloadStats(),
+            "process": OffloadStats(),
+        }
+
+    def _get_pool(self, kind: ExecutorKind) -> Executor:
+        """
+        Get the pool for the given kind, creating it if needed.
+
+        Args:
+            kind (ExecutorKind): Pool kind
+
+        Returns:
+            Executor: The pool
+        """
+        pool = self._pools.get(kind)
+        if pool is None:
+            logger.info(f"starting {kind} pool")
+            if kind == "thread":
+                pool = ThreadPoolExecutor(
+                    self.thread_workers, thread_name_prefix="vivcord"
+                )
+            else:
+                pool = ProcessPoolExecutor(self.process_workers)
+            self._pools[kind] = pool
+        return pool
+
+    async def run(
+        self,
+        kind: ExecutorKind,
+        func: Callable[..., ResultT],
+        *args: Any,  # noqa: ANN401
+    ) -> ResultT:
+        """
+        Run func in the given pool.
+
+        For process pools the function must be importable at module level,
+        either under its own name or as the `func` of a module level object (a decorated command),
+        and the arguments are pickled with the client left out (it is `None` in the worker).
+
+        Args:
+            kind (ExecutorKind): Pool to run in
+            func (Callable[..., ResultT]): Synchronous function to run
+            *args (Any): Arguments for func
+
+        Raises:
+            Exception: Whatever func raised
+
+        Returns:
+            ResultT: The function result
+        """
+        pool = self._get_pool(kind)
+        stats = self.stats[kind]
+        loop = asyncio.get_running_loop()
+
+        if kind == "process":
+            call = partial(
+                _timed_marshalled_call,
+                _picklable(func),
+                time.time(),
+                dumps(self._client, args),
+            )
+        else:
+            call = partial(_timed_call, func, time.time(), *args)
+
+        stats.submitted += 1
+        try:
+            wait, result = await loop.run_in_executor(pool, call)
+        except _CallFailed as failed:
+            # a failing call still waited, leaving it out would hide a saturated pool.
+            stats.failed += 1
+            stats.record_wait(failed.wait)
+            raise failed.error from failed.__cause__
+        except BaseException:
+            stats.failed += 1
+            raise
+
+        stats.completed += 1
+        stats.record_wait(wait)
+        return result
+
+    async def shutdown(self) -> None:
+        """Shut down all pools, cancelling calls that have not started yet."""
+        loop = asyncio.get_running_loop()
+        for kind, pool in self._pools.items():
+            logger.debug(f"shutting down {kind} pool")
+            await loop.run_in_executor(
+                None, partial(pool.shutdown, wait=True, cancel_futures=True)
+            )
+        self._pools.clear()
@@ -0,0 +1,274 @@
+"""Compute the effective permissions of a member in a channel."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from vivcord import events
+from vivcord.datatypes.channel import GuildChannel, ThreadChannel
+from vivcord.datatypes.permission import (
+    ALL_PERMISSIONS,
+    OverwriteType,
+    Permission,
+)
+
+if TYPE_CHECKING:
+    from typing import Iterable, Mapping
+
+    from vivcord import datatypes
+    from vivcord.client import Client
+
+
+# https://discord.com/developers/docs/topics/permissions#permission-overwrites
+def compute_base_permissions(
+    member_id: int,
+    role_ids: Iterable[int],
+    guild_id: int,
+    owner_id: int,
+    roles: Mapping[int, datatypes.Role],
+) -> Permission:
+    """
+    Compute the guild wide permissions of a member.
+
+    Args:
+        member_id (int): Id of the member
+        role_ids (Iterable[int]): Roles of the member
+        guild_id (int): Guild id, which is also the id of the @everyone role
+        owner_id (int): Id of the guild owner
+        roles (Mapping[int, datatypes.Role]): Roles of the guild by id
+
+    Returns:
+        Permission: The base permissions
+    """
+    if member_id == owner_id:
+        return Permission(ALL_PERMISSIONS)
+
+    everyone = roles.get(guild_id)
+    value = int(everyone.permissions) if everyone is not None else 0
+    for role_id in role_ids:
+        role = roles.get(role_id)
+        if role is not None:
+            value |= role.permissions
+
+    if value & Permission.administrator:
+        return Permission(ALL_PERMISSIONS)
+    return Permission(value)
+
+
+def compute_overwrites(
+    base: Permission,
+    member_id: int,
+    role_ids: Iterable[int],
+    guild_id: int,
+    overwrites: Iterable[datatypes.PermissionOverwrite],
+) -> Permission:
+    """
+    Apply the overwrites of a channel to the base permissions.
+
+    Args:
+        base (Permission): Base permissions from `compute_base_permissions`
+        member_id (int): Id of the member
+        role_ids (Iterable[int]): Roles of the member
+        guild_id (int): Guild id, which is also the id of the @everyone role
+        overwrites (Iterable[datatypes.PermissionOverwrite]): Overwrites of the channel
+
+    Returns:
+        Permission: The permissions in the channel
+    """
+    if base & Permission.administrator:
+        return Permission(ALL_PERMISSIONS)
+
+    member_roles = set(role_ids)
+    everyone_allow = everyone_deny = 0
+    role_allow = role_deny = 0
+    member_allow = member_deny = 0
+
+    for overwrite in overwrites:
+        if overwrite.type_ == OverwriteType.member:
+            if overwrite.id_ == member_id:
+                member_allow, member_deny = overwrite.allow, overwrite.deny
+        elif overwrite.id_ == guild_id:
+            everyone_allow, everyone_deny = overwrite.allow, overwrite.deny
+        elif overwrite.id_ in member_roles:
+            role_allow |= overwrite.allow
+            role_deny |= overwrite.deny
+
+    # the order matters, member overwrites win over role overwrites which win over @everyone.
+    value = int(base)
+    value = (value & ~everyone_deny) | everyone_allow
+    value = (value & ~role_deny) | role_allow
+    value = (value & ~member_deny) | member_allow
+    return Permission(value)
+
+
+class PermissionResolver:
+    """
+    Memoized permission computation.
+
+    Results are cached per guild, channel and member, together with the role ids they were computed for,
+    so a member passed with other roles is computed again even without a GUILD_MEMBER_UPDATE
+    (which needs the privileged members intent).
+    Guild and role changes clear the whole guild, member changes clear that member and channel changes clear that channel.
+    Threads have no overwrites of their own, they are resolved (and cached) as their parent channel.
+    """
+
+    def __init__(self, client: Client, max_entries: int = 100_000) -> None:
+        """
+        Create a permission resolver.
+
+        Args:
+            client (Client): Client to listen for update events on and to look up thread parents in
+            max_entries (int): Cached results to keep before the cache is cleared. Defaults to 100_000.
+        """
+        self._client = client
+        self.max_entries = max_entries
+
+        # guild -> channel -> member -> (role ids, permissions)
+        self._cache: dict[
+            int, dict[int, dict[int, tuple[tuple[int, ...], Permission]]]
+        ] = {}
+        self._entries = 0
+        self.hits = 0
+        self.misses = 0
+
+        client.register_handler(events.GuildCreate, self._on_guild_change)
+        client.register_handler(events.GuildUpdate, self._on_guild_change)
+        client.register_handler(events.GuildDelete, self._on_guild_change)
+        client.register_handler(events.GuildRoleCreate, self._on_role_change)
+        client.register_handler(events.GuildRoleUpdate, self._on_role_change)
+        client.register_handler(events.GuildRoleDelete, self._on_role_change)
+        client.register_handler(events.GuildMemberUpdate, self._on_member_change)
+        client.register_handler(events.GuildMemberRemove, self._on_member_change)
+        client.register_handler(events.ChannelUpdate, self._on_channel_change)
+        client.register_handler(events.ChannelDelete, self._on_channel_change)
+
+    def permissions_for(
+        self,
+        member: datatypes.Member,
+        channel: datatypes.channel.GuildChannel,
+        roles: Mapping[int, datatypes.Role],
+        owner_id: int,
+    ) -> Permission:
+        """
+        Get the permissions of a member in a channel.
+
+        Args:
+            member (datatypes.Member): The member
+            channel (datatypes.channel.GuildChannel): The channel
+            roles (Mapping[int, datatypes.Role]): Roles of the guild by id
+            owner_id (int): Id of the guild owner
+
+        Raises:
+            ValueError: The member has no user attached, or the channel is a thread whose parent is not cached.
+
+        Returns:
+            Permission: The permissions of the member in the channel
+        """
+        if member.user is None:
+            raise ValueError("member without user can not be resolved")
+
+        if isinstance(channel, ThreadChannel):
+            parent = (
+                self._client.get_channel(channel.parent_id)
+                if channel.parent_id is not None
+                else None
+            )
+            if not isinstance(parent, GuildChannel):
+                raise ValueError(
+                    f"parent of thread {channel.id_} is not cached, can not resolve it"
+                )
+            channel = parent
+
+        member_id = member.user.id_
+        guild_id = channel.guild_id
+        role_ids = tuple(member.role_ids)
+
+        channels = self._cache.setdefault(guild_id, {})
+        members = channels.setdefault(channel.id_, {})
+        cached = members.get(member_id)
+        if cached is not None and cached[0] == role_ids:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        base = compute_base_permissions(
+            member_id, member.role_ids, guild_id, owner_id, roles
+        )
+        result = compute_overwrites(
+            base, member_id, member.role_ids, guild_id, channel.permission_overwrites
+        )
+
+        if cached is None:
+            if self._entries >= self.max_entries:
+                self.clear()
+                members = self._cache.setdefault(guild_id, {}).setdefault(
+                    channel.id_, {}
+                )
+            self._entries += 1
+        members[member_id] = (role_ids, result)
+        return result
+
+    def clear(self) -> None:
+        """Forget all cached results."""
+        self._cache.clear()
+        self._entries = 0
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        """
+        Forget all results of a guild.
+
+        Args:
+            guild_id (int): The guild
+        """
+        channels = self._cache.pop(guild_id, {})
+        self._entries -= sum(len(members) for members in channels.values())
+
+    def invalidate_channel(self, guild_id: int, channel_id: int) -> None:
+        """
+        Forget all results of a channel.
+
+        Args:
+            guild_id (int): Guild of the channel
+            channel_id (int): The channel
+        """
+        members = self._cache.get(guild_id, {}).pop(channel_id, {})
+        self._entries -= len(members)
+
+    def invalidate_member(self, guild_id: int, member_id: int) -> None:
+        """
+        Forget all results of a member.
+
+        Args:
+            guild_id (int): Guild of the member
+            member_id (int): The member
+        """
+        for members in self._cache.get(guild_id, {}).values():
+            if members.pop(member_id, None) is not None:
+                self._entries -= 1
+
+    async def _on_guild_change(
+        self,
+        event: events.GuildCreate | events.GuildUpdate | events.GuildDelete,
+    ) -> None:
+        guild_id = (
+            event.guild.id_
+            if isinstance(event, (events.GuildCreate, events.GuildUpdate))
+            else event.guild_id
+        )
+        self.invalidate_guild(guild_id)
+
+    async def _on_role_change(
+        self,
+        event: events.GuildRoleCreate | events.GuildRoleDelete,
+    ) -> None:
+        self.invalidate_guild(event.guild_id)
+
+    async def _on_member_change(
+        self,
+        event: events.GuildMemberUpdate | events.GuildMemberRemove,
+    ) -> None:
+        self.invalidate_member(event.guild_id, event.user.id_)
+
+    async def _on_channel_change(self, event: events.ChannelCreate) -> None:
+        if event.guild_id is not None:
+            self.invalidate_channel(event.guild_id, event.channel.id_)
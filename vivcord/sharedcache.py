@@ -0,0 +1,672 @@
+"""
+Cache region in a memory mapped file, shared between processes.
+
+One process (the one running the gateway) writes, any number of processes read.
+The file starts with a header, followed by a open addressing table of fixed size slots
+and a heap holding the pickled entities the slots point to.
+
+Writers bump a generation counter to a odd value before changing anything and back to even after.
+Readers check the counter before and after a lookup and retry when it changed, so they never see a half written entry.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from vivcord._pickling import dumps, loads
+from vivcord.traits import CacheStore
+
+if TYPE_CHECKING:
+    from typing import Iterator
+
+    from vivcord import datatypes
+    from vivcord.client import Client
+
+_MAGIC = b"VIVSHM01"
+_VERSION = 1
+
+# magic, version, slot count, heap size, heap used, generation, live slots, deleted slots
+_HEADER = struct.Struct("<8sIIQQQQQ")
+_HEADER_SIZE = 64
+_GENERATION_OFFSET = 32
+_GENERATION = struct.Struct("<Q")
+
+# kind, record length, key part a, key part b, record offset
+_SLOT = struct.Struct("<BxxxIQQQ")
+
+_EMPTY = 0
+_DELETED = 255
+
+# a entity kind is stored in every slot, so the kinds can share one table.
+ENTITY_KINDS = {"guild": 1, "channel": 2, "role": 3, "member": 4, "user": 5}
+
+_MAX_LOAD = 0.7
+_MAX_READ_ATTEMPTS = 1000
+_LOW_64 = 2**64 - 1
+
+
+def _split_key(key: int | tuple[int, int]) -> tuple[int, int]:
+    """
+    Turn a cache key into the two key parts stored in a slot.
+
+    Args:
+        key (int | tuple[int, int]): A id, or `(guild_id, user_id)` for members
+
+    Returns:
+        tuple[int, int]: The key parts
+    """
+    if isinstance(key, tuple):
+        return key
+    return key, 0
+
+
+def _slot_hash(kind: int, key_a: int, key_b: int) -> int:
+    """
+    Hash a key the same way in every process, unlike `hash` this does not depend on the interpreter.
+
+    Args:
+        kind (int): Entity kind
+        key_a (int): First key part
+        key_b (int): Second key part
+
+    Returns:
+        int: The hash
+    """
+    value = (key_a * 0x9E3779B97F4A7C15) ^ (key_b * 0xC2B2AE3D27D4EB4F) ^ kind
+    return (value ^ (value >> 29)) & _LOW_64
+
+
+class _Region:
+    """Layout helpers shared by the writer and readers."""
+
+    def __init__(self, region: mmap.mmap) -> None:
+        """
+        Wrap a mapped region.
+
+        Args:
+            region (mmap.mmap): The mapped file
+
+        Raises:
+            ValueError: The file is not a shared cache region of this version.
+        """
+        self._mm = region
+        magic, version, self.slot_count, self.heap_size, *_ = _HEADER.unpack_from(
+            region, 0
+        )
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not a vivcord shared cache region")
+        self.heap_start = _HEADER_SIZE + self.slot_count * _SLOT.size
+
+    @property
+    def generation(self) -> int:
+        """
+        The seqlock generation, odd while a write is in progress.
+
+        Returns:
+            int: The generation
+        """
+        return _GENERATION.unpack_from(self._mm, _GENERATION_OFFSET)[0]
+
+    def _find(self, kind: int, key_a: int, key_b: int) -> tuple[int, int, int]:
+        """
+        Find the slot of a key.
+
+        Args:
+            kind (int): Entity kind
+            key_a (int): First key part
+            key_b (int): Second key part
+
+        Returns:
+            tuple[int, int, int]: Slot index, record offset and length, the offset is -1 and the slot free if the key is missing
+        """
+        mask = self.slot_count - 1
+        index = _slot_hash(kind, key_a, key_b) & mask
+        free = -1
+        for _ in range(self.slot_count):
+            slot_kind, length, slot_a, slot_b, offset = _SLOT.unpack_from(
+                self._mm, _HEADER_SIZE + index * _SLOT.size
+            )
+            if slot_kind == _EMPTY:
+                return (free if free != -1 else index), -1, 0
+            if slot_kind == _DELETED:
+                if free == -1:
+                    free = index
+            elif slot_kind == kind and slot_a == key_a and slot_b == key_b:
+                return index, offset, length
+            index = (index + 1) & mask
+        return free, -1, 0
+
+    def _record(self, offset: int, length: int) -> memoryview:
+        """
+        View a record in the heap without copying it.
+
+        Args:
+            offset (int): Record offset
+            length (int): Record length
+
+        Returns:
+            memoryview: The record
+        """
+        end = offset + length
+        return memoryview(self._mm)[offset:end]
+
+    def _read_slot(self, index: int) -> tuple[int, int, int, int, int]:
+        """
+        Read a slot.
+
+        Args:
+            index (int): Slot index
+
+        Returns:
+            tuple[int, int, int, int, int]: Kind, record length, key parts and record offset
+        """
+        return _SLOT.unpack_from(self._mm, _HEADER_SIZE + index * _SLOT.size)
+
+
+class SharedCacheWriter(_Region):
+    """
+    The writing side of a shared cache region.
+
+    The region has a fixed size, when it is full new entities are dropped with a warning.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        path: str | os.PathLike[str],
+        slot_count: int = 1 << 20,
+        heap_size: int = 256 * 2**20,
+    ) -> None:
+        """
+        Create a region file, or reset a existing one in place.
+
+        Args:
+            client (Client): Client the cached entities belong to
+            path (str | os.PathLike[str]): File to map
+            slot_count (int): Entities the region can index, rounded up to a power of two. Defaults to 1 << 20.
+            heap_size (int): Bytes available for the pickled entities. Defaults to 256 MiB.
+        """
+        self._client = client
+        self.path = path
+
+        slots = 8
+        while slots < slot_count:
+            slots *= 2
+        size = _HEADER_SIZE + slots * _SLOT.size + heap_size
+
+        # never truncate, readers in other processes may still have the file mapped.
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        self._file = os.fdopen(fd, "r+b")
+        existing_size = os.fstat(fd).st_size
+        reused = existing_size > 0
+        if existing_size < size:
+            os.ftruncate(fd, size)
+        region = mmap.mmap(fd, size)
+
+        generation = 0
+        if reused and _HEADER.unpack_from(region, 0)[0] == _MAGIC:
+            generation = _GENERATION.unpack_from(region, _GENERATION_OFFSET)[0]
+        # reset the region as one write, readers of a earlier writer then see it empty instead of torn.
+        writing = generation | 1
+        _HEADER.pack_into(
+            region, 0, _MAGIC, _VERSION, slots, heap_size, 0, writing, 0, 0
+        )
+        if reused:
+            heap_start = _HEADER_SIZE + slots * _SLOT.size
+            region[_HEADER_SIZE:heap_start] = bytes(heap_start - _HEADER_SIZE)
+        _GENERATION.pack_into(region, _GENERATION_OFFSET, writing + 1)
+        super().__init__(region)
+
+        self._counts = dict.fromkeys(ENTITY_KINDS.values(), 0)
+        self._warned_full = False
+
+    def _header(self) -> tuple[int, int, int]:
+        """
+        Read the mutable header fields.
+
+        Returns:
+            tuple[int, int, int]: Heap used, live slots and deleted slots
+        """
+        _, _, _, _, heap_used, _, live, deleted = _HEADER.unpack_from(self._mm, 0)
+        return heap_used, live, deleted
+
+    def _write_header(self, heap_used: int, live: int, deleted: int) -> None:
+        """
+        Write the mutable header fields, leaving the generation alone.
+
+        Args:
+            heap_used (int): Bytes used in the heap
+            live (int): Slots in use
+            deleted (int): Slots marked deleted
+        """
+        struct.pack_into("<Q", self._mm, 24, heap_used)
+        struct.pack_into("<QQ", self._mm, 40, live, deleted)
+
+    def _begin(self) -> None:
+        """Mark a write as in progress."""
+        _GENERATION.pack_into(self._mm, _GENERATION_OFFSET, self.generation + 1)
+
+    def _end(self) -> None:
+        """Mark a write as finished."""
+        _GENERATION.pack_into(self._mm, _GENERATION_OFFSET, self.generation + 1)
+
+    def count(self, kind: int) -> int:
+        """
+        Get the amount of entities of a kind.
+
+        Args:
+            kind (int): Entity kind
+
+        Returns:
+            int: The amount
+        """
+        return self._counts[kind]
+
+    def get(self, kind: int, key: int | tuple[int, int]) -> Any | None:  # noqa: ANN401
+        """
+        Read a entity, the writer never races with itself so no retries are needed.
+
+        Args:
+            kind (int): Entity kind
+            key (int | tuple[int, int]): The key
+
+        Returns:
+            Any | None: The entity, or None if it is not stored
+        """
+        _, offset, length = self._find(kind, *_split_key(key))
+        if offset == -1:
+            return None
+        return loads(self._client, self._record(offset, length))
+
+    def set(  # noqa: A003
+        self, kind: int, key: int | tuple[int, int], value: Any  # noqa: ANN401
+    ) -> None:
+        """
+        Store a entity.
+
+        Args:
+            kind (int): Entity kind
+            key (int | tuple[int, int]): The key
+            value (Any): The entity
+        """
+        key_a, key_b = _split_key(key)
+        data = dumps(self._client, value)
+
+        self._begin()
+        try:
+            heap_used, live, deleted = self._header()
+            if self.heap_start + heap_used + len(data) > len(self._mm):
+                self._compact()
+                heap_used, live, deleted = self._header()
+            index, offset, _ = self._find(kind, key_a, key_b)
+
+            full = offset == -1 and (live + 1) > self.slot_count * _MAX_LOAD
+            if full or self.heap_start + heap_used + len(data) > len(self._mm):
+                if not self._warned_full:
+                    logger.warning(
+                        f"shared cache {self.path} is full, dropping entities"
+                    )
+                    self._warned_full = True
+                if offset != -1:
+                    # do not leave the outdated version readable.
+                    self._delete_slot(index, kind, live, deleted, heap_used)
+                return
+
+            offset_new = self.heap_start + heap_used
+            end = offset_new + len(data)
+            self._mm[offset_new:end] = data
+            if offset == -1:
+                if self._read_slot(index)[0] == _DELETED:
+                    deleted -= 1
+                live += 1
+                self._counts[kind] += 1
+            _SLOT.pack_into(
+                self._mm,
+                _HEADER_SIZE + index * _SLOT.size,
+                kind,
+                len(data),
+                key_a,
+                key_b,
+                offset_new,
+            )
+            self._write_header(heap_used + len(data), live, deleted)
+        finally:
+            self._end()
+
+    def _delete_slot(
+        self, index: int, kind: int, live: int, deleted: int, heap_used: int
+    ) -> None:
+        """
+        Mark a slot as deleted.
+
+        Args:
+            index (int): Slot index
+            kind (int): Entity kind of the slot
+            live (int): Slots in use
+            deleted (int): Slots marked deleted
+            heap_used (int): Bytes used in the heap
+        """
+        _SLOT.pack_into(
+            self._mm, _HEADER_SIZE + index * _SLOT.size, _DELETED, 0, 0, 0, 0
+        )
+        self._counts[kind] -= 1
+        self._write_header(heap_used, live - 1, deleted + 1)
+
+    def pop(self, kind: int, key: int | tuple[int, int]) -> Any | None:  # noqa: ANN401
+        """
+        Remove a entity.
+
+        Args:
+            kind (int): Entity kind
+            key (int | tuple[int, int]): The key
+
+        Returns:
+            Any | None: The removed entity, or None if it was not stored
+        """
+        value = self.get(kind, key)
+        if value is None:
+            return None
+
+        self._begin()
+        try:
+            index, _, _ = self._find(kind, *_split_key(key))
+            heap_used, live, deleted = self._header()
+            self._delete_slot(index, kind, live, deleted, heap_used)
+            if deleted + live > self.slot_count * _MAX_LOAD:
+                self._rebuild_slots()
+        finally:
+            self._end()
+        return value
+
+    def keys(self, kind: int) -> Iterator[int | tuple[int, int]]:
+        """
+        Iterate over the keys of a entity kind.
+
+        Args:
+            kind (int): Entity kind
+
+        Returns:
+            Iterator[int | tuple[int, int]]: The keys, `(guild_id, user_id)` for members
+        """
+        keys: list[int | tuple[int, int]] = []
+        for index in range(self.slot_count):
+            slot_kind, _, key_a, key_b, _ = self._read_slot(index)
+            if slot_kind == kind:
+                keys.append((key_a, key_b) if kind == ENTITY_KINDS["member"] else key_a)
+        return iter(keys)
+
+    def _live_slots(self) -> list[tuple[int, int, int, int, int]]:
+        """
+        Read all slots in use.
+
+        Returns:
+            list[tuple[int, int, int, int, int]]: The slots
+        """
+        slots = [self._read_slot(index) for index in range(self.slot_count)]
+        return [slot for slot in slots if slot[0] not in (_EMPTY, _DELETED)]
+
+    def _clear_slots(self) -> None:
+        """Empty the slot table, must be called inside a write."""
+        heap_start = self.heap_start
+        self._mm[_HEADER_SIZE:heap_start] = bytes(heap_start - _HEADER_SIZE)
+
+    def _rebuild_slots(self) -> None:
+        """Rewrite the slot table without deleted slots, must be called inside a write."""
+        live_slots = self._live_slots()
+        self._clear_slots()
+        for kind, length, key_a, key_b, offset in live_slots:
+            index, _, _ = self._find(kind, key_a, key_b)
+            _SLOT.pack_into(
+                self._mm,
+                _HEADER_SIZE + index * _SLOT.size,
+                kind,
+                length,
+                key_a,
+                key_b,
+                offset,
+            )
+        heap_used, _, _ = self._header()
+        self._write_header(heap_used, len(live_slots), 0)
+
+    def _compact(self) -> None:
+        """Move all live records to the start of the heap, must be called inside a write."""
+        live_slots = self._live_slots()
+        records = [
+            bytes(self._record(offset, length))
+            for _, length, _, _, offset in live_slots
+        ]
+
+        self._clear_slots()
+        heap_used = 0
+        for (kind, length, key_a, key_b, _), record in zip(live_slots, records):
+            offset = self.heap_start + heap_used
+            end = offset + length
+            self._mm[offset:end] = record
+            heap_used += length
+            index, _, _ = self._find(kind, key_a, key_b)
+            _SLOT.pack_into(
+                self._mm,
+                _HEADER_SIZE + index * _SLOT.size,
+                kind,
+                length,
+                key_a,
+                key_b,
+                offset,
+            )
+
+        self._write_header(heap_used, len(live_slots), 0)
+
+    def clear(self, kind: int) -> None:
+        """
+        Remove all entities of a kind.
+
+        Args:
+            kind (int): Entity kind
+        """
+        for key in list(self.keys(kind)):
+            _ = self.pop(kind, key)
+
+    def close(self) -> None:
+        """Unmap the region, the file is left for readers that still have it open."""
+        self._mm.close()
+        self._file.close()
+
+
+class SharedStore(CacheStore[Any, Any]):
+    """A `StateCache` store for one entity kind, kept in a `SharedCacheWriter`."""
+
+    def __init__(self, writer: SharedCacheWriter, entity: str) -> None:
+        """
+        Create a store.
+
+        Args:
+            writer (SharedCacheWriter): Region to store the entities in
+            entity (str): Entity name, one of `ENTITY_KINDS`
+        """
+        super().__init__()
+        self._writer = writer
+        self._kind = ENTITY_KINDS[entity]
+
+    def get(self, key: Any) -> Any | None:  # noqa: ANN401
+        """
+        Get a stored entity, this is a new copy every time.
+
+        Args:
+            key (Any): The key
+
+        Returns:
+            Any | None: The entity, or None if it is not stored
+        """
+        return self._writer.get(self._kind, key)
+
+    def set(self, key: Any, value: Any) -> None:  # noqa: A003 ANN401
+        """
+        Store a entity.
+
+        Args:
+            key (Any): The key
+            value (Any): The entity
+        """
+        self._writer.set(self._kind, key, value)
+
+    def pop(self, key: Any) -> Any | None:  # noqa: ANN401
+        """
+        Remove a stored entity.
+
+        Args:
+            key (Any): The key
+
+        Returns:
+            Any | None: The removed entity, or None if it was not stored
+        """
+        return self._writer.pop(self._kind, key)
+
+    def keys(self) -> Iterator[Any]:
+        """
+        Iterate over the stored keys.
+
+        Returns:
+            Iterator[Any]: The keys
+        """
+        return self._writer.keys(self._kind)
+
+    def __len__(self) -> int:
+        return self._writer.count(self._kind)
+
+    def clear(self) -> None:
+        """Remove all stored entities."""
+        self._writer.clear(self._kind)
+
+
+class SharedCacheReader(_Region):
+    """
+    Read only view of a region written by another process.
+
+    Has the same lookups as `StateCache`, every lookup unpickles a new copy of the entity.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], client: Client | None = None
+    ) -> None:
+        """
+        Map a region file.
+
+        Args:
+            path (str | os.PathLike[str]): File written by a `SharedCacheWriter`
+            client (Client, optional): Client to attach the entities to. Defaults to None.
+        """
+        self._client = client
+        with open(path, "rb") as file:
+            region = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        super().__init__(region)
+
+    def _get(
+        self, entity: str, key: int | tuple[int, int]
+    ) -> Any | None:  # noqa: ANN401
+        """
+        Read a entity, retrying while the writer changes the region.
+
+        Args:
+            entity (str): Entity name
+            key (int | tuple[int, int]): The key
+
+        Raises:
+            TimeoutError: The writer kept changing the region.
+
+        Returns:
+            Any | None: The entity, or None if it is not stored
+        """
+        kind = ENTITY_KINDS[entity]
+        key_a, key_b = _split_key(key)
+        for _ in range(_MAX_READ_ATTEMPTS):
+            before = self.generation
+            if before % 2:
+                time.sleep(0)
+                continue
+
+            try:
+                _, offset, length = self._find(kind, key_a, key_b)
+                value = None
+                if offset != -1:
+                    record = self._record(offset, length)
+                    value = loads(self._client, record)
+            except Exception:  # noqa: B902
+                # the record was overwritten while we read it, the generation check below catches it.
+                value = None
+                if self.generation == before:
+                    raise
+
+            if self.generation == before:
+                return value
+        raise TimeoutError("shared cache kept changing while reading")
+
+    def get_guild(self, guild_id: int) -> datatypes.Guild | None:
+        """
+        Get a guild.
+
+        Args:
+            guild_id (int): Id of the guild
+
+        Returns:
+            datatypes.Guild | None: The guild, or None if it is not cached
+        """
+        return self._get("guild", guild_id)
+
+    def get_channel(self, channel_id: int) -> datatypes.Channel | None:
+        """
+        Get a channel.
+
+        Args:
+            channel_id (int): Id of the channel
+
+        Returns:
+            datatypes.Channel | None: The channel, or None if it is not cached
+        """
+        return self._get("channel", channel_id)
+
+    def get_role(self, role_id: int) -> datatypes.Role | None:
+        """
+        Get a role.
+
+        Args:
+            role_id (int): Id of the role
+
+        Returns:
+            datatypes.Role | None: The role, or None if it is not cached
+        """
+        return self._get("role", role_id)
+
+    def get_member(self, guild_id: int, user_id: int) -> datatypes.Member | None:
+        """
+        Get a member.
+
+        Args:
+            guild_id (int): Guild of the member
+            user_id (int): User id of the member
+
+        Returns:
+            datatypes.Member | None: The member, or None if it is not cached
+        """
+        return self._get("member", (guild_id, user_id))
+
+    def get_user(self, user_id: int) -> datatypes.User | None:
+        """
+        Get a user.
+
+        Args:
+            user_id (int): Id of the user
+
+        Returns:
+            datatypes.User | None: The user, or None if it is not cached
+        """
+        return self._get("user", user_id)
+
+    def close(self) -> None:
+        """Unmap the region."""
+        self._mm.close()
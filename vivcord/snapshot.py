@@ -0,0 +1,224 @@
+"""Save the state cache to disk, so a restarted client can resume with it."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle  # noqa: S403
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from vivcord._pickling import dumps, loads
+
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
+    from vivcord.cache import StateCache
+    from vivcord.client import Client
+
+# bump when the pickled datatypes change in a incompatible way, older snapshots are then ignored.
+SNAPSHOT_VERSION = 2
+
+_BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class SessionState:
+    """The gateway session a snapshot belongs to."""
+
+    session_id: str
+    sequence: int | None
+    resume_gateway_url: str | None = None
+    # restored on resume, discord only sends it in READY.
+    application_id: int | None = None
+
+
+def _create_snapshot(temp_path: str, meta: dict[str, Any]) -> sqlite3.Connection:
+    """
+    Create a empty snapshot file with its meta data.
+
+    Args:
+        temp_path (str): File to create, replaced if it exists
+        meta (dict[str, Any]): Meta data of the snapshot
+
+    Returns:
+        sqlite3.Connection: Connection to the file, usable from any thread
+    """
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    # used from executor threads, one at a time.
+    connection = sqlite3.connect(temp_path, check_same_thread=False)
+    _ = connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value)")
+    _ = connection.execute("CREATE TABLE entries (entity TEXT, key, value BLOB)")
+    _ = connection.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+    return connection
+
+
+def _insert_entries(
+    connection: sqlite3.Connection, batch: list[tuple[str, bytes, bytes]]
+) -> None:
+    """
+    Write a batch of pickled entries.
+
+    Args:
+        connection (sqlite3.Connection): Snapshot being written
+        batch (list[tuple[str, bytes, bytes]]): Entity name, pickled key and pickled value
+    """
+    _ = connection.executemany("INSERT INTO entries VALUES (?, ?, ?)", batch)
+
+
+def _finish_snapshot(
+    connection: sqlite3.Connection, temp_path: str, path: str | os.PathLike[str]
+) -> None:
+    """
+    Commit a snapshot and move it over the previous one.
+
+    Args:
+        connection (sqlite3.Connection): Snapshot being written
+        temp_path (str): File the snapshot was written to
+        path (str | os.PathLike[str]): Final location of the snapshot
+    """
+    connection.commit()
+    connection.close()
+    os.replace(temp_path, path)
+
+
+async def save_snapshot(
+    client: Client,
+    cache: StateCache,
+    path: str | os.PathLike[str],
+    session: SessionState | None,
+) -> int:
+    """
+    Write the cache to a SQLite file.
+
+    Entries are pickled on the event loop in batches, so the cache does not change halfway through pickling a entity,
+    while the file is written in the default executor.
+    The file is written next to `path` first and then moved over it,
+    so a crash while saving leaves the previous snapshot intact.
+
+    Args:
+        client (Client): Client the cache belongs to
+        cache (StateCache): Cache to save
+        path (str | os.PathLike[str]): File to write
+        session (SessionState, optional): Gateway session the cache is up to date with
+
+    Returns:
+        int: Entries written
+    """
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    temp_path = f"{os.fspath(path)}.tmp"
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "session_id": session.session_id if session is not None else None,
+        "sequence": session.sequence if session is not None else None,
+        "resume_gateway_url": session.resume_gateway_url
+        if session is not None
+        else None,
+        "application_id": session.application_id if session is not None else None,
+    }
+    connection = await loop.run_in_executor(None, _create_snapshot, temp_path, meta)
+
+    written = 0
+    try:
+        batch: list[tuple[str, bytes, bytes]] = []
+        for entity, key, value in cache.export_entries():
+            batch.append((entity, dumps(client, key), dumps(client, value)))
+            if len(batch) >= _BATCH_SIZE:
+                await loop.run_in_executor(None, _insert_entries, connection, batch)
+                written += len(batch)
+                batch = []
+        await loop.run_in_executor(None, _insert_entries, connection, batch)
+        written += len(batch)
+    except BaseException:
+        connection.close()
+        raise
+
+    await loop.run_in_executor(None, _finish_snapshot, connection, temp_path, path)
+    logger.info(
+        f"saved {written} cache entries to {os.fspath(path)} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return written
+
+
+def _read_entries(connection: sqlite3.Connection) -> Iterator[tuple[str, bytes, bytes]]:
+    """
+    Read the entry rows of a snapshot.
+
+    Args:
+        connection (sqlite3.Connection): Open snapshot
+
+    Yields:
+        tuple[str, bytes, bytes]: Entity name, pickled key and pickled value
+    """
+    cursor = connection.execute("SELECT entity, key, value FROM entries")
+    while rows := cursor.fetchmany(_BATCH_SIZE):
+        yield from rows
+
+
+def load_snapshot(
+    client: Client, cache: StateCache, path: str | os.PathLike[str]
+) -> SessionState | None:
+    """
+    Fill the cache from a file written by `save_snapshot`.
+
+    Only load snapshots written by your own bot, they contain pickled data.
+
+    Args:
+        client (Client): Client to attach the entities to
+        cache (StateCache): Cache to fill
+        path (str | os.PathLike[str]): File to read
+
+    Returns:
+        SessionState | None: The session to resume, or None if the snapshot is missing, outdated or has no session
+    """
+    if not os.path.exists(path):
+        return None
+
+    start = time.perf_counter()
+    connection = sqlite3.connect(path)
+    try:
+        meta = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+        if meta.get("version") != SNAPSHOT_VERSION:
+            logger.warning(
+                f"ignoring snapshot {os.fspath(path)} with version {meta.get('version')}"
+            )
+            return None
+
+        loaded = 0
+        try:
+            for entity, key, value in _read_entries(connection):
+                cache.import_entry(entity, loads(client, key), loads(client, value))
+                loaded += 1
+        except (pickle.UnpicklingError, AttributeError, ValueError):
+            logger.exception(f"snapshot {os.fspath(path)} is unusable, ignoring it")
+            cache.clear()
+            return None
+    except sqlite3.DatabaseError:
+        logger.exception(f"snapshot {os.fspath(path)} is unusable, ignoring it")
+        cache.clear()
+        return None
+    finally:
+        connection.close()
+
+    logger.info(
+        f"loaded {loaded} cache entries from {os.fspath(path)} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    if meta.get("session_id") is None:
+        return None
+    return SessionState(
+        meta["session_id"],
+        meta.get("sequence"),
+        meta.get("resume_gateway_url"),
+        meta.get("application_id"),
+    )
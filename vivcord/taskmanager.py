@@ -23,6 +23,16 @@ class TaskManger:
         """Create TaskManger."""
         self._tasks: list[asyncio.Task[None]] = []
 
+    @property
+    def task_count(self) -> int:
+        """
+        Number of tasks currently managed.
+
+        Returns:
+            int: The task count
+        """
+        return len(self._tasks)
+
     def add_task(self, task: asyncio.Task[None] | Coroutine[Any, Any, None]) -> None:
         """
         Add a task to be managed.
@@ -0,0 +1,113 @@
+"""
+Parse and format the timestamps discord sends.
+
+Every datetime returned here is timezone aware.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+
+# https://discord.com/developers/docs/reference#convert-snowflake-to-datetime
+DISCORD_EPOCH = 1420070400000
+
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# the parts `datetime.fromisoformat` does not accept before python 3.11.
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+def parse_iso(value: str) -> datetime:
+    """
+    Parse a ISO 8601 timestamp.
+
+    Discords own format (`2021-04-12T23:40:39.855793+00:00`) is parsed directly by `datetime.fromisoformat`,
+    other spellings like a `Z` suffix or 3 digit fractions are normalized first.
+    Timestamps without a offset are taken as UTC.
+
+    Args:
+        value (str): The timestamp
+
+    Returns:
+        datetime: The parsed time
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(_normalize(value))
+
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _normalize(value: str) -> str:
+    """
+    Rewrite a timestamp into the subset of ISO 8601 python 3.10 can parse.
+
+    Args:
+        value (str): The timestamp
+
+    Returns:
+        str: The rewritten timestamp
+    """
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return _FRACTION.sub(lambda match: "." + match[1][:6].ljust(6, "0"), value, 1)
+
+
+def parse_optional_iso(value: str | None) -> datetime | None:
+    """
+    Parse a ISO 8601 timestamp that may be null.
+
+    Args:
+        value (str, optional): The timestamp
+
+    Returns:
+        datetime | None: The parsed time, or None if value is None
+    """
+    return parse_iso(value) if value is not None else None
+
+
+def format_iso(value: datetime) -> str:
+    """
+    Format a time the way discord expects it.
+
+    Args:
+        value (datetime): The time, naive times are taken as UTC
+
+    Returns:
+        str: The ISO 8601 timestamp
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def snowflake_time(snowflake: int) -> datetime:
+    """
+    Get the time a discord id was created.
+
+    Args:
+        snowflake (int): The id
+
+    Returns:
+        datetime: The creation time
+    """
+    return datetime.fromtimestamp(
+        ((snowflake >> 22) + DISCORD_EPOCH) / 1000, timezone.utc
+    )
+
+
+def from_unix_micros(micros: int) -> datetime:
+    """
+    Convert microseconds since the unix epoch to a time.
+
+    Args:
+        micros (int): Microseconds since the unix epoch
+
+    Returns:
+        datetime: The time
+    """
+    return _UNIX_EPOCH + timedelta(microseconds=micros)
@@ -0,0 +1,208 @@
+"""Opt-in tracing of the stages a gateway event goes through."""
+
+from __future__ import annotations
+
+import json
+import random
+import secrets
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+from vivcord import traits
+
+if TYPE_CHECKING:
+    from contextvars import Token
+    from pathlib import Path
+    from typing import Iterator
+
+# trace id of the event being handled in the current task.
+_current_trace: ContextVar[str | None] = ContextVar("vivcord_trace", default=None)
+
+
+class Span:
+    """A timed stage of handling a event."""
+
+    __slots__ = ("trace_id", "name", "start", "duration", "attributes")
+
+    def __init__(self, trace_id: str, name: str, attributes: dict[str, object]) -> None:
+        """
+        Start a span.
+
+        Args:
+            trace_id (str): Trace this span belongs to
+            name (str): Name of the stage
+            attributes (dict[str, object]): Extra data about the stage
+        """
+        self.trace_id = trace_id
+        self.name = name
+        self.start = time.time()
+        self.duration = 0.0
+        self.attributes = attributes
+
+    def to_json(self) -> dict[str, object]:
+        """
+        Convert the span to json.
+
+        Returns:
+            dict[str, object]: The span data
+        """
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "attributes": self.attributes,
+        }
+
+    def __repr__(self) -> str:
+        return f"Span({self.trace_id}, {self.name!r}, {self.duration:.6f})"
+
+
+class RingBufferExporter(traits.SpanExporter):
+    """Keep the most recent spans in memory."""
+
+    def __init__(self, capacity: int = 4096) -> None:
+        """
+        Create a RingBufferExporter.
+
+        Args:
+            capacity (int): Maximum amount of spans to keep. Defaults to 4096.
+        """
+        self.spans: deque[Span] = deque(maxlen=capacity)
+
+    def export(self, span: Span) -> None:
+        """
+        Store the span, dropping the oldest one if full.
+
+        Args:
+            span (Span): The finished span.
+        """
+        self.spans.append(span)
+
+    def get_trace(self, trace_id: str) -> list[Span]:
+        """
+        Get all stored spans of a trace.
+
+        Args:
+            trace_id (str): Trace to look for
+
+        Returns:
+            list[Span]: Spans of the trace in the order they finished
+        """
+        return [span for span in self.spans if span.trace_id == trace_id]
+
+
+class JsonLinesExporter(traits.SpanExporter):
+    """Append spans to a file as json lines."""
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Create a JsonLinesExporter.
+
+        Args:
+            path (str | Path): File to append to
+        """
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115
+
+    def export(self, span: Span) -> None:
+        """
+        Write the span to the file.
+
+        Args:
+            span (Span): The finished span.
+        """
+        _ = self._file.write(json.dumps(span.to_json(), default=str) + "\n")
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self._file.close()
+
+
+class Tracer:
+    """
+    Creates spans for sampled events.
+
+    A trace is started for each sampled gateway payload,
+    every span created while handling that payload (in any task created from it) shares its trace id.
+    When a payload is not sampled `span` does nothing.
+    """
+
+    def __init__(
+        self, sample_rate: float = 0.0, exporter: traits.SpanExporter | None = None
+    ) -> None:
+        """
+        Create a Tracer.
+
+        Args:
+            sample_rate (float): Fraction of gateway payloads to trace. Defaults to 0.0.
+            exporter (traits.SpanExporter, optional): Where to send spans. Defaults to a RingBufferExporter.
+        """
+        self.sample_rate = sample_rate
+        self.exporter = exporter if exporter is not None else RingBufferExporter()
+
+    def start_trace(self) -> Token[str | None] | None:
+        """
+        Decide if the current payload is sampled, and start a trace if so.
+
+        Returns:
+            Token[str | None] | None: Token to pass to `end_trace`, None if not sampled.
+        """
+        if self.sample_rate <= 0:
+            return None
+        if random.random() >= self.sample_rate:  # noqa: S311 DUO102
+            return None
+        return _current_trace.set(secrets.token_hex(8))
+
+    def end_trace(self, token: Token[str | None] | None) -> None:
+        """
+        Stop tracing in the current context.
+
+        Tasks created while the trace was active keep their trace id.
+
+        Args:
+            token (Token[str | None] | None): Token returned by `start_trace`
+        """
+        if token is not None:
+            _current_trace.reset(token)
+
+    @property
+    def trace_id(self) -> str | None:
+        """
+        Trace id of the current context.
+
+        Returns:
+            str | None: The trace id, None if the current event is not sampled
+        """
+        return _current_trace.get()
+
+    @contextmanager
+    def span(self, name: str, **attributes: object) -> Iterator[Span | None]:
+        """
+        Time the code inside the with block.
+
+        Args:
+            name (str): Name of the stage
+            **attributes (object): Extra data about the stage
+
+        Yields:
+            Span | None: The span, None if the current event is not sampled
+        """
+        trace_id = _current_trace.get()
+        if trace_id is None:
+            yield None
+            return
+
+        span = Span(trace_id, name, attributes)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - start
+            self.exporter.export(span)
+
+    def close(self) -> None:
+        """Close the exporter."""
+        self.exporter.close()
@@ -3,15 +3,26 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Generic, ParamSpec, Protocol, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Generic,
+    Hashable,
+    ParamSpec,
+    Protocol,
+    TypeVar,
+)
 
 if TYPE_CHECKING:
+    from typing import Iterator
+
     from vivcord import _typed_dicts as type_dicts
-    from vivcord import datatypes
+    from vivcord import datatypes, tracing
 
 
 T = TypeVar("T")
 P = ParamSpec("P")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
 
 
 class ApplicationCommand(Protocol):
@@ -66,3 +77,79 @@ class Messageable(ABC):
         Args:
             data (datatypes.SendMessageData): Message data to send.
         """
+
+
+class SpanExporter(ABC):
+    """Receives finished tracing spans."""
+
+    @abstractmethod
+    def export(self, span: tracing.Span) -> None:
+        """
+        Export a finished span.
+
+        Args:
+            span (tracing.Span): The finished span.
+        """
+
+    def close(self) -> None:
+        """Flush and release any resources held by the exporter."""
+
+
+class CacheStore(ABC, Generic[K, V]):
+    """Storage for a single kind of cached entity."""
+
+    def __init__(self) -> None:
+        """Create a cache store."""
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key: K) -> V | None:
+        """
+        Get a cached value.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: The value, or None if it is not cached
+        """
+
+    @abstractmethod
+    def set(self, key: K, value: V) -> None:  # noqa: A003
+        """
+        Cache a value.
+
+        Args:
+            key (K): Key of the value
+            value (V): The value
+        """
+
+    @abstractmethod
+    def pop(self, key: K) -> V | None:
+        """
+        Remove a cached value.
+
+        Args:
+            key (K): Key of the value
+
+        Returns:
+            V | None: The removed value, or None if it was not cached
+        """
+
+    @abstractmethod
+    def keys(self) -> Iterator[K]:
+        """
+        Iterate over the cached keys.
+
+        Returns:
+            Iterator[K]: The keys
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def clear(self) -> None:
+        """Remove all cached values."""
+        for key in list(self.keys()):
+            _ = self.pop(key)